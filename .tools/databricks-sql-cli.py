@@ -6,14 +6,40 @@ Allows executing SQL queries on Databricks and exploring datasets
 
 import os
 import sys
+import re
 import json
+import time
+import hashlib
 import requests
 import argparse
+import asyncio
+from collections import defaultdict
 from urllib.parse import urljoin
+import numpy as np
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tabulate import tabulate
 from pathlib import Path
 
+# Transient responses worth retrying on idempotent requests
+RETRY_STATUSES = (429, 502, 503, 504)
+# The statement API answers 429/503 before accepting work; a 502/504 may follow an accepted statement
+SUBMIT_RETRY_STATUSES = (429, 503)
+# Statement states that can still change; every other state is final
+PENDING_STATES = ('PENDING', 'RUNNING')
+# File extension -> streamed output format of `sql --output`
+OUTPUT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.parquet': 'parquet'}
+# Larger results are truncated on screen; tabulate is slow and unreadable past this
+MAX_DISPLAY_ROWS = 200
+# Catalog metadata statements; their results are cached unless caching is off
+METADATA_STATEMENT = re.compile(r'^\s*(SHOW|DESCRIBE|DESC)\b', re.IGNORECASE)
+# Quoted strings and identifiers, kept verbatim when SQL is normalized for cache keys
+QUOTED_SQL = re.compile(r"('(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)")
+# Statements that only read; consecutive ones in a script run concurrently
+READ_STATEMENT = re.compile(r'^\s*(SELECT|WITH|SHOW|DESCRIBE|DESC|EXPLAIN|LIST)\b', re.IGNORECASE)
+DEFAULT_CACHE_DIR = Path(os.getenv('XDG_CACHE_HOME', Path.home() / '.cache')) / 'careconnect-sql'
+
 def load_env_file(env_path):
     """Load environment variables from .env file"""
     env_vars = {}
@@ -26,9 +52,367 @@ def load_env_file(env_path):
                     env_vars[key.strip()] = value.strip()
     return env_vars
 
+def build_session(retries=3, backoff_factor=0.5, pool_size=10, idempotent=True):
+    """Keep-alive session whose connection pool is reused by every request
+    
+    Connection errors and RETRY_STATUSES are retried with exponential backoff,
+    honouring Retry-After. With idempotent=False only requests the server cannot
+    have accepted are resent: failed connects and SUBMIT_RETRY_STATUSES, never
+    read errors, so a submitted INSERT or MERGE does not run twice.
+    """
+    if idempotent:
+        # Statement cancel is the only POST sent here, and cancelling twice is harmless
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({'GET', 'POST', 'DELETE'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    else:
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            other=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=SUBMIT_RETRY_STATUSES,
+            allowed_methods=frozenset({'POST'}),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def poll_delays(initial=0.25, maximum=5.0):
+    """Seconds to wait between status polls: initial, doubling up to maximum"""
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * 2, maximum)
+
+def statement_state(result):
+    return result.get('status', {}).get('state')
+
+def arrow_type(column):
+    """Arrow type of a manifest schema column; types without a cast from text stay strings"""
+    import pyarrow as pa
+    
+    name = (column.get('type_name') or column.get('type_text') or 'STRING').upper()
+    if name.startswith('DECIMAL'):
+        precision, scale = column.get('type_precision'), column.get('type_scale')
+        if precision is None:
+            match = re.search(r'\((\d+)\s*,\s*(\d+)\)', column.get('type_text', ''))
+            precision, scale = (int(match[1]), int(match[2])) if match else (10, 0)
+        return pa.decimal128(precision, scale or 0)
+    return {
+        'BOOLEAN': pa.bool_(),
+        'BYTE': pa.int8(), 'TINYINT': pa.int8(),
+        'SHORT': pa.int16(), 'SMALLINT': pa.int16(),
+        'INT': pa.int32(), 'INTEGER': pa.int32(),
+        'LONG': pa.int64(), 'BIGINT': pa.int64(),
+        'FLOAT': pa.float32(),
+        'DOUBLE': pa.float64(),
+        'DATE': pa.date32(),
+        'TIMESTAMP': pa.timestamp('us', tz='UTC'),
+        'TIMESTAMP_NTZ': pa.timestamp('us')
+    }.get(name, pa.string())
+
+def result_schema(result):
+    """Arrow schema of a statement result from its manifest"""
+    import pyarrow as pa
+    
+    columns = result.get('manifest', {}).get('schema', {}).get('columns', [])
+    return pa.schema([pa.field(col['name'], arrow_type(col)) for col in columns])
+
+def decode_column(strings, target):
+    """Arrow array of target type from a string array, parsed in one vectorized cast
+    
+    Values the cast cannot parse leave the column as strings rather than failing the
+    whole result.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    if target == pa.string():
+        return strings
+    try:
+        return strings.cast(target)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        if pa.types.is_timestamp(target) and target.tz:
+            # Timestamps without a zone offset are taken as UTC
+            try:
+                naive = pc.replace_substring_regex(strings, r'Z$', '').cast(pa.timestamp(target.unit))
+                return naive.cast(target)
+            except pa.ArrowInvalid:
+                pass
+        return strings
+
+def rows_to_batch(rows, schema, fallback=True):
+    """Typed record batch of JSON_ARRAY rows per the result schema
+    
+    With fallback, a column whose values do not parse stays strings (see decode_column).
+    Without it the batch always has exactly schema, as every chunk of a streamed
+    result must, and such a column raises ValueError.
+    """
+    import pyarrow as pa
+    
+    # One pass over the nested lists in Arrow, then a strided take per column
+    width = len(schema)
+    try:
+        values = pa.array(rows, pa.list_(pa.string())).flatten()
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        # Non-string JSON values (not sent by the API, but by some stand-ins) as their JSON text
+        values = pa.array([v if v is None or isinstance(v, str) else json.dumps(v) for row in rows for v in row],
+                          pa.string())
+    if len(values) != len(rows) * width:
+        raise ValueError(f"Result rows do not all have {width} values")
+    arrays = [decode_column(values.take(np.arange(i, len(values), width)), field.type)
+              for i, field in enumerate(schema)]
+    if not fallback:
+        for array, field in zip(arrays, schema):
+            if array.type != field.type:
+                raise ValueError(f"Column {field.name} has values that do not parse as {field.type}")
+    return pa.RecordBatch.from_arrays(arrays, names=schema.names)
+
+def pandas_dtype(arrow_type):
+    """Nullable pandas dtype for an Arrow type, or None for the default conversion"""
+    import pyarrow as pa
+    
+    if pa.types.is_decimal(arrow_type):
+        # pd.ArrowDtype is experimental before pandas 2.0; older pandas keeps Decimal objects
+        return pd.ArrowDtype(arrow_type) if int(pd.__version__.split('.')[0]) >= 2 else None
+    return {
+        pa.bool_(): pd.BooleanDtype(),
+        pa.int8(): pd.Int8Dtype(),
+        pa.int16(): pd.Int16Dtype(),
+        pa.int32(): pd.Int32Dtype(),
+        pa.int64(): pd.Int64Dtype(),
+        pa.float32(): pd.Float32Dtype(),
+        pa.float64(): pd.Float64Dtype()
+    }.get(arrow_type)
+
+def table_to_frame(table):
+    """DataFrame of an Arrow table with nullable numeric and boolean columns and datetime64 dates"""
+    return table.to_pandas(types_mapper=pandas_dtype, date_as_object=False)
+
+def display_frame(df):
+    """df with missing values as None; tabulate before 0.10 (the last for Python 3.9) fails on pd.NA"""
+    return df.astype(object).where(df.notna(), None)
+
+def write_batches(batches, path, output_format):
+    """Write record batches to csv, jsonl or parquet as they arrive; returns rows written
+    
+    Only the current batch is held in memory. Nothing is written when there are no
+    batches; an empty batch still writes the CSV header or Parquet schema. Every batch
+    is cast to the schema of the first, so a file never mixes types; a batch that
+    cannot be cast raises pyarrow.ArrowInvalid. Batches go to a .partial file that
+    replaces path only once all of them are written, so an error never leaves a
+    truncated file behind.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+    
+    partial = f"{path}.partial"
+    writer, jsonl, rows = None, None, 0
+    try:
+        for batch in batches:
+            if output_format == 'jsonl':
+                jsonl = jsonl or open(partial, 'w')
+                for record in batch.to_pylist():
+                    jsonl.write(json.dumps(record, default=str) + '\n')
+            else:
+                if writer is None:
+                    schema = batch.schema
+                    writer = (pa_csv.CSVWriter(partial, schema) if output_format == 'csv'
+                              else pq.ParquetWriter(partial, schema, compression='zstd'))
+                if not batch.schema.equals(schema):
+                    batch = pa.Table.from_batches([batch]).cast(schema)
+                writer.write(batch)
+            rows += batch.num_rows
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if jsonl is not None:
+            jsonl.close()
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    if writer is not None or jsonl is not None:
+        (writer or jsonl).close()
+        os.replace(partial, path)
+    return rows
+
+class StatementError(Exception):
+    """A statement was rejected, failed, was cancelled or timed out; the reason was already printed"""
+
+def split_sql_statements(text):
+    """(label, statement) pairs of a SQL script, split on semicolons outside quotes and comments
+    
+    Comments are dropped from the statements. A statement's label is the first line
+    of the comment block directly above it, or else its own first line.
+    """
+    statements, sql, block = [], [], []
+    line_has_content = False
+    
+    def flush():
+        statement = ''.join(sql).strip()
+        if statement:
+            statements.append((block[0] if block else statement.splitlines()[0], statement))
+        sql.clear()
+        block.clear()
+    
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if text.startswith('--', i):
+            end = text.find('\n', i)
+            end = n if end < 0 else end
+            # Only whole-line comments label the next statement
+            if not line_has_content and not ''.join(sql).strip() and text[i + 2:end].strip():
+                block.append(text[i + 2:end].strip())
+            line_has_content = True
+            i = end
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            end = n if end < 0 else end + 2
+            sql.append(' ')
+            line_has_content = True
+            i = end
+        elif ch in '\'"`':
+            j = i + 1
+            while j < n and text[j] != ch:
+                j += 2 if text[j] == '\\' and ch != '`' else 1
+            sql.append(text[i:j + 1])
+            i = j + 1
+        elif ch == ';':
+            flush()
+            i += 1
+        else:
+            if ch == '\n':
+                # A blank line ends the comment block above the next statement
+                if not line_has_content and not ''.join(sql).strip():
+                    block.clear()
+                line_has_content = False
+            elif not ch.isspace():
+                line_has_content = True
+            sql.append(ch)
+            i += 1
+    flush()
+    return statements
+
+def statement_phases(statements):
+    """Indices of statements grouped into runs of reads; any other statement runs alone, in order"""
+    phases = []
+    for i, (_, statement) in enumerate(statements):
+        if READ_STATEMENT.match(statement) and phases and READ_STATEMENT.match(statements[phases[-1][-1]][1]):
+            phases[-1].append(i)
+        else:
+            phases.append([i])
+    return phases
+
+def normalize_sql(query):
+    """Query text with case and whitespace folded outside quotes and no trailing semicolon"""
+    parts = QUOTED_SQL.split(query.strip().rstrip(';').strip())
+    # Odd parts are the quoted captures
+    return ''.join(part if i % 2 else re.sub(r'\s+', ' ', part).lower() for i, part in enumerate(parts))
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=3600, max_bytes=256 * 1024 ** 2):
+        """Statement results on disk as zstd Parquet, one file per entry
+        
+        An entry's mtime is when it was stored and its atime when it was last read:
+        entries older than ttl seconds are misses, and the least recently read entries
+        are evicted once the directory exceeds max_bytes.
+        """
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+    
+    def key(self, query, warehouse_id, catalog=None):
+        text = json.dumps([normalize_sql(query), warehouse_id, catalog])
+        return hashlib.sha256(text.encode()).hexdigest()
+    
+    def path(self, key):
+        return self.directory / f"{key}.parquet"
+    
+    def get(self, key):
+        """Cached DataFrame for key with its age in seconds, or None when missing or expired"""
+        import pyarrow.parquet as pq
+        
+        path = self.path(key)
+        try:
+            stored = path.stat().st_mtime
+            age = time.time() - stored
+            if age > self.ttl:
+                path.unlink()
+                raise FileNotFoundError(path)
+            df = table_to_frame(pq.read_table(path))
+            os.utime(path, (time.time(), stored))
+        except (OSError, ValueError):
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return df, age
+    
+    def put(self, key, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        # Written aside and renamed so concurrent readers never see a partial file
+        partial = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), partial, compression='zstd')
+        os.replace(partial, path)
+        self.stats['stores'] += 1
+        self.evict()
+    
+    def evict(self):
+        """Remove expired entries, then least recently read ones until under max_bytes"""
+        now = time.time()
+        entries = []
+        for path in self.directory.glob('*.parquet'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                self.stats['evictions'] += 1
+            else:
+                entries.append((stat.st_atime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats['evictions'] += 1
+    
+    def clear(self):
+        for path in self.directory.glob('*.parquet'):
+            path.unlink(missing_ok=True)
+
 class DatabricksSQL:
-    def __init__(self, token=None, workspace=None):
-        """Initialize Databricks SQL client"""
+    def __init__(self, token=None, workspace=None, warehouse_id=None, base_url=None,
+                 retries=3, backoff_factor=0.5, pool_size=10, catalog=None, cache=None,
+                 cache_queries=False, refresh_cache=False):
+        """Initialize Databricks SQL client
+        
+        base_url overrides https://<workspace>, e.g. http://localhost:8080 for a local
+        stand-in server. warehouse_id skips warehouse discovery entirely. catalog is
+        the default catalog of every statement.
+        
+        cache is a ResultCache for SHOW/DESCRIBE results, and for data queries too
+        with cache_queries. refresh_cache runs every statement and overwrites its entry.
+        """
         # Load environment variables from frontend .env file
         project_root = Path(__file__).parent.parent
         env_file = project_root / 'frontend' / '.env'
@@ -49,53 +433,335 @@ class DatabricksSQL:
             print("   Or provide --token and --workspace arguments")
             sys.exit(1)
             
-        self.base_url = f"https://{self.workspace}"
+        self.base_url = (base_url or f"https://{self.workspace}").rstrip('/')
         self.headers = {
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/json'
         }
+        self.session = build_session(retries, backoff_factor, pool_size)
+        self.session.headers.update(self.headers)
+        # Statement submissions are not idempotent and get the narrower retry policy
+        self.submit_session = build_session(retries, backoff_factor, pool_size, idempotent=False)
+        self.submit_session.headers.update(self.headers)
+        # Presigned result links must not receive the workspace token
+        self.download_session = build_session(retries, backoff_factor, pool_size)
+        self.warehouse_id = warehouse_id
+        self.catalog = catalog
+        self.cache = cache
+        self.cache_queries = cache_queries
+        self.refresh_cache = refresh_cache
+        # Endpoint -> seconds per request, including retries
+        self.latencies = defaultdict(list)
+    
+    def request(self, method, path, endpoint=None, session=None, **kwargs):
+        """Send a request on the pooled session and record its latency under endpoint (default path)"""
+        start = time.perf_counter()
+        try:
+            return (session or self.session).request(method, f"{self.base_url}{path}", **kwargs)
+        finally:
+            self.latencies[f"{method} {endpoint or path}"].append(time.perf_counter() - start)
+    
+    def latency_stats(self):
+        """Request count and latency percentiles (ms) per endpoint"""
+        rows = []
+        for endpoint, samples in sorted(self.latencies.items()):
+            ms = pd.Series(samples) * 1000
+            rows.append({
+                'endpoint': endpoint,
+                'requests': len(ms),
+                'total_ms': round(ms.sum(), 1),
+                'mean_ms': round(ms.mean(), 1),
+                'p50_ms': round(ms.quantile(0.5), 1),
+                'p95_ms': round(ms.quantile(0.95), 1),
+                'p99_ms': round(ms.quantile(0.99), 1),
+                'max_ms': round(ms.max(), 1)
+            })
+        return pd.DataFrame(rows, columns=['endpoint', 'requests', 'total_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+    
+    def print_latency_stats(self):
+        stats = self.latency_stats()
+        if stats.empty:
+            print("ℹ️  No requests sent")
+            return
+        print("\n⏱️  Request latency:")
+        print(tabulate(stats, headers='keys', tablefmt='grid', showindex=False))
+    
+    def cacheable(self, query):
+        return self.cache is not None and (self.cache_queries or bool(METADATA_STATEMENT.match(query)))
+    
+    def cached_result(self, query, warehouse_id):
+        """DataFrame of an earlier identical statement, or None when it must run"""
+        if self.refresh_cache or not self.cacheable(query):
+            return None
+        entry = self.cache.get(self.cache.key(query, warehouse_id, self.catalog))
+        if entry is None:
+            return None
+        df, age = entry
+        print(f"♻️  Cached result ({age:.0f}s old)")
+        return df
+    
+    def store_result(self, query, warehouse_id, df):
+        if df is None or not self.cacheable(query):
+            return df
+        try:
+            self.cache.put(self.cache.key(query, warehouse_id, self.catalog), df)
+        except OSError as e:
+            print(f"⚠️  Could not cache result: {e}")
+        return df
+    
+    def print_cache_stats(self):
+        stats = self.cache.stats if self.cache is not None else {}
+        if not any(stats.values()):
+            return
+        print(f"\n💾 Result cache: {stats['hits']} hits, {stats['misses']} misses, "
+              f"{stats['stores']} stored, {stats['evictions']} evicted")
+    
+    def resolve_warehouse(self):
+        """Warehouse ID for statements, looked up once per client and cached"""
+        if self.warehouse_id:
+            return self.warehouse_id
         
-    def execute_sql(self, query, warehouse_id=None):
-        """Execute SQL query using Databricks SQL API"""
-        # Use default warehouse if not specified
-        if not warehouse_id:
-            warehouses = self.list_warehouses()
-            if warehouses:
-                warehouse_id = warehouses[0]['id']
-                print(f"ℹ️  Using warehouse: {warehouses[0]['name']} ({warehouse_id})")
-            else:
-                print("❌ No warehouses available")
-                return None
+        warehouses = self.list_warehouses()
+        if not warehouses:
+            print("❌ No warehouses available")
+            return None
+        self.warehouse_id = warehouses[0]['id']
+        print(f"ℹ️  Using warehouse: {warehouses[0]['name']} ({self.warehouse_id})")
+        return self.warehouse_id
+    
+    def submit_statement(self, query, warehouse_id, wait_timeout='10s', disposition='INLINE',
+                         result_format='JSON_ARRAY'):
+        """Submit a statement, waiting up to wait_timeout for it to finish inline
         
-        # Execute query
-        url = f"{self.base_url}/api/2.0/sql/statements"
+        Returns the statement JSON, which may still be PENDING or RUNNING, or None
+        when the API rejects the request. disposition EXTERNAL_LINKS with
+        result_format ARROW_STREAM returns presigned links to Arrow IPC chunks.
+        """
         payload = {
             "statement": query,
             "warehouse_id": warehouse_id,
-            "wait_timeout": "30s"
+            "wait_timeout": wait_timeout,
+            "on_wait_timeout": "CONTINUE",
+            "disposition": disposition,
+            "format": result_format
         }
+        if self.catalog:
+            payload["catalog"] = self.catalog
+        response = self.request('POST', '/api/2.0/sql/statements', session=self.submit_session, json=payload)
+        if response.status_code != 200:
+            print(f"❌ SQL execution failed: {response.status_code}")
+            print(f"Response: {response.text}")
+            return None
+        return response.json()
+    
+    def get_statement(self, statement_id):
+        """Current status (and result, once finished) of a submitted statement"""
+        response = self.request('GET', f'/api/2.0/sql/statements/{statement_id}',
+                                endpoint='/api/2.0/sql/statements/{id}')
+        response.raise_for_status()
+        return response.json()
+    
+    def cancel_statement(self, statement_id):
+        response = self.request('POST', f'/api/2.0/sql/statements/{statement_id}/cancel',
+                                endpoint='/api/2.0/sql/statements/{id}/cancel')
+        return response.status_code == 200
+    
+    def wait_for_statement(self, result, timeout=None):
+        """Poll a submitted statement with backoff until it leaves PENDING/RUNNING
         
+        The statement is cancelled on the server on Ctrl-C or when timeout seconds
+        pass, in which case None is returned.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        delays = poll_delays()
         try:
-            print(f"🔍 Executing query...")
-            response = requests.post(url, headers=self.headers, json=payload)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return self.format_result(result)
-            else:
-                print(f"❌ SQL execution failed: {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
+            while statement_state(result) in PENDING_STATES:
+                if deadline and time.monotonic() >= deadline:
+                    self.cancel_statement(result['statement_id'])
+                    print(f"❌ Statement timed out after {timeout}s and was cancelled")
+                    return None
+                time.sleep(next(delays))
+                result = self.get_statement(result['statement_id'])
+        except KeyboardInterrupt:
+            self.cancel_statement(result['statement_id'])
+            raise
+        return result
+    
+    def finish_statement(self, result):
+        """DataFrame of a finished statement, or None after reporting why it has none"""
+        state = statement_state(result)
+        if state == 'SUCCEEDED':
+            return self.format_result(result)
+        message = result.get('status', {}).get('error', {}).get('message', '')
+        print(f"❌ Statement {(state or 'unknown').lower()}: {message}")
+        return None
+    
+    def execute_sql(self, query, warehouse_id=None, timeout=None):
+        """Execute SQL query using Databricks SQL API
+        
+        Statements still running after the inline wait are polled until they finish.
+        Results come from and go to the client's cache per its cache_mode.
+        """
+        # Use the client's warehouse if not specified
+        warehouse_id = warehouse_id or self.resolve_warehouse()
+        if not warehouse_id:
+            return None
+        cached = self.cached_result(query, warehouse_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            print("🔍 Executing query...")
+            result = self.submit_statement(query, warehouse_id)
+            if result is not None:
+                result = self.wait_for_statement(result, timeout)
+            return self.store_result(query, warehouse_id, self.finish_statement(result)) if result is not None else None
                 
-        except Exception as e:
+        except requests.RequestException as e:
             print(f"❌ Error executing SQL: {e}")
             return None
     
+    async def execute_sql_async(self, query, warehouse_id=None, timeout=None):
+        """Asynchronous execute_sql: submit, then poll with backoff without blocking the loop
+        
+        HTTP calls run on worker threads over the pooled session. Cancelling the task
+        (Ctrl-C under asyncio.run, or timeout) cancels the statement on the server too.
+        """
+        warehouse_id = warehouse_id or await asyncio.to_thread(self.resolve_warehouse)
+        if not warehouse_id:
+            return None
+        cached = self.cached_result(query, warehouse_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            print("🔍 Executing query...")
+            result = await asyncio.to_thread(self.submit_statement, query, warehouse_id)
+        except requests.RequestException as e:
+            print(f"❌ Error executing SQL: {e}")
+            return None
+        if result is None:
+            return None
+        
+        statement_id = result.get('statement_id')
+        
+        async def poll(result):
+            delays = poll_delays()
+            while statement_state(result) in PENDING_STATES:
+                await asyncio.sleep(next(delays))
+                result = await asyncio.to_thread(self.get_statement, statement_id)
+            return result
+        
+        try:
+            result = await asyncio.wait_for(poll(result), timeout)
+        except asyncio.TimeoutError:
+            await asyncio.to_thread(self.cancel_statement, statement_id)
+            print(f"❌ Statement timed out after {timeout}s and was cancelled")
+            return None
+        except asyncio.CancelledError:
+            await asyncio.to_thread(self.cancel_statement, statement_id)
+            raise
+        except requests.RequestException as e:
+            print(f"❌ Error polling statement {statement_id}: {e}")
+            return None
+        # Decoding fetches the remaining result chunks over HTTP, so keep it off the loop thread
+        try:
+            df = await asyncio.to_thread(self.finish_statement, result)
+        except requests.RequestException as e:
+            print(f"❌ Error fetching results of statement {statement_id}: {e}")
+            return None
+        return self.store_result(query, warehouse_id, df)
+    
+    async def execute_many_async(self, queries, concurrency=8, warehouse_id=None, timeout=None):
+        """Run queries concurrently, at most concurrency in flight; results follow query order"""
+        # Resolved before fan-out so concurrent statements share one lookup
+        warehouse_id = warehouse_id or await asyncio.to_thread(self.resolve_warehouse)
+        if not warehouse_id:
+            return [None] * len(queries)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(query):
+            async with semaphore:
+                return await self.execute_sql_async(query, warehouse_id, timeout)
+        
+        return await asyncio.gather(*(run(query) for query in queries))
+    
+    def execute_many(self, queries, concurrency=8, warehouse_id=None, timeout=None):
+        """Blocking wrapper around execute_many_async for scripts and the CLI"""
+        return asyncio.run(self.execute_many_async(queries, concurrency, warehouse_id, timeout))
+    
+    async def run_statements_async(self, statements, concurrency=8, warehouse_id=None, timeout=None):
+        """(seconds, DataFrame) per (label, statement) pair, in order
+        
+        Consecutive reads run concurrently, at most concurrency in flight; any other
+        statement waits for everything before it and runs alone. seconds excludes
+        time spent waiting for a free slot.
+        """
+        warehouse_id = warehouse_id or await asyncio.to_thread(self.resolve_warehouse)
+        if not warehouse_id:
+            return [(0.0, None)] * len(statements)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def run(statement):
+            async with semaphore:
+                start = time.perf_counter()
+                df = await self.execute_sql_async(statement, warehouse_id, timeout)
+                return time.perf_counter() - start, df
+        
+        results = [None] * len(statements)
+        for phase in statement_phases(statements):
+            timed = await asyncio.gather(*(run(statements[i][1]) for i in phase))
+            for i, result in zip(phase, timed):
+                results[i] = result
+        return results
+    
+    def run_file(self, path, output_dir=None, output_format='csv', concurrency=8, warehouse_id=None):
+        """Run every statement of a SQL script, write each result to its own file and report timings
+        
+        Results go to output_dir (default <script name>_results) as
+        <nn>_<label>.<output_format>. Returns the report DataFrame.
+        """
+        import pyarrow as pa
+        
+        statements = split_sql_statements(Path(path).read_text())
+        if not statements:
+            print(f"❌ No statements found in {path}")
+            return None
+        output_dir = Path(output_dir or f"{Path(path).stem}_results")
+        output_dir.mkdir(parents=True, exist_ok=True)
+        print(f"📜 Running {len(statements)} statements from {path}")
+        
+        start = time.perf_counter()
+        results = asyncio.run(self.run_statements_async(statements, concurrency, warehouse_id))
+        wall = time.perf_counter() - start
+        
+        rows = []
+        for i, ((label, _), (seconds, df)) in enumerate(zip(statements, results), 1):
+            output = None
+            if df is not None:
+                # The script's own "N." numbering would repeat the file index
+                slug = re.sub(r'[^a-z0-9]+', '_', re.sub(r'^\d+[.)]\s*', '', label).lower()).strip('_')[:40]
+                output = output_dir / f"{i:02d}_{slug}.{output_format}"
+                write_batches(pa.Table.from_pandas(df, preserve_index=False).to_batches(), output, output_format)
+            rows.append({
+                '#': i,
+                'statement': label[:50],
+                'seconds': round(seconds, 2),
+                'rows': len(df) if df is not None else None,
+                'output': output.name if output else 'no result'
+            })
+        report = pd.DataFrame(rows)
+        
+        print(f"\n⏱️  Statement report ({output_dir}):")
+        print(tabulate(report, headers='keys', tablefmt='grid', showindex=False))
+        print(f"✅ {report['rows'].notna().sum()}/{len(report)} statements returned rows; "
+              f"{wall:.1f}s wall time for {report['seconds'].sum():.1f}s of statements")
+        return report
+    
     def list_warehouses(self):
         """List available SQL warehouses"""
-        url = f"{self.base_url}/api/2.0/sql/warehouses"
         try:
-            response = requests.get(url, headers=self.headers)
+            response = self.request('GET', '/api/2.0/sql/warehouses')
             if response.status_code == 200:
                 return response.json().get('warehouses', [])
             else:
@@ -105,36 +771,115 @@ class DatabricksSQL:
             print(f"❌ Error listing warehouses: {e}")
             return []
     
+    def iter_chunks(self, result):
+        """Yield every result chunk of a finished statement, fetching the next one on demand
+        
+        Inline chunks carry data_array rows; with EXTERNAL_LINKS each yielded chunk
+        is one external link entry. Chunks are followed through
+        next_chunk_internal_link, so nothing past the first response is dropped.
+        """
+        chunk = result.get('result')
+        while chunk:
+            links = chunk.get('external_links')
+            entries = links if links is not None else [chunk]
+            yield from entries
+            next_link = entries[-1].get('next_chunk_internal_link') if entries else None
+            if not next_link:
+                return
+            response = self.request('GET', next_link, endpoint='/api/2.0/sql/statements/{id}/result/chunks/{n}')
+            response.raise_for_status()
+            chunk = response.json()
+    
+    def iter_batches(self, result):
+        """Yield a finished statement's rows as Arrow record batches, one chunk at a time
+        
+        A result without rows yields one empty batch of the manifest schema.
+        """
+        import pyarrow as pa
+        
+        schema = result_schema(result)
+        result_format = result.get('manifest', {}).get('format', 'JSON_ARRAY')
+        batches = 0
+        for chunk in self.iter_chunks(result):
+            if 'external_link' not in chunk:
+                batches += 1
+                yield rows_to_batch(chunk.get('data_array') or [], schema, fallback=False)
+                continue
+            
+            start = time.perf_counter()
+            response = self.download_session.get(chunk['external_link'], stream=True)
+            try:
+                response.raise_for_status()
+                if result_format == 'ARROW_STREAM':
+                    response.raw.decode_content = True
+                    for batch in pa.ipc.open_stream(response.raw):
+                        batches += 1
+                        yield batch
+                else:
+                    batches += 1
+                    yield rows_to_batch(response.json(), schema, fallback=False)
+            finally:
+                response.close()
+                self.latencies['GET external_link'].append(time.perf_counter() - start)
+        if not batches:
+            yield rows_to_batch([], schema, fallback=False)
+    
+    def stream_sql(self, query, warehouse_id=None, disposition='EXTERNAL_LINKS', result_format='ARROW_STREAM',
+                   timeout=None):
+        """Run query and yield its result as Arrow record batches with bounded memory
+        
+        Use disposition INLINE with result_format JSON_ARRAY where external links are
+        unavailable; inline chunks are still followed to the end. Raises StatementError
+        when the statement produces no result, and requests.RequestException when a
+        request fails.
+        """
+        warehouse_id = warehouse_id or self.resolve_warehouse()
+        if not warehouse_id:
+            raise StatementError("no warehouse")
+        
+        print("🔍 Executing query...")
+        result = self.submit_statement(query, warehouse_id, disposition=disposition, result_format=result_format)
+        if result is not None:
+            result = self.wait_for_statement(result, timeout)
+        if result is None:
+            raise StatementError("statement did not finish")
+        state = statement_state(result)
+        if state != 'SUCCEEDED':
+            self.finish_statement(result)
+            raise StatementError(f"statement {(state or 'unknown').lower()}")
+        yield from self.iter_batches(result)
+    
     def format_result(self, result):
-        """Format SQL query result for display"""
+        """Format SQL query result for display
+        
+        Columns are typed from the manifest schema: nullable integer, float and
+        boolean dtypes, datetime64 dates and timestamps, Arrow decimals.
+        """
+        import pyarrow as pa
+        
         if 'result' not in result:
             print("❌ No result data found")
             return None
-            
-        result_data = result['result']
         
-        # Get column names from manifest
-        manifest = result.get('manifest', {})
-        schema = manifest.get('schema', {})
-        columns = [col['name'] for col in schema.get('columns', [])]
+        # Get data rows from every chunk, not just the first response, decoded together
+        rows = [row for chunk in self.iter_chunks(result) for row in chunk.get('data_array') or []]
+        schema = result_schema(result)
         
-        # Get data rows
-        if 'data_array' in result_data and result_data['data_array']:
-            rows = result_data['data_array']
-            
-            # Create DataFrame for better formatting
-            if rows and columns:
-                df = pd.DataFrame(rows, columns=columns)
-                return df
-            else:
-                print("ℹ️  Query executed successfully but returned no data")
-                return None
+        # Create DataFrame for better formatting
+        if rows and schema:
+            df = table_to_frame(pa.Table.from_batches([rows_to_batch(rows, schema)]))
+            return df
         else:
             print("ℹ️  Query executed successfully but returned no data")
             return None
     
-    def explore_catalog(self, catalog_name="dais-hackathon-2025"):
-        """Explore datasets in the specified catalog"""
+    def explore_catalog(self, catalog_name="dais-hackathon-2025", concurrency=8):
+        """Explore datasets in the specified catalog
+        
+        Statements of each level (tables per schema, then describe and sample per
+        table) run concurrently, at most concurrency at a time; output keeps the
+        catalog order.
+        """
         print(f"🔍 Exploring catalog: {catalog_name}")
         print("=" * 50)
         
@@ -143,44 +888,47 @@ class DatabricksSQL:
         print(f"\n📁 Schemas in {catalog_name}:")
         schemas_result = self.execute_sql(schemas_query)
         
-        if schemas_result is not None:
-            print(tabulate(schemas_result, headers='keys', tablefmt='grid'))
-            
-            # Get schema names for further exploration
-            schema_names = schemas_result['namespace'].tolist() if 'namespace' in schemas_result.columns else []
+        if schemas_result is None:
+            return
+        print(tabulate(display_frame(schemas_result), headers='keys', tablefmt='grid'))
+        
+        # Get schema names for further exploration
+        schema_names = schemas_result['namespace'].tolist() if 'namespace' in schemas_result.columns else []
+        schema_names = schema_names[:3]  # Limit to first 3 schemas to avoid too much output
+        tables_results = self.execute_many([f"SHOW TABLES IN {catalog_name}.{schema}" for schema in schema_names],
+                                           concurrency)
+        
+        # Describe and sample the first 2 tables per schema in one batch
+        tables = []
+        for schema, tables_result in zip(schema_names, tables_results):
+            if tables_result is not None and 'tableName' in tables_result.columns:
+                tables += [(schema, table) for table in tables_result['tableName'].tolist()[:2]]
+        queries = []
+        for schema, table in tables:
+            queries += [f"DESCRIBE {catalog_name}.{schema}.{table}",
+                        f"SELECT * FROM {catalog_name}.{schema}.{table} LIMIT 5"]
+        details = iter(self.execute_many(queries, concurrency))
+        
+        for schema, tables_result in zip(schema_names, tables_results):
+            print(f"\n📋 Tables in {catalog_name}.{schema}:")
+            if tables_result is None:
+                continue
+            print(tabulate(display_frame(tables_result), headers='keys', tablefmt='grid'))
             
-            # Explore each schema
-            for schema in schema_names[:3]:  # Limit to first 3 schemas to avoid too much output
-                print(f"\n📋 Tables in {catalog_name}.{schema}:")
-                tables_query = f"SHOW TABLES IN {catalog_name}.{schema}"
-                tables_result = self.execute_sql(tables_query)
-                
-                if tables_result is not None:
-                    print(tabulate(tables_result, headers='keys', tablefmt='grid'))
-                    
-                    # Get table names
-                    table_names = tables_result['tableName'].tolist() if 'tableName' in tables_result.columns else []
+            for table in [t for s, t in tables if s == schema]:
+                describe_result, sample_result = next(details), next(details)
+                print(f"\n📊 Schema for {catalog_name}.{schema}.{table}:")
+                if describe_result is not None:
+                    print(tabulate(display_frame(describe_result), headers='keys', tablefmt='grid'))
                     
-                    # Describe first few tables
-                    for table in table_names[:2]:  # Limit to first 2 tables per schema
-                        print(f"\n📊 Schema for {catalog_name}.{schema}.{table}:")
-                        describe_query = f"DESCRIBE {catalog_name}.{schema}.{table}"
-                        describe_result = self.execute_sql(describe_query)
-                        
-                        if describe_result is not None:
-                            print(tabulate(describe_result, headers='keys', tablefmt='grid'))
-                            
-                        # Sample data
-                        print(f"\n📄 Sample data from {catalog_name}.{schema}.{table}:")
-                        sample_query = f"SELECT * FROM {catalog_name}.{schema}.{table} LIMIT 5"
-                        sample_result = self.execute_sql(sample_query)
-                        
-                        if sample_result is not None:
-                            print(tabulate(sample_result, headers='keys', tablefmt='grid'))
-                        
-                        print("\n" + "-" * 80 + "\n")
-    
-    def find_healthcare_datasets(self, catalog_name="dais-hackathon-2025"):
+                # Sample data
+                print(f"\n📄 Sample data from {catalog_name}.{schema}.{table}:")
+                if sample_result is not None:
+                    print(tabulate(display_frame(sample_result), headers='keys', tablefmt='grid'))
+                
+                print("\n" + "-" * 80 + "\n")
+    
+    def find_healthcare_datasets(self, catalog_name="dais-hackathon-2025", concurrency=8):
         """Find datasets relevant to healthcare/medical applications"""
         print(f"🏥 Searching for healthcare-related datasets in {catalog_name}")
         print("=" * 60)
@@ -196,69 +944,89 @@ class DatabricksSQL:
         schemas_query = f"SHOW SCHEMAS IN {catalog_name}"
         schemas_result = self.execute_sql(schemas_query)
         
-        if schemas_result is not None:
-            schema_names = schemas_result['namespace'].tolist() if 'namespace' in schemas_result.columns else []
-            
-            healthcare_tables = []
+        if schemas_result is None:
+            return
+        schema_names = schemas_result['namespace'].tolist() if 'namespace' in schemas_result.columns else []
+        
+        # Tables of every schema, listed concurrently
+        tables_results = self.execute_many([f"SHOW TABLES IN {catalog_name}.{schema}" for schema in schema_names],
+                                           concurrency)
+        
+        healthcare_tables = []
+        for schema, tables_result in zip(schema_names, tables_results):
+            if tables_result is None:
+                continue
+            table_names = tables_result['tableName'].tolist() if 'tableName' in tables_result.columns else []
             
-            for schema in schema_names:
-                # Get tables in schema
-                tables_query = f"SHOW TABLES IN {catalog_name}.{schema}"
-                tables_result = self.execute_sql(tables_query)
+            for table in table_names:
+                # Check if table name contains healthcare keywords
+                table_lower = table.lower()
+                schema_lower = schema.lower()
                 
-                if tables_result is not None:
-                    table_names = tables_result['tableName'].tolist() if 'tableName' in tables_result.columns else []
-                    
-                    for table in table_names:
-                        # Check if table name contains healthcare keywords
-                        table_lower = table.lower()
-                        schema_lower = schema.lower()
-                        
-                        for keyword in healthcare_keywords:
-                            if keyword in table_lower or keyword in schema_lower:
-                                healthcare_tables.append({
-                                    'catalog': catalog_name,
-                                    'schema': schema,
-                                    'table': table,
-                                    'full_name': f"{catalog_name}.{schema}.{table}",
-                                    'keyword_match': keyword
-                                })
-                                break
+                for keyword in healthcare_keywords:
+                    if keyword in table_lower or keyword in schema_lower:
+                        healthcare_tables.append({
+                            'catalog': catalog_name,
+                            'schema': schema,
+                            'table': table,
+                            'full_name': f"{catalog_name}.{schema}.{table}",
+                            'keyword_match': keyword
+                        })
+                        break
+        
+        if not healthcare_tables:
+            print("❌ No healthcare-related datasets found with obvious naming patterns")
+            print("💡 Try exploring the general catalog structure for other relevant data")
+            return
+        
+        print("🎯 Found potential healthcare datasets:")
+        healthcare_df = pd.DataFrame(healthcare_tables)
+        print(tabulate(healthcare_df, headers='keys', tablefmt='grid'))
+        
+        # Explore the most promising ones
+        print(f"\n📊 Detailed exploration of top healthcare datasets:")
+        top_tables = healthcare_tables[:3]  # Top 3
+        queries = []
+        for table_info in top_tables:
+            queries += [f"DESCRIBE {table_info['full_name']}", f"SELECT * FROM {table_info['full_name']} LIMIT 3"]
+        details = iter(self.execute_many(queries, concurrency))
+        
+        for i, table_info in enumerate(top_tables):
+            describe_result, sample_result = next(details), next(details)
+            print(f"\n{i+1}. {table_info['full_name']}")
+            print(f"   Matched keyword: {table_info['keyword_match']}")
             
-            if healthcare_tables:
-                print("🎯 Found potential healthcare datasets:")
-                healthcare_df = pd.DataFrame(healthcare_tables)
-                print(tabulate(healthcare_df, headers='keys', tablefmt='grid'))
-                
-                # Explore the most promising ones
-                print(f"\n📊 Detailed exploration of top healthcare datasets:")
-                for i, table_info in enumerate(healthcare_tables[:3]):  # Top 3
-                    full_name = table_info['full_name']
-                    print(f"\n{i+1}. {full_name}")
-                    print(f"   Matched keyword: {table_info['keyword_match']}")
-                    
-                    # Describe table
-                    describe_result = self.execute_sql(f"DESCRIBE {full_name}")
-                    if describe_result is not None:
-                        print(f"   Columns:")
-                        print(tabulate(describe_result, headers='keys', tablefmt='grid'))
-                    
-                    # Sample data
-                    sample_result = self.execute_sql(f"SELECT * FROM {full_name} LIMIT 3")
-                    if sample_result is not None:
-                        print(f"   Sample data:")
-                        print(tabulate(sample_result, headers='keys', tablefmt='grid'))
-                    
-                    print("\n" + "-" * 60)
-            else:
-                print("❌ No healthcare-related datasets found with obvious naming patterns")
-                print("💡 Try exploring the general catalog structure for other relevant data")
+            # Describe table
+            if describe_result is not None:
+                print(f"   Columns:")
+                print(tabulate(display_frame(describe_result), headers='keys', tablefmt='grid'))
+            
+            # Sample data
+            if sample_result is not None:
+                print(f"   Sample data:")
+                print(tabulate(display_frame(sample_result), headers='keys', tablefmt='grid'))
+            
+            print("\n" + "-" * 60)
 
 def main():
     parser = argparse.ArgumentParser(description='Databricks SQL CLI for CareConnect')
     parser.add_argument('--token', help='Databricks personal access token')
     parser.add_argument('--workspace', help='Databricks workspace URL')
     parser.add_argument('--catalog', default='dais-hackathon-2025', help='Catalog to explore')
+    parser.add_argument('--base-url', default=os.getenv('DATABRICKS_BASE_URL'),
+                        help='API base URL (default $DATABRICKS_BASE_URL or https://<workspace>), e.g. a local stand-in')
+    parser.add_argument('--warehouse-id', help='Warehouse ID for every statement (skips discovery)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='Retries for connection errors and 429/5xx (429/503 only for statement submissions)')
+    parser.add_argument('--stats', action='store_true', help='Print per-endpoint request latency at the end')
+    parser.add_argument('--concurrency', type=int, default=8, help='Statements in flight at once when exploring')
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR), help='Result cache directory')
+    parser.add_argument('--cache-ttl', type=int, default=3600, help='Seconds a cached result stays valid')
+    parser.add_argument('--cache-size-mb', type=int, default=256, help='Result cache size before LRU eviction')
+    parser.add_argument('--cache-queries', action='store_true',
+                        help='Cache data queries too, not only SHOW/DESCRIBE metadata statements')
+    parser.add_argument('--refresh-cache', action='store_true', help='Run every statement and overwrite its cached result')
+    parser.add_argument('--no-cache', action='store_true', help='Neither read nor write the result cache')
     
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -266,6 +1034,19 @@ def main():
     sql_parser = subparsers.add_parser('sql', help='Execute SQL query')
     sql_parser.add_argument('query', help='SQL query to execute')
     sql_parser.add_argument('--warehouse', help='Warehouse ID to use')
+    sql_parser.add_argument('--output', help='Stream all rows to this file (.csv, .jsonl or .parquet) instead of printing')
+    sql_parser.add_argument('--output-format', choices=sorted(set(OUTPUT_FORMATS.values())),
+                            help='Output file format (default: from the --output extension)')
+    sql_parser.add_argument('--inline', action='store_true',
+                            help='Fetch --output results as inline JSON chunks instead of Arrow external links')
+    
+    # Run-file command
+    run_file_parser = subparsers.add_parser('run-file', help='Run every statement of a SQL script')
+    run_file_parser.add_argument('path', help='SQL script, statements separated by semicolons')
+    run_file_parser.add_argument('--output-dir', help='Directory for per-statement results (default: <script>_results)')
+    run_file_parser.add_argument('--output-format', choices=sorted(set(OUTPUT_FORMATS.values())), default='csv',
+                                 help='Format of each result file')
+    run_file_parser.add_argument('--warehouse', help='Warehouse ID to use')
     
     # Explore command
     explore_parser = subparsers.add_parser('explore', help='Explore catalog structure')
@@ -285,21 +1066,59 @@ def main():
         return
     
     # Initialize client
-    client = DatabricksSQL(token=args.token, workspace=args.workspace)
+    cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_ttl, args.cache_size_mb * 1024 ** 2)
+    client = DatabricksSQL(token=args.token, workspace=args.workspace, warehouse_id=args.warehouse_id,
+                           base_url=args.base_url, retries=args.retries,
+                           pool_size=max(10, args.concurrency), cache=cache,
+                           cache_queries=args.cache_queries, refresh_cache=args.refresh_cache)
     
-    if args.command == 'sql':
+    try:
+        run_command(client, args)
+    except KeyboardInterrupt:
+        # Running statements were already cancelled on the server
+        print("\n⚠️  Interrupted")
+        sys.exit(130)
+    finally:
+        client.print_cache_stats()
+        if args.stats:
+            client.print_latency_stats()
+
+def run_command(client, args):
+    if args.command == 'sql' and args.output:
+        output_format = args.output_format or OUTPUT_FORMATS.get(Path(args.output).suffix.lower())
+        if output_format is None:
+            print(f"❌ Cannot tell the output format of {args.output}; use --output-format")
+            return
+        disposition, result_format = ('INLINE', 'JSON_ARRAY') if args.inline else ('EXTERNAL_LINKS', 'ARROW_STREAM')
+        batches = client.stream_sql(args.query, args.warehouse, disposition, result_format)
+        try:
+            rows = write_batches(batches, args.output, output_format)
+        except StatementError as e:
+            print(f"❌ Nothing written to {args.output}: {e}")
+            sys.exit(1)
+        except (ValueError, requests.RequestException) as e:
+            print(f"❌ Could not write {args.output}: {e}")
+            sys.exit(1)
+        print(f"💾 Wrote {rows:,} rows to {args.output}")
+    
+    elif args.command == 'sql':
         result = client.execute_sql(args.query, args.warehouse)
         if result is not None:
             print("\n📋 Query Results:")
-            print(tabulate(result, headers='keys', tablefmt='grid'))
+            print(tabulate(display_frame(result.head(MAX_DISPLAY_ROWS)), headers='keys', tablefmt='grid'))
+            if len(result) > MAX_DISPLAY_ROWS:
+                print(f"ℹ️  Showing {MAX_DISPLAY_ROWS} of {len(result):,} rows; use --output to save them all")
+    
+    elif args.command == 'run-file':
+        client.run_file(args.path, args.output_dir, args.output_format, args.concurrency, args.warehouse)
     
     elif args.command == 'explore':
         catalog = getattr(args, 'catalog', 'dais-hackathon-2025')
-        client.explore_catalog(catalog)
+        client.explore_catalog(catalog, args.concurrency)
     
     elif args.command == 'healthcare':
         catalog = getattr(args, 'catalog', 'dais-hackathon-2025')
-        client.find_healthcare_datasets(catalog)
+        client.find_healthcare_datasets(catalog, args.concurrency)
     
     elif args.command == 'warehouses':
         warehouses = client.list_warehouses()
@@ -44,7 +44,8 @@ class DatabricksCatalogExplorer:
             print("   Required variables: REACT_APP_DATABRICKS_TOKEN, REACT_APP_DATABRICKS_WORKSPACE")
             sys.exit(1)
         
-        self.base_url = f"https://{self.workspace}"
+        # DATABRICKS_BASE_URL points the explorer at a local stand-in (fake_databricks_server.py)
+        self.base_url = os.getenv('DATABRICKS_BASE_URL', f"https://{self.workspace}").rstrip('/')
         self.headers = {
             'Authorization': f'Bearer {self.token}',
             'Content-Type': 'application/json'
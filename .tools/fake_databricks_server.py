@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Databricks SQL warehouse, Statement Execution and Unity Catalog APIs
+Statements run on an in-memory SQLite copy of synthetic google_maps_businesses data, go
+through PENDING and RUNNING like on a warehouse, and return chunked INLINE or
+EXTERNAL_LINKS results, so the .tools scripts can be run and timed without a workspace.
+"""
+
+import argparse
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+
+CATALOG = 'dais-hackathon-2025'
+WAREHOUSE = {'id': 'local-sqlite', 'name': 'Local SQLite Warehouse', 'state': 'RUNNING',
+             'cluster_size': 'X-Small', 'num_clusters': 1}
+
+# Mix of benchmarks/synthetic_data.py, condensed: ~7.8% healthcare rows with the top categories'
+# shares, the rest spread over everyday businesses
+HEALTHCARE_CATEGORIES = [
+    ('Dentist', 0.220), ('Doctor', 0.160), ('Medical clinic', 0.136), ('Pharmacy', 0.118),
+    ('Mental health service', 0.031), ('Home health care service', 0.031),
+    ('Physical therapy clinic', 0.023), ('Medical Center', 0.017), ('Hospital', 0.012),
+    ('Urgent care center', 0.012), ('Chiropractic clinic', 0.012), ('Optometry clinic', 0.010),
+]
+OTHER_CATEGORIES = [
+    'Restaurant', 'Coffee shop', 'Hair salon', 'Auto repair shop', 'Gas station', 'Grocery store',
+    'Bank', 'Hotel', 'Gym', 'Church', 'Real estate agency', 'Lawyer', 'Bakery', 'Bar'
+]
+HEALTHCARE_FRACTION = 388102 / 5000000
+NAME_PREFIXES = ['Sunrise', 'Main Street', 'Valley', 'Lakeside', 'Summit', 'Riverside', 'Oak', 'Harbor']
+# No healthcare keywords, so names never classify non-healthcare rows as healthcare
+NAME_SUFFIXES = ['Group', 'Center', 'Services', 'Works', 'Outlet', 'Supply', 'Associates', 'Express']
+METRO_CENTERS = [(40.71, -74.01), (34.05, -118.24), (41.88, -87.63), (29.76, -95.37), (33.45, -112.07),
+                 (37.77, -122.42), (47.61, -122.33), (25.76, -80.19), (33.75, -84.39), (42.36, -71.06)]
+STATES = ['NY', 'CA', 'IL', 'TX', 'AZ', 'CA', 'WA', 'FL', 'GA', 'MA']
+
+# schema -> table -> [(column, type_text)]; type_name is type_text without parameters
+TABLES = {
+    'bright_initiative': {
+        'google_maps_businesses': [
+            ('business_id', 'BIGINT'), ('name', 'STRING'), ('category', 'STRING'), ('address', 'STRING'),
+            ('latitude', 'DOUBLE'), ('longitude', 'DOUBLE'), ('rating', 'DOUBLE'), ('reviews_count', 'BIGINT'),
+            ('phone', 'STRING'), ('website', 'STRING'),
+        ],
+    },
+    'healthcare_reference': {
+        'provider_categories': [('category', 'STRING'), ('is_healthcare', 'BOOLEAN'), ('share', 'DOUBLE')],
+    },
+}
+TYPE_NAMES = {'BIGINT': 'LONG', 'INT': 'INT', 'DOUBLE': 'DOUBLE', 'STRING': 'STRING', 'BOOLEAN': 'BOOLEAN'}
+# SQLite column affinities; a STRING column would get NUMERIC affinity and turn phone numbers into integers
+SQLITE_TYPES = {'BIGINT': 'INTEGER', 'INT': 'INTEGER', 'DOUBLE': 'REAL', 'STRING': 'TEXT', 'BOOLEAN': 'INTEGER'}
+
+# Catalog prefix of qualified names; SQLite resolves the remaining schema.table itself
+CATALOG_PREFIX = re.compile(r'`?' + re.escape(CATALOG) + r'`?\.')
+SHOW_SCHEMAS = re.compile(r'^SHOW\s+(?:SCHEMAS|DATABASES)(?:\s+(?:IN|FROM)\s+(\S+))?$', re.IGNORECASE)
+SHOW_TABLES = re.compile(r'^SHOW\s+TABLES(?:\s+(?:IN|FROM)\s+(\S+))?$', re.IGNORECASE)
+DESCRIBE = re.compile(r'^(?:DESCRIBE|DESC)(?:\s+TABLE)?(?:\s+EXTENDED)?\s+(\S+)$', re.IGNORECASE)
+SHOW_COLUMNS = re.compile(r'^SHOW\s+COLUMNS\s+(?:IN|FROM)\s+(\S+)$', re.IGNORECASE)
+WAIT_TIMEOUT = re.compile(r'^(\d+)s$')
+
+
+def synthetic_businesses(n_rows, seed=42):
+    """Rows of google_maps_businesses, in TABLES column order"""
+    rng = np.random.default_rng(seed)
+    healthcare = rng.random(n_rows) < HEALTHCARE_FRACTION
+    names, shares = zip(*HEALTHCARE_CATEGORIES)
+    shares = np.array(shares) / sum(shares)
+    category = np.where(healthcare, np.array(names)[rng.choice(len(names), n_rows, p=shares)],
+                        np.array(OTHER_CATEGORIES)[rng.integers(0, len(OTHER_CATEGORIES), n_rows)]).astype(object)
+    metro = rng.integers(0, len(METRO_CENTERS), n_rows)
+    centers = np.array(METRO_CENTERS)[metro]
+    latitude = np.round(centers[:, 0] + rng.normal(0, 0.4, n_rows), 6)
+    longitude = np.round(centers[:, 1] + rng.normal(0, 0.5, n_rows), 6)
+    rating = np.round(1.0 + rng.random(n_rows) * 4, 1).astype(object)
+    reviews = np.floor(np.exp(rng.random(n_rows) * 8)).astype(np.int64).astype(object)
+    unrated = rng.random(n_rows) < 0.12
+    rating[unrated] = None
+    reviews[unrated] = None
+    
+    ids = np.arange(n_rows)
+    name = (np.array(NAME_PREFIXES)[rng.integers(0, len(NAME_PREFIXES), n_rows)].astype(object) + ' '
+            + np.array(NAME_SUFFIXES)[rng.integers(0, len(NAME_SUFFIXES), n_rows)].astype(object))
+    address = [f"{i % 9999 + 1} Main St, Springfield, {STATES[m]} {i % 99999:05d}" for i, m in zip(ids, metro)]
+    phone = np.where(rng.random(n_rows) < 0.053, None, [f"+1{i:010d}" for i in ids])
+    website = np.where(rng.random(n_rows) < 0.453, None, [f"https://example.com/biz/{i}" for i in ids])
+    return list(zip(ids.tolist(), name, category, address, latitude.tolist(), longitude.tolist(), rating,
+                    reviews, phone, website))
+
+
+def provider_categories():
+    total = sum(share for _, share in HEALTHCARE_CATEGORIES)
+    return ([(name, 1, round(share / total, 4)) for name, share in HEALTHCARE_CATEGORIES]
+            + [(name, 0, 0.0) for name in OTHER_CATEGORIES])
+
+
+class Warehouse:
+    def __init__(self, rows=100_000, seed=42, slots=4, latency=0.2, chunk_rows=5000):
+        """SQLite-backed warehouse running at most slots statements at once
+        
+        Each statement sleeps about latency seconds (uniform 0.5x-1.5x) in RUNNING
+        before its query, and its result is split into chunks of chunk_rows rows.
+        """
+        self.latency = latency
+        self.chunk_rows = chunk_rows
+        self.statements = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.pool = ThreadPoolExecutor(max_workers=slots, thread_name_prefix='warehouse')
+        # Shared-cache in-memory databases, one per schema; this connection keeps them alive
+        self.keeper = self.connect()
+        data = {'google_maps_businesses': synthetic_businesses(rows, seed),
+                'provider_categories': provider_categories()}
+        for schema, tables in TABLES.items():
+            for table, columns in tables.items():
+                self.keeper.execute(f"CREATE TABLE {schema}.{table} ({', '.join(f'{c} {SQLITE_TYPES[t]}' for c, t in columns)})")
+                self.keeper.executemany(f"INSERT INTO {schema}.{table} VALUES ({', '.join('?' * len(columns))})",
+                                        data[table])
+        self.keeper.commit()
+    
+    @staticmethod
+    def connect():
+        connection = sqlite3.connect('file::memory:', uri=True, check_same_thread=False)
+        for schema in TABLES:
+            connection.execute(f"ATTACH DATABASE 'file:{schema}?mode=memory&cache=shared' AS {schema}")
+        return connection
+    
+    def connection(self):
+        if not hasattr(self.local, 'connection'):
+            self.local.connection = self.connect()
+        return self.local.connection
+    
+    def submit(self, query, disposition='INLINE', result_format='JSON_ARRAY'):
+        statement = {'id': uuid.uuid4().hex, 'query': query.strip().rstrip(';').strip(), 'state': 'PENDING',
+                     'disposition': disposition, 'format': result_format, 'done': threading.Event()}
+        with self.lock:
+            self.statements[statement['id']] = statement
+        self.pool.submit(self.run, statement)
+        return statement
+    
+    def run(self, statement):
+        with self.lock:
+            if statement['state'] != 'PENDING':
+                return
+            statement['state'] = 'RUNNING'
+        # Cancelling sets done, which ends the simulated run time early
+        if statement['done'].wait(self.latency * (0.5 + random.random())):
+            return
+        try:
+            columns, rows = self.execute(statement['query'])
+            outcome = {'state': 'SUCCEEDED', 'columns': columns, 'rows': rows}
+        except (sqlite3.Error, KeyError, ValueError) as e:
+            outcome = {'state': 'FAILED', 'error': str(e)}
+        with self.lock:
+            if statement['state'] == 'RUNNING':
+                statement.update(outcome)
+        statement['done'].set()
+    
+    def cancel(self, statement_id):
+        statement = self.statements[statement_id]
+        with self.lock:
+            if statement['state'] in ('PENDING', 'RUNNING'):
+                statement['state'] = 'CANCELED'
+        statement['done'].set()
+    
+    def execute(self, query):
+        """([(column, type_text)], rows) of a statement; metadata statements are answered from TABLES"""
+        if match := SHOW_SCHEMAS.match(query):
+            return [('namespace', 'STRING')], [(schema,) for schema in TABLES]
+        if match := SHOW_TABLES.match(query):
+            schema = split_name(match[1] or 'bright_initiative')[-1]
+            return ([('database', 'STRING'), ('tableName', 'STRING'), ('isTemporary', 'BOOLEAN')],
+                    [(schema, table, False) for table in TABLES[schema]])
+        if match := DESCRIBE.match(query) or SHOW_COLUMNS.match(query):
+            schema, table = split_name(match[1])[-2:]
+            if query.upper().startswith('SHOW'):
+                return [('col_name', 'STRING')], [(c,) for c, _ in TABLES[schema][table]]
+            return ([('col_name', 'STRING'), ('data_type', 'STRING'), ('comment', 'STRING')],
+                    [(c, t.lower(), None) for c, t in TABLES[schema][table]])
+        
+        cursor = self.connection().execute(CATALOG_PREFIX.sub('', query))
+        rows = cursor.fetchall()
+        names = [d[0] for d in cursor.description or []]
+        return [(name, infer_type(rows, i)) for i, name in enumerate(names)], rows
+    
+    def manifest(self, statement):
+        columns = statement['columns']
+        rows = len(statement['rows'])
+        chunks = [{'chunk_index': i, 'row_offset': offset, 'row_count': min(self.chunk_rows, rows - offset)}
+                  for i, offset in enumerate(range(0, rows, self.chunk_rows))]
+        return {
+            'format': statement['format'],
+            'schema': {
+                'column_count': len(columns),
+                'columns': [{'name': name, 'type_text': type_text, 'type_name': TYPE_NAMES[type_text], 'position': i}
+                            for i, (name, type_text) in enumerate(columns)]
+            },
+            'total_chunk_count': len(chunks),
+            'chunks': chunks,
+            'total_row_count': rows,
+            'truncated': False
+        }
+    
+    def chunk(self, statement, index, base_url):
+        """Result chunk index as the API returns it: inline rows or one external link"""
+        rows = statement['rows']
+        offset = index * self.chunk_rows
+        if index and offset >= len(rows):
+            raise KeyError(index)
+        chunk = {'chunk_index': index, 'row_offset': offset, 'row_count': len(rows[offset:offset + self.chunk_rows])}
+        if offset + self.chunk_rows < len(rows):
+            chunk['next_chunk_index'] = index + 1
+            chunk['next_chunk_internal_link'] = f"/api/2.0/sql/statements/{statement['id']}/result/chunks/{index + 1}"
+        if statement['disposition'] == 'EXTERNAL_LINKS':
+            expiration = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + 900))
+            link = {**chunk, 'external_link': f"{base_url}/external/{statement['id']}/{index}", 'expiration': expiration}
+            return {'external_links': [link]}
+        return {**chunk, 'data_array': [[to_text(v) for v in row] for row in rows[offset:offset + self.chunk_rows]]}
+    
+    def describe(self, statement, base_url):
+        """Statement JSON: status, plus manifest and first chunk once it succeeded"""
+        body = {'statement_id': statement['id'], 'status': {'state': statement['state']}}
+        if statement['state'] == 'FAILED':
+            body['status']['error'] = {'error_code': 'BAD_REQUEST', 'message': statement['error']}
+        elif statement['state'] == 'SUCCEEDED':
+            body['manifest'] = self.manifest(statement)
+            body['result'] = self.chunk(statement, 0, base_url)
+        return body
+    
+    def chunk_payload(self, statement, index):
+        """(content type, bytes) of an external link download"""
+        rows = statement['rows'][index * self.chunk_rows:(index + 1) * self.chunk_rows]
+        if statement['format'] != 'ARROW_STREAM':
+            return 'application/json', json.dumps([[to_text(v) for v in row] for row in rows]).encode()
+        
+        import pyarrow as pa
+        
+        types = {'BIGINT': pa.int64(), 'DOUBLE': pa.float64(), 'BOOLEAN': pa.bool_()}
+        arrays = [pa.array([row[i] for row in rows], types.get(type_text, pa.string()))
+                  for i, (_, type_text) in enumerate(statement['columns'])]
+        table = pa.table(arrays, names=[name for name, _ in statement['columns']])
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return 'application/vnd.apache.arrow.stream', sink.getvalue().to_pybytes()
+
+
+def split_name(name):
+    return [part.strip('`') for part in CATALOG_PREFIX.sub('', name).split('.')]
+
+
+def infer_type(rows, i):
+    kinds = {type(row[i]) for row in rows if row[i] is not None}
+    if float in kinds:
+        return 'DOUBLE'
+    return 'BIGINT' if kinds == {int} else 'STRING'
+
+
+def to_text(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return None if value is None else str(value)
+
+
+def catalog_tables(schema):
+    return [{'name': table, 'catalog_name': CATALOG, 'schema_name': schema, 'full_name': f"{CATALOG}.{schema}.{table}",
+             'table_type': 'MANAGED', 'data_source_format': 'DELTA', 'owner': 'local', 'comment': None,
+             'columns': [{'name': c, 'type_text': t.lower(), 'type_name': TYPE_NAMES[t], 'position': i, 'nullable': True}
+                         for i, (c, t) in enumerate(columns)]}
+            for table, columns in TABLES[schema].items()]
+
+
+def unity_catalog(path, params):
+    """(status, body) of a Unity Catalog list or get request"""
+    parts = [unquote(p) for p in path.split('/')[4:] if p]
+    kind = parts[0] if parts else None
+    catalogs = [{'name': CATALOG, 'comment': 'Local stand-in catalog', 'owner': 'local', 'created_at': 0}]
+    schemas = [{'name': s, 'catalog_name': CATALOG, 'full_name': f"{CATALOG}.{s}", 'comment': None, 'owner': 'local'}
+               for s in TABLES]
+    if kind == 'catalogs':
+        found = catalogs if len(parts) == 1 else [c for c in catalogs if c['name'] == parts[1]]
+        return (200, {'catalogs': found}) if len(parts) == 1 else (200, found[0]) if found else not_found(path)
+    if kind == 'schemas':
+        if len(parts) == 1:
+            return 200, {'schemas': schemas if params.get('catalog_name') == CATALOG else []}
+        found = [s for s in schemas if s['full_name'] == parts[1]]
+        return (200, found[0]) if found else not_found(path)
+    if kind == 'tables':
+        if len(parts) == 1:
+            schema = params.get('schema_name')
+            known = params.get('catalog_name') == CATALOG and schema in TABLES
+            return 200, {'tables': catalog_tables(schema) if known else []}
+        catalog, _, rest = parts[1].partition('.')
+        schema, _, table = rest.partition('.')
+        found = [t for t in catalog_tables(schema) if t['name'] == table] if catalog == CATALOG and schema in TABLES else []
+        return (200, found[0]) if found else not_found(path)
+    return not_found(path)
+
+
+def not_found(path):
+    return 404, {'error_code': 'NOT_FOUND', 'message': f"{path} not found"}
+
+
+def make_handler(warehouse, token=None, error_rate=0.0, verbose=False):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; without this each response waits on delayed ACKs
+        disable_nagle_algorithm = True
+        
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+        
+        def send(self, status, body, content_type='application/json'):
+            payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        
+        def base_url(self):
+            return f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address)}"
+        
+        def rejected(self, url):
+            """Send and return an error for requests failing auth or picked for error injection"""
+            if url.path.startswith('/external/'):
+                # Presigned storage URLs refuse requests that carry a workspace token
+                if 'Authorization' in self.headers:
+                    self.send(400, {'error_code': 'BAD_REQUEST', 'message': 'Unexpected Authorization header'})
+                    return True
+                return False
+            expected = f"Bearer {token}" if token else None
+            if not self.headers.get('Authorization', '').startswith('Bearer ') or (
+                    expected and self.headers['Authorization'] != expected):
+                self.send(401, {'error_code': 'UNAUTHENTICATED', 'message': 'Invalid access token'})
+                return True
+            if error_rate and random.random() < error_rate:
+                self.send(503, {'error_code': 'TEMPORARILY_UNAVAILABLE', 'message': 'Injected failure'})
+                return True
+            return False
+        
+        def do_GET(self):
+            url = urlparse(self.path)
+            if self.rejected(url):
+                return
+            params = {k: v[0] for k, v in parse_qs(url.query).items()}
+            parts = url.path.strip('/').split('/')
+            try:
+                if url.path.startswith('/api/2.1/unity-catalog/'):
+                    return self.send(*unity_catalog(url.path, params))
+                if url.path == '/api/2.0/sql/warehouses':
+                    return self.send(200, {'warehouses': [WAREHOUSE]})
+                if url.path == f"/api/2.0/sql/warehouses/{WAREHOUSE['id']}":
+                    return self.send(200, WAREHOUSE)
+                if url.path.startswith('/api/2.0/sql/statements/'):
+                    statement = warehouse.statements[parts[4]]
+                    if len(parts) == 8 and parts[5:7] == ['result', 'chunks'] and statement['state'] == 'SUCCEEDED':
+                        return self.send(200, warehouse.chunk(statement, int(parts[7]), self.base_url()))
+                    if len(parts) == 5:
+                        return self.send(200, warehouse.describe(statement, self.base_url()))
+                if url.path.startswith('/external/') and len(parts) == 3:
+                    content_type, payload = warehouse.chunk_payload(warehouse.statements[parts[1]], int(parts[2]))
+                    return self.send(200, payload, content_type)
+            except (KeyError, ValueError):
+                pass
+            self.send(*not_found(url.path))
+        
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get('Content-Length', 0))
+            raw = self.rfile.read(length) if length else b''
+            if self.rejected(url):
+                return
+            parts = url.path.strip('/').split('/')
+            if url.path == '/api/2.0/sql/statements':
+                return self.post_statement(json.loads(raw or b'{}'))
+            if len(parts) == 6 and url.path.startswith('/api/2.0/sql/statements/') and parts[5] == 'cancel':
+                if parts[4] in warehouse.statements:
+                    warehouse.cancel(parts[4])
+                    return self.send(200, {})
+            self.send(*not_found(url.path))
+        
+        def post_statement(self, body):
+            if body.get('warehouse_id') != WAREHOUSE['id'] or not body.get('statement'):
+                return self.send(400, {'error_code': 'INVALID_PARAMETER_VALUE',
+                                       'message': 'statement and a known warehouse_id are required'})
+            match = WAIT_TIMEOUT.match(body.get('wait_timeout', '10s'))
+            if not match:
+                return self.send(400, {'error_code': 'INVALID_PARAMETER_VALUE', 'message': 'Invalid wait_timeout'})
+            statement = warehouse.submit(body['statement'], body.get('disposition', 'INLINE'),
+                                         body.get('format', 'JSON_ARRAY'))
+            if not statement['done'].wait(int(match[1])) and body.get('on_wait_timeout') == 'CANCEL':
+                warehouse.cancel(statement['id'])
+            self.send(200, warehouse.describe(statement, self.base_url()))
+    
+    return Handler
+
+
+def serve(host='127.0.0.1', port=8080, token=None, error_rate=0.0, verbose=False, **warehouse_options):
+    """Build the warehouse and return a ThreadingHTTPServer for it, not yet serving"""
+    warehouse = Warehouse(**warehouse_options)
+    server = ThreadingHTTPServer((host, port), make_handler(warehouse, token, error_rate, verbose))
+    server.daemon_threads = True
+    server.warehouse = warehouse
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in Databricks SQL server for the CareConnect tools')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--rows', type=int, default=100_000, help='Synthetic google_maps_businesses rows')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--slots', type=int, default=4, help='Statements the warehouse runs at once; others stay PENDING')
+    parser.add_argument('--latency', type=float, default=0.2, help='Mean seconds a statement spends RUNNING')
+    parser.add_argument('--chunk-rows', type=int, default=5000, help='Rows per result chunk')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of API requests answered with 503')
+    parser.add_argument('--token', help='Accept only this bearer token (default: any)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    server = serve(args.host, args.port, args.token, args.error_rate, args.verbose, rows=args.rows, seed=args.seed,
+                   slots=args.slots, latency=args.latency, chunk_rows=args.chunk_rows)
+    print(f"🏥 Loaded {args.rows:,} synthetic businesses in {time.perf_counter() - start:.1f}s")
+    print(f"🚀 Serving on http://{args.host}:{server.server_address[1]} (warehouse {WAREHOUSE['id']})")
+    print(f"💡 export DATABRICKS_BASE_URL=http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopped")
+
+
+if __name__ == '__main__':
+    main()
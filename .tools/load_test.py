@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Load generator replaying the CareConnect tools' workloads against a Databricks SQL endpoint
+Meant for fake_databricks_server.py: several clients send the statements of `explore` /
+`healthcare`, google_maps_businesses_analysis.sql, the Unity Catalog calls of
+explore-catalog.py or streamed exports, and the run is reported as p50/p95/p99 latency
+and throughput per operation and per HTTP endpoint.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import itertools
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import requests
+from tabulate import tabulate
+
+TOOLS_DIR = Path(__file__).parent
+ANALYSIS_SQL = TOOLS_DIR.parent / 'google_maps_businesses_analysis.sql'
+WORKLOADS = ['explore', 'analysis', 'catalog', 'export', 'mixed']
+
+
+def load_cli():
+    spec = importlib.util.spec_from_file_location('databricks_sql_cli', TOOLS_DIR / 'databricks-sql-cli.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def statement_op(client, query, timeout, disposition='INLINE', result_format='JSON_ARRAY'):
+    """Operation running query like the CLI does: submit, poll, then fetch every chunk"""
+    def run():
+        result = client.submit_statement(query, client.warehouse_id, disposition=disposition,
+                                         result_format=result_format)
+        if result is not None:
+            result = client.wait_for_statement(result, timeout)
+        if result is None or result.get('status', {}).get('state') != 'SUCCEEDED':
+            return False, 0
+        return True, sum(batch.num_rows for batch in client.iter_batches(result))
+    return run
+
+
+def catalog_op(client, path, endpoint, params=None):
+    def run():
+        response = client.request('GET', path, endpoint=endpoint, params=params)
+        return response.status_code == 200, 0
+    return run
+
+
+def discover_tables(client, catalog):
+    """(schema, table) pairs of catalog, listed with SHOW statements"""
+    schemas = client.execute_sql(f"SHOW SCHEMAS IN {catalog}")
+    tables = []
+    for schema in (schemas['namespace'].tolist() if schemas is not None else []):
+        listed = client.execute_sql(f"SHOW TABLES IN {catalog}.{schema}")
+        if listed is not None:
+            tables += [(schema, table) for table in listed['tableName'].tolist()]
+    return tables
+
+
+def workload_operations(cli, client, workload, catalog, tables, timeout):
+    """[(label, operation)] of one pass over a workload; operations return (ok, rows)"""
+    schemas = sorted({schema for schema, _ in tables})
+    if workload == 'explore':
+        ops = [('SHOW SCHEMAS', statement_op(client, f"SHOW SCHEMAS IN {catalog}", timeout))]
+        ops += [('SHOW TABLES', statement_op(client, f"SHOW TABLES IN {catalog}.{schema}", timeout))
+                for schema in schemas]
+        for schema, table in tables:
+            ops += [('DESCRIBE', statement_op(client, f"DESCRIBE {catalog}.{schema}.{table}", timeout)),
+                    ('SELECT LIMIT 5', statement_op(client, f"SELECT * FROM {catalog}.{schema}.{table} LIMIT 5", timeout))]
+        return ops
+    if workload == 'analysis':
+        statements = cli.split_sql_statements(ANALYSIS_SQL.read_text())
+        return [(label[:40], statement_op(client, statement, timeout)) for label, statement in statements]
+    if workload == 'catalog':
+        ops = [('UC list catalogs', catalog_op(client, '/api/2.1/unity-catalog/catalogs', None))]
+        ops += [('UC list schemas', catalog_op(client, '/api/2.1/unity-catalog/schemas', None,
+                                               {'catalog_name': catalog}))]
+        ops += [('UC list tables', catalog_op(client, '/api/2.1/unity-catalog/tables', None,
+                                              {'catalog_name': catalog, 'schema_name': schema}))
+                for schema in schemas]
+        ops += [('UC get table', catalog_op(client, f"/api/2.1/unity-catalog/tables/{catalog}.{schema}.{table}",
+                                            '/api/2.1/unity-catalog/tables/{full_name}'))
+                for schema, table in tables]
+        return ops
+    if workload == 'export':
+        return [(f"EXPORT {table}", statement_op(client, f"SELECT * FROM {catalog}.{schema}.{table}", timeout,
+                                                 'EXTERNAL_LINKS', 'ARROW_STREAM'))
+                for schema, table in tables]
+    return [op for name in ('explore', 'analysis', 'catalog')
+            for op in workload_operations(cli, client, name, catalog, tables, timeout)]
+
+
+def run_load(ops, clients, total=None, duration=None):
+    """Run ops round-robin from clients threads until total operations or duration seconds"""
+    counter = itertools.count()
+    samples = []
+    deadline = time.perf_counter() + duration if duration else None
+    
+    def worker():
+        while True:
+            i = next(counter)
+            if (total and i >= total) or (deadline and time.perf_counter() >= deadline):
+                return
+            label, op = ops[i % len(ops)]
+            start = time.perf_counter()
+            try:
+                ok, rows = op()
+            except requests.RequestException:
+                ok, rows = False, 0
+            samples.append((label, time.perf_counter() - start, ok, rows))
+    
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+    return pd.DataFrame(samples, columns=['operation', 'seconds', 'ok', 'rows']), wall
+
+
+def latency_report(samples):
+    """Per-operation and overall count, errors and latency percentiles in ms"""
+    def summarize(group):
+        ms = group['seconds'].to_numpy() * 1000
+        return pd.Series({
+            'count': len(ms),
+            'errors': int((~group['ok']).sum()),
+            'rows': int(group['rows'].sum()),
+            'mean_ms': round(ms.mean(), 1),
+            'p50_ms': round(np.percentile(ms, 50), 1),
+            'p95_ms': round(np.percentile(ms, 95), 1),
+            'p99_ms': round(np.percentile(ms, 99), 1),
+            'max_ms': round(ms.max(), 1)
+        })
+    
+    report = samples.groupby('operation', sort=False)[['seconds', 'ok', 'rows']].apply(summarize).reset_index()
+    overall = summarize(samples).to_frame().T.assign(operation='ALL')
+    return pd.concat([report, overall[report.columns]], ignore_index=True)
+
+
+def start_server(rows, slots, latency):
+    """Run fake_databricks_server.py in a background thread on a free port; returns its base URL"""
+    sys.path.insert(0, str(TOOLS_DIR))
+    from fake_databricks_server import serve
+    
+    server = serve(port=0, rows=rows, slots=slots, latency=latency)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay CareConnect tool workloads and report latency')
+    parser.add_argument('--base-url', default='http://127.0.0.1:8080', help='Endpoint to load (default: local stand-in)')
+    parser.add_argument('--token', default='local-load-test', help='Bearer token to send')
+    parser.add_argument('--workload', choices=WORKLOADS, default='mixed')
+    parser.add_argument('--catalog', default='dais-hackathon-2025')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--requests', type=int, default=200, help='Operations to run in total')
+    parser.add_argument('--duration', type=float, help='Run for this many seconds instead of --requests')
+    parser.add_argument('--timeout', type=float, default=60, help='Seconds before a statement is cancelled')
+    parser.add_argument('--retries', type=int, default=3, help='Client retries for connection errors and 429/5xx')
+    parser.add_argument('--start-server', action='store_true',
+                        help='Start fake_databricks_server.py in-process instead of using --base-url')
+    parser.add_argument('--server-rows', type=int, default=100_000, help='Synthetic rows with --start-server')
+    parser.add_argument('--server-slots', type=int, default=4, help='Warehouse slots with --start-server')
+    parser.add_argument('--server-latency', type=float, default=0.2, help='Statement latency with --start-server')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+    
+    cli = load_cli()
+    base_url = start_server(args.server_rows, args.server_slots, args.server_latency) if args.start_server else args.base_url
+    client = cli.DatabricksSQL(token=args.token, workspace='localhost', base_url=base_url, retries=args.retries,
+                               pool_size=max(10, args.clients))
+    
+    # The CLI reports progress on stdout; keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        if not client.resolve_warehouse():
+            raise SystemExit(f"❌ No warehouse at {base_url}")
+        tables = discover_tables(client, args.catalog)
+        ops = workload_operations(cli, client, args.workload, args.catalog, tables, args.timeout)
+        client.latencies.clear()
+        samples, wall = run_load(ops, args.clients, None if args.duration else args.requests, args.duration)
+    
+    if samples.empty:
+        raise SystemExit("❌ No operations ran")
+    report = latency_report(samples)
+    endpoints = client.latency_stats()
+    throughput = len(samples) / wall
+    
+    if args.json:
+        print(json.dumps({
+            'base_url': base_url,
+            'workload': args.workload,
+            'clients': args.clients,
+            'operations': len(samples),
+            'wall_seconds': round(wall, 3),
+            'operations_per_second': round(throughput, 2),
+            'operations_by_name': report.to_dict('records'),
+            'endpoints': endpoints.to_dict('records')
+        }, indent=2, default=int))
+        return
+    
+    print(f"\n=== LOAD TEST: {args.workload} x {args.clients} clients against {base_url} ===")
+    print(f"{len(samples):,} operations in {wall:.1f}s: {throughput:.1f} ops/s, "
+          f"{int((~samples['ok']).sum())} errors")
+    print("\n⏱️  Operation latency:")
+    print(tabulate(report, headers='keys', tablefmt='grid', showindex=False))
+    print("\n⏱️  HTTP request latency:")
+    print(tabulate(endpoints, headers='keys', tablefmt='grid', showindex=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,192 @@
+"""
+Execution engine interface for GoogleMapsHealthcareAnalyzer
+An engine owns every data-touching operation; the analyzer only orchestrates and prints.
+Aggregates come back as pandas DataFrames so results compare directly across backends.
+"""
+
+import resource
+import sys
+from contextlib import contextmanager
+
+import pandas as pd
+
+# Output column -> candidate source columns; the analyzer's names come first,
+# then the names used by the bright_initiative table and the backend query
+COLUMN_CANDIDATES = {
+    'name': ['name'],
+    'category': ['category'],
+    'address': ['address'],
+    'latitude': ['latitude', 'lat'],
+    'longitude': ['longitude', 'lon', 'lng'],
+    'phone': ['phone', 'phone_number'],
+    'website': ['website', 'open_website'],
+    'rating': ['rating', 'reviews_rating'],
+    'reviews_count': ['reviews_count', 'reviews_total'],
+}
+
+# Key fields shared by completeness and sample-provider stages
+SAMPLE_REQUIRED_FIELDS = ['name', 'category', 'address', 'rating']
+SAMPLE_SORT_COLUMNS = ['rating', 'reviews_count', 'name']
+
+# Exported files are partitioned by the state code parsed from the address, then type.
+# The state is the first ", XX 12345" in addresses like "3945 S Washington Blvd, Ogden, UT 84403".
+EXPORT_PARTITION_COLUMNS = ['state', 'provider_type']
+STATE_CODE_PATTERN = r',\s*([A-Z]{2})\s+\d{5}'
+UNKNOWN_STATE = 'unknown'
+
+
+def python_peak_rss_bytes():
+    """Peak resident set size of this Python process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class AnalysisEngine:
+    """Operations the analyzer needs from a backend
+    
+    A dataset is whatever handle load() returns: a Spark DataFrame for SparkEngine,
+    an ArrowDataset for ArrowEngine. Methods returning tables return pandas DataFrames
+    with identical columns, ordering and types on every backend.
+    """
+    name = None
+    
+    def load(self, source):
+        raise NotImplementedError
+    
+    def columns(self, dataset):
+        raise NotImplementedError
+    
+    def dtypes(self, dataset):
+        """Column name -> Spark-style simple type string (string, double, bigint, ...)"""
+        raise NotImplementedError
+    
+    def print_schema(self, dataset):
+        raise NotImplementedError
+    
+    def count(self, dataset):
+        raise NotImplementedError
+    
+    def profile_columns(self, dataset, columns):
+        """Return (total_count, {column: non_null_count}) for present columns in one pass"""
+        raise NotImplementedError
+    
+    def category_counts(self, dataset):
+        """category, rows for every distinct non-null category, in one grouped scan"""
+        raise NotImplementedError
+    
+    def filter_healthcare(self, dataset, classifier, category_dictionary=None):
+        """Rows matching the classifier, tagged with matched_keyword and provider_type
+        
+        With a CategoryDictionary, categories are tagged by a broadcast lookup
+        instead of the regex; the result is the same.
+        """
+        raise NotImplementedError
+    
+    def persist(self, dataset, storage_level):
+        return dataset
+    
+    def unpersist(self, dataset):
+        pass
+    
+    def category_stats(self, dataset):
+        """category, provider_count, avg_rating, avg_reviews sorted by count desc, category"""
+        raise NotImplementedError
+    
+    def geo_stats(self, dataset, lat_col, lng_col):
+        """One row: records_with_coords, min/max/avg of lat and lng"""
+        raise NotImplementedError
+    
+    def rating_distribution(self, dataset):
+        """rating, count for non-null ratings sorted by rating"""
+        raise NotImplementedError
+    
+    def review_stats(self, dataset):
+        """One row: min_reviews, max_reviews, avg_reviews, median_reviews (may be approximate)"""
+        raise NotImplementedError
+    
+    def top_providers(self, dataset, n, lat_col, lng_col):
+        """Top n complete providers by rating, reviews_count desc then name asc"""
+        raise NotImplementedError
+    
+    def proximity_stats(self, dataset, lat_col, lng_col, origin_lat, origin_lng, radii_miles, group_cols):
+        """nearest_miles and within_<r>_mi counts per group, sorted by nearest_miles"""
+        raise NotImplementedError
+    
+    def mercator_cell_counts(self, dataset, lat_col, lng_col, level, group_cols):
+        """cell_x, cell_y, group_cols, count, lat_sum, lng_sum per occupied Web Mercator cell
+        
+        Cells are on the 2**level grid of geo_distance.mercator_cells; rows without
+        coordinates are skipped. Sorted by cell_y, cell_x, then group_cols.
+        """
+        raise NotImplementedError
+    
+    def grid_cell_counts(self, dataset, lat_col, lng_col, min_lat, min_lng, cell_degrees, group_cols):
+        """cell_row, cell_col, group_cols, count per occupied cell of a lat/lng grid
+        
+        cell_row = floor((lat - min_lat) / cell_degrees), likewise cell_col for lng;
+        cells outside the caller's extent are returned too. Sorted by row, col, groups.
+        """
+        raise NotImplementedError
+    
+    def export_partitioned(self, dataset, path, file_format):
+        """Write dataset as hive-partitioned 'parquet' or 'arrow' (IPC) files under path
+        
+        Adds the state column, partitions by EXPORT_PARTITION_COLUMNS and writes from
+        the workers batch by batch. Returns state, provider_type, rows per partition.
+        """
+        raise NotImplementedError
+    
+    def sketch_profile(self, dataset, profile_factory):
+        """Build a SketchProfile in one scan; profile_factory() returns an empty profile"""
+        raise NotImplementedError
+    
+    def top_k(self, dataset, accumulator_factory):
+        """Fill a bounded top-K accumulator (see provider_rankings.TopProviders) in one scan
+        
+        Each batch or partition keeps only its best rows per key, and partial lists
+        are merged, so the dataset is never sorted as a whole.
+        """
+        raise NotImplementedError
+    
+    def to_pandas(self, dataset, columns=None):
+        raise NotImplementedError
+    
+    def to_pandas_normalized(self, dataset, columns):
+        """Collect columns under their normalized names (see COLUMN_CANDIDATES)
+        
+        Columns absent from the dataset come back as all-null.
+        """
+        available = self.columns(dataset)
+        sources = {}
+        for name in columns:
+            candidates = COLUMN_CANDIDATES.get(name, [name])
+            sources[name] = next((c for c in candidates if c in available), None)
+        frame = self.to_pandas(dataset, sorted({c for c in sources.values() if c}))
+        return pd.DataFrame({name: frame[source] if source else None for name, source in sources.items()},
+                            index=frame.index)
+    
+    @contextmanager
+    def instrument(self, stage):
+        """Yield a dict the backend fills with metrics for the work run inside the block
+        
+        Keys follow stage_profiler.STAGE_METRICS; backends omit what they cannot measure.
+        """
+        yield {}
+    
+    @contextmanager
+    def scheduler_pool(self, pool):
+        """Run the block's work in the named scheduler pool, where the backend has one"""
+        yield
+    
+    def thread_target(self, fn):
+        """Wrap fn so it can run backend work from a worker thread"""
+        return fn
+    
+    def resource_report(self):
+        """Startup time and peak memory of this backend"""
+        return {
+            'engine': self.name,
+            'startup_seconds': round(self.startup_seconds, 3),
+            'python_peak_rss_bytes': python_peak_rss_bytes(),
+        }
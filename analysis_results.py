@@ -0,0 +1,150 @@
+"""
+Typed results of GoogleMapsHealthcareAnalyzer stages
+Each result wraps the collected output of exactly one engine query; render() formats it
+for printing without touching the data again, so callers can reuse results freely.
+"""
+
+from dataclasses import dataclass, fields
+from typing import Optional
+
+import pandas as pd
+
+
+def _table_text(frame):
+    return frame.to_string(index=False)
+
+
+def _scalar(value):
+    """Plain Python value of a collected cell, None for nulls"""
+    if pd.isna(value):
+        return None
+    return value.item() if hasattr(value, 'item') else value
+
+
+@dataclass(frozen=True, eq=False)
+class CategoryStats:
+    """category, provider_count, avg_rating, avg_reviews sorted by count desc"""
+    table: pd.DataFrame
+    
+    @property
+    def total_providers(self):
+        return int(self.table['provider_count'].sum())
+    
+    def top(self, n=20):
+        return self.table.head(n)
+    
+    def render(self, n=20):
+        return _table_text(self.top(n))
+
+
+@dataclass(frozen=True)
+class GeographicBounds:
+    records_with_coords: int
+    min_lat: Optional[float]
+    max_lat: Optional[float]
+    min_lng: Optional[float]
+    max_lng: Optional[float]
+    avg_lat: Optional[float]
+    avg_lng: Optional[float]
+    
+    @classmethod
+    def from_frame(cls, frame):
+        # Per column, so integer counts are not upcast with the float columns of the row
+        return cls(**{f.name: _scalar(frame[f.name].iloc[0]) for f in fields(cls)})
+    
+    def to_frame(self):
+        return pd.DataFrame([{f.name: getattr(self, f.name) for f in fields(self)}])
+    
+    def contains(self, lat, lng):
+        if self.records_with_coords == 0:
+            return False
+        return self.min_lat <= lat <= self.max_lat and self.min_lng <= lng <= self.max_lng
+    
+    def render(self):
+        return _table_text(self.to_frame())
+
+
+@dataclass(frozen=True, eq=False)
+class RatingHistogram:
+    """rating, count for non-null ratings sorted by rating"""
+    table: pd.DataFrame
+    
+    @property
+    def rated_count(self):
+        return int(self.table['count'].sum())
+    
+    def mean_rating(self):
+        if not self.rated_count:
+            return None
+        return float((self.table['rating'] * self.table['count']).sum() / self.rated_count)
+    
+    def render(self):
+        return _table_text(self.table)
+
+
+@dataclass(frozen=True)
+class ReviewStats:
+    min_reviews: Optional[float]
+    max_reviews: Optional[float]
+    avg_reviews: Optional[float]
+    median_reviews: Optional[float]
+    
+    @classmethod
+    def from_frame(cls, frame):
+        # Per column, so integer counts are not upcast with the float columns of the row
+        return cls(**{f.name: _scalar(frame[f.name].iloc[0]) for f in fields(cls)})
+    
+    def to_frame(self):
+        return pd.DataFrame([{f.name: getattr(self, f.name) for f in fields(self)}])
+    
+    def render(self):
+        return _table_text(self.to_frame())
+
+
+@dataclass(frozen=True, eq=False)
+class QualityMetrics:
+    """Rating histogram and review statistics; either is None when its column is missing"""
+    rating_histogram: Optional[RatingHistogram] = None
+    review_stats: Optional[ReviewStats] = None
+    
+    def render(self):
+        sections = []
+        if self.rating_histogram is not None:
+            sections += ["Rating Distribution:", self.rating_histogram.render()]
+        if self.review_stats is not None:
+            sections += ["Review Count Statistics:", self.review_stats.render()]
+        return '\n'.join(sections)
+
+
+@dataclass(frozen=True, eq=False)
+class CompletenessReport:
+    """field, populated_count, total_count, completeness_pct per key field"""
+    table: pd.DataFrame
+    
+    def completeness(self, field):
+        matches = self.table.loc[self.table['field'] == field, 'completeness_pct']
+        return float(matches.iloc[0]) if len(matches) else None
+    
+    def render(self):
+        return _table_text(self.table)
+
+
+@dataclass(frozen=True, eq=False)
+class SampleProviders:
+    """Top complete providers by rating and review count"""
+    table: pd.DataFrame
+    
+    def render(self):
+        return _table_text(self.table)
+
+
+@dataclass(frozen=True, eq=False)
+class ProximityStats:
+    """nearest_miles and within_<r>_mi counts per provider type around an origin"""
+    origin_lat: float
+    origin_lng: float
+    radii_miles: tuple
+    table: pd.DataFrame
+    
+    def render(self):
+        return _table_text(self.table)
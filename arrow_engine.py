@@ -0,0 +1,420 @@
+"""
+Arrow/pandas backend for GoogleMapsHealthcareAnalyzer
+Reads local Parquet extracts with column projection and aggregates record batches as a
+stream, so the analysis runs on a laptop or in CI without a JVM
+"""
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from analysis_engine import (EXPORT_PARTITION_COLUMNS, SAMPLE_REQUIRED_FIELDS, SAMPLE_SORT_COLUMNS,
+                             STATE_CODE_PATTERN, UNKNOWN_STATE, AnalysisEngine)
+from geo_distance import haversine_distance, initial_bearing, mercator_cells
+from healthcare_classifier import DEFAULT_PROVIDER_TYPE
+
+# Arrow type -> the simple type string Spark reports for the same column
+SPARK_TYPE_NAMES = {
+    'string': 'string', 'large_string': 'string', 'bool': 'boolean',
+    'int8': 'tinyint', 'int16': 'smallint', 'int32': 'int', 'int64': 'bigint',
+    'float': 'float', 'double': 'double', 'date32[day]': 'date', 'binary': 'binary', 'null': 'void',
+}
+
+
+def spark_type_name(arrow_type):
+    if pa.types.is_timestamp(arrow_type):
+        return 'timestamp'
+    return SPARK_TYPE_NAMES.get(str(arrow_type), str(arrow_type))
+
+
+class ArrowDataset:
+    def __init__(self, dataset=None, table=None):
+        """Parquet files scanned lazily batch by batch, or a materialized Arrow table"""
+        self.dataset = dataset
+        self.table = table
+    
+    @property
+    def schema(self):
+        return self.table.schema if self.table is not None else self.dataset.schema
+    
+    @property
+    def columns(self):
+        return self.schema.names
+    
+    def count_rows(self):
+        return self.table.num_rows if self.table is not None else self.dataset.count_rows()
+    
+    def batches(self, columns=None, batch_size=131072):
+        """Stream record batches, reading only the requested columns"""
+        if self.table is not None:
+            table = self.table.select(columns) if columns is not None else self.table
+            return iter(table.to_batches(max_chunksize=batch_size))
+        return self.dataset.to_batches(columns=columns, batch_size=batch_size)
+
+
+class ArrowEngine(AnalysisEngine):
+    name = 'arrow'
+    
+    def __init__(self, batch_size=131072):
+        start = time.perf_counter()
+        self.batch_size = batch_size
+        self.memory_pool = pa.default_memory_pool()
+        # Per-thread scan counter installed by instrument()
+        self._scan = threading.local()
+        self.startup_seconds = time.perf_counter() - start
+    
+    def _batches(self, dataset, columns=None):
+        batches = dataset.batches(columns, self.batch_size)
+        counter = getattr(self._scan, 'counter', None)
+        return batches if counter is None else self._counted(batches, counter)
+    
+    @staticmethod
+    def _counted(batches, counter):
+        for batch in batches:
+            counter['input_rows'] += batch.num_rows
+            counter['input_bytes'] += batch.nbytes
+            yield batch
+    
+    @contextmanager
+    def instrument(self, stage):
+        """Rows and bytes of every record batch scanned inside the block"""
+        previous = getattr(self._scan, 'counter', None)
+        counter = {'input_rows': 0, 'input_bytes': 0}
+        self._scan.counter = counter
+        try:
+            yield counter
+        finally:
+            self._scan.counter = previous
+    
+    def _present(self, dataset, columns):
+        return [c for c in columns if c in dataset.columns]
+    
+    def load(self, source):
+        """Load a Parquet file or directory of Parquet files"""
+        return ArrowDataset(dataset=ds.dataset(source, format='parquet'))
+    
+    def columns(self, dataset):
+        return dataset.columns
+    
+    def dtypes(self, dataset):
+        return {field.name: spark_type_name(field.type) for field in dataset.schema}
+    
+    def print_schema(self, dataset):
+        print('root')
+        for field in dataset.schema:
+            print(f" |-- {field.name}: {spark_type_name(field.type)} (nullable = {str(field.nullable).lower()})")
+    
+    def count(self, dataset):
+        return dataset.count_rows()
+    
+    def profile_columns(self, dataset, columns):
+        total_count = 0
+        null_counts = dict.fromkeys(columns, 0)
+        for batch in self._batches(dataset, columns):
+            total_count += batch.num_rows
+            for c in columns:
+                null_counts[c] += batch.column(c).null_count
+        return total_count, {c: total_count - null_counts[c] for c in columns}
+    
+    def category_counts(self, dataset):
+        partials = []
+        for batch in self._batches(dataset, ['category']):
+            counts = pc.value_counts(batch.column('category').drop_null())
+            partials.append(pd.DataFrame({'category': counts.field('values').to_pylist(),
+                                          'rows': counts.field('counts').to_numpy()}))
+        if not partials:
+            return pd.DataFrame(columns=['category', 'rows'])
+        return pd.concat(partials).groupby('category', sort=False)['rows'].sum().reset_index()
+    
+    def filter_healthcare(self, dataset, classifier, category_dictionary=None):
+        if not self._present(dataset, classifier.text_columns):
+            return None
+        
+        # Only the matching subset is materialized; the source stays on disk
+        matched = [classifier.filter_arrow(batch, category_dictionary) for batch in self._batches(dataset)]
+        matched = [batch for batch in matched if batch.num_rows]
+        if matched:
+            table = pa.Table.from_batches(matched)
+        else:
+            schema = classifier.tag_arrow(dataset.schema.empty_table()).schema
+            table = schema.empty_table()
+        return ArrowDataset(table=table)
+    
+    def category_stats(self, dataset):
+        columns = self._present(dataset, ['category', 'rating', 'reviews_count'])
+        partials = []
+        for batch in self._batches(dataset, columns):
+            frame = batch.to_pandas()
+            for c in ('rating', 'reviews_count'):
+                if c not in frame:
+                    frame[c] = np.nan
+            partials.append(frame.groupby('category', dropna=False).agg(
+                provider_count=('category', 'size'),
+                rating_sum=('rating', 'sum'), rating_n=('rating', 'count'),
+                reviews_sum=('reviews_count', 'sum'), reviews_n=('reviews_count', 'count')))
+        
+        if not partials:
+            return pd.DataFrame(columns=['category', 'provider_count', 'avg_rating', 'avg_reviews'])
+        
+        totals = pd.concat(partials).groupby(level=0, dropna=False).sum()
+        stats = pd.DataFrame({
+            'category': totals.index,
+            'provider_count': totals['provider_count'].astype('int64').to_numpy(),
+            'avg_rating': (totals['rating_sum'] / totals['rating_n'].where(totals['rating_n'] > 0)).to_numpy(),
+            'avg_reviews': (totals['reviews_sum'] / totals['reviews_n'].where(totals['reviews_n'] > 0)).to_numpy(),
+        })
+        return (stats
+                .sort_values(['provider_count', 'category'], ascending=[False, True], na_position='first')
+                .reset_index(drop=True))
+    
+    def geo_stats(self, dataset, lat_col, lng_col):
+        records, lat_sum, lng_sum = 0, 0.0, 0.0
+        bounds = {'min_lat': [], 'max_lat': [], 'min_lng': [], 'max_lng': []}
+        for batch in self._batches(dataset, [lat_col, lng_col]):
+            valid = pc.and_(pc.is_valid(batch.column(lat_col)), pc.is_valid(batch.column(lng_col)))
+            lat = batch.column(lat_col).filter(valid).to_numpy()
+            lng = batch.column(lng_col).filter(valid).to_numpy()
+            if not len(lat):
+                continue
+            records += len(lat)
+            lat_sum += lat.sum()
+            lng_sum += lng.sum()
+            bounds['min_lat'].append(lat.min())
+            bounds['max_lat'].append(lat.max())
+            bounds['min_lng'].append(lng.min())
+            bounds['max_lng'].append(lng.max())
+        
+        def reduce(values, fn):
+            return fn(values) if values else np.nan
+        
+        return pd.DataFrame([{
+            'records_with_coords': records,
+            'min_lat': reduce(bounds['min_lat'], min),
+            'max_lat': reduce(bounds['max_lat'], max),
+            'min_lng': reduce(bounds['min_lng'], min),
+            'max_lng': reduce(bounds['max_lng'], max),
+            'avg_lat': lat_sum / records if records else np.nan,
+            'avg_lng': lng_sum / records if records else np.nan,
+        }]).astype({'records_with_coords': 'int64'})
+    
+    def rating_distribution(self, dataset):
+        counts = pd.Series(dtype='int64')
+        for batch in self._batches(dataset, ['rating']):
+            batch_counts = batch.column('rating').to_pandas().value_counts()
+            counts = counts.add(batch_counts, fill_value=0)
+        return (counts.astype('int64')
+                .sort_index()
+                .rename_axis('rating')
+                .reset_index(name='count'))
+    
+    def review_stats(self, dataset):
+        values = [batch.column('reviews_count').drop_null().to_numpy()
+                  for batch in self._batches(dataset, ['reviews_count'])]
+        values = np.concatenate(values) if values else np.array([])
+        if not len(values):
+            return pd.DataFrame([dict.fromkeys(['min_reviews', 'max_reviews', 'avg_reviews', 'median_reviews'])])
+        return pd.DataFrame([{
+            'min_reviews': values.min(),
+            'max_reviews': values.max(),
+            'avg_reviews': values.mean(),
+            'median_reviews': float(np.median(values)),
+        }])
+    
+    def top_providers(self, dataset, n, lat_col, lng_col):
+        # Keep only the best n per batch so memory stays bounded by n * batches
+        sort_order = dict(by=SAMPLE_SORT_COLUMNS, ascending=[False, False, True], na_position='last')
+        candidates = []
+        for batch in self._batches(dataset):
+            valid = None
+            for field in SAMPLE_REQUIRED_FIELDS + [lat_col, lng_col]:
+                field_valid = pc.is_valid(batch.column(field))
+                valid = field_valid if valid is None else pc.and_(valid, field_valid)
+            frame = batch.filter(valid).to_pandas()
+            candidates.append(frame.sort_values(**sort_order, kind='stable').head(n))
+        
+        if not candidates:
+            return dataset.schema.empty_table().to_pandas()
+        return pd.concat(candidates).sort_values(**sort_order, kind='stable').head(n).reset_index(drop=True)
+    
+    def add_distance_columns(self, dataset, lat_col, lng_col, origin_lat, origin_lng,
+                             unit='miles', dtype=np.float64):
+        batches = []
+        for batch in self._batches(dataset):
+            lat = batch.column(lat_col).to_numpy(zero_copy_only=False)
+            lng = batch.column(lng_col).to_numpy(zero_copy_only=False)
+            distance = haversine_distance(origin_lat, origin_lng, lat, lng, unit, dtype)
+            bearing = initial_bearing(origin_lat, origin_lng, lat, lng, dtype)
+            batch = batch.append_column(f'distance_{unit}', pa.array(distance, from_pandas=True))
+            batches.append(batch.append_column('bearing_deg', pa.array(bearing, from_pandas=True)))
+        
+        if not batches:
+            value_type = pa.from_numpy_dtype(np.dtype(dtype))
+            schema = (dataset.schema
+                      .append(pa.field(f'distance_{unit}', value_type))
+                      .append(pa.field('bearing_deg', value_type)))
+            return ArrowDataset(table=schema.empty_table())
+        return ArrowDataset(table=pa.Table.from_batches(batches))
+    
+    def proximity_stats(self, dataset, lat_col, lng_col, origin_lat, origin_lng, radii_miles, group_cols):
+        band_names = [f'within_{radius}_mi' for radius in radii_miles]
+        partials = []
+        for batch in self._batches(dataset, [lat_col, lng_col] + list(group_cols)):
+            valid = pc.and_(pc.is_valid(batch.column(lat_col)), pc.is_valid(batch.column(lng_col)))
+            frame = batch.filter(valid).to_pandas()
+            if frame.empty:
+                continue
+            frame['nearest_miles'] = haversine_distance(origin_lat, origin_lng,
+                                                        frame[lat_col].to_numpy(), frame[lng_col].to_numpy())
+            for radius, band in zip(radii_miles, band_names):
+                frame[band] = (frame['nearest_miles'] <= radius).astype('int64')
+            aggregations = {'nearest_miles': 'min', **{band: 'sum' for band in band_names}}
+            if group_cols:
+                partials.append(frame.groupby(list(group_cols), dropna=False).agg(aggregations).reset_index())
+            else:
+                partials.append(frame[list(aggregations)].agg(aggregations).to_frame().T)
+        
+        columns = list(group_cols) + ['nearest_miles'] + band_names
+        if not partials:
+            return pd.DataFrame(columns=columns)
+        
+        combined = pd.concat(partials, ignore_index=True)
+        aggregations = {'nearest_miles': 'min', **{band: 'sum' for band in band_names}}
+        if group_cols:
+            combined = combined.groupby(list(group_cols), dropna=False).agg(aggregations).reset_index()
+        else:
+            combined = combined.agg(aggregations).to_frame().T
+        combined = combined.astype({band: 'int64' for band in band_names})
+        return combined[columns].sort_values(['nearest_miles'] + list(group_cols)).reset_index(drop=True)
+    
+    def mercator_cell_counts(self, dataset, lat_col, lng_col, level, group_cols):
+        keys = ['cell_x', 'cell_y'] + list(group_cols)
+        aggregations = {'count': 'sum', 'lat_sum': 'sum', 'lng_sum': 'sum'}
+        partials = []
+        for batch in self._batches(dataset, [lat_col, lng_col] + list(group_cols)):
+            valid = pc.and_(pc.is_valid(batch.column(lat_col)), pc.is_valid(batch.column(lng_col)))
+            frame = batch.filter(valid).to_pandas()
+            if frame.empty:
+                continue
+            frame['cell_x'], frame['cell_y'] = mercator_cells(frame[lat_col], frame[lng_col], level)
+            frame = frame.rename(columns={lat_col: 'lat_sum', lng_col: 'lng_sum'}).assign(count=1)
+            partials.append(frame.groupby(keys, dropna=False).agg(aggregations).reset_index())
+        
+        if not partials:
+            return pd.DataFrame(columns=keys + list(aggregations))
+        combined = pd.concat(partials, ignore_index=True).groupby(keys, dropna=False).agg(aggregations)
+        return combined.reset_index().sort_values(['cell_y', 'cell_x'] + list(group_cols)).reset_index(drop=True)
+    
+    def grid_cell_counts(self, dataset, lat_col, lng_col, min_lat, min_lng, cell_degrees, group_cols):
+        keys = ['cell_row', 'cell_col'] + list(group_cols)
+        partials = []
+        for batch in self._batches(dataset, [lat_col, lng_col] + list(group_cols)):
+            valid = pc.and_(pc.is_valid(batch.column(lat_col)), pc.is_valid(batch.column(lng_col)))
+            frame = batch.filter(valid).to_pandas()
+            if frame.empty:
+                continue
+            frame['cell_row'] = np.floor((frame[lat_col].to_numpy() - min_lat) / cell_degrees).astype(np.int64)
+            frame['cell_col'] = np.floor((frame[lng_col].to_numpy() - min_lng) / cell_degrees).astype(np.int64)
+            partials.append(frame.groupby(keys, dropna=False).size().rename('count').reset_index())
+        
+        if not partials:
+            return pd.DataFrame(columns=keys + ['count'])
+        combined = pd.concat(partials, ignore_index=True).groupby(keys, dropna=False)['count'].sum()
+        return combined.reset_index().sort_values(keys).reset_index(drop=True)
+    
+    def _category_dictionary(self, dataset):
+        """Sorted distinct categories, read from the category column alone"""
+        if 'category' not in dataset.columns:
+            return None
+        values = set()
+        for batch in self._batches(dataset, ['category']):
+            values.update(pc.unique(batch.column('category').drop_null()).to_pylist())
+        return pa.array(sorted(values), pa.string())
+    
+    def _export_batch(self, batch, categories):
+        """Batch with state and provider_type last and category dictionary-encoded
+        
+        Every batch shares one dictionary, as IPC files allow only one per field.
+        """
+        n = batch.num_rows
+        address = batch.column('address') if 'address' in batch.schema.names else pa.nulls(n, pa.string())
+        # extract_regex needs a named group; the pattern's only group is the state code
+        state_regex = STATE_CODE_PATTERN.replace('(', '(?P<state>', 1)
+        state = pc.fill_null(pc.struct_field(pc.extract_regex(address, pattern=state_regex), [0]), UNKNOWN_STATE)
+        provider_type = (batch.column('provider_type') if 'provider_type' in batch.schema.names
+                         else pa.nulls(n, pa.string()))
+        provider_type = pc.fill_null(provider_type, DEFAULT_PROVIDER_TYPE)
+        
+        names, arrays = [], []
+        for name, column in zip(batch.schema.names, batch.columns):
+            if name in EXPORT_PARTITION_COLUMNS:
+                continue
+            names.append(name)
+            if name == 'category':
+                column = pa.DictionaryArray.from_arrays(pc.index_in(column, value_set=categories), categories)
+            arrays.append(column)
+        return pa.RecordBatch.from_arrays(arrays + [state, provider_type], names + EXPORT_PARTITION_COLUMNS)
+    
+    def export_partitioned(self, dataset, path, file_format):
+        if file_format == 'parquet':
+            file_options = ds.ParquetFileFormat().make_write_options(
+                compression='zstd', use_dictionary=True, write_statistics=True)
+        elif file_format == 'arrow':
+            # Uncompressed, so readers can memory-map the buffers without copying
+            file_options = ds.IpcFileFormat().make_write_options()
+        else:
+            raise ValueError(f"Unsupported export format: {file_format}")
+        
+        rows = {}
+        categories = self._category_dictionary(dataset)
+        
+        def export_batches():
+            for batch in self._batches(dataset):
+                batch = self._export_batch(batch, categories)
+                keys = pd.DataFrame({c: batch.column(c).to_numpy(zero_copy_only=False)
+                                     for c in EXPORT_PARTITION_COLUMNS})
+                for key, size in keys.value_counts().items():
+                    rows[key] = rows.get(key, 0) + size
+                yield batch
+        
+        batches = export_batches()
+        first = next(batches, None)
+        if first is not None:
+            partitioning = ds.partitioning(pa.schema([first.schema.field(c) for c in EXPORT_PARTITION_COLUMNS]), flavor='hive')
+            ds.write_dataset(itertools.chain([first], batches), path, schema=first.schema,
+                             format=file_options.format, file_options=file_options, partitioning=partitioning,
+                             basename_template=f'part-{{i}}.{file_format}',
+                             existing_data_behavior='delete_matching')
+        
+        summary = pd.DataFrame([(*key, size) for key, size in rows.items()],
+                               columns=EXPORT_PARTITION_COLUMNS + ['rows'])
+        return summary.sort_values(EXPORT_PARTITION_COLUMNS).reset_index(drop=True)
+    
+    def sketch_profile(self, dataset, profile_factory):
+        profile = profile_factory()
+        for batch in self._batches(dataset, self._present(dataset, profile.columns)):
+            profile.update(batch.to_pandas())
+        return profile
+    
+    def top_k(self, dataset, accumulator_factory):
+        accumulator = accumulator_factory()
+        for batch in self._batches(dataset, self._present(dataset, accumulator.columns)):
+            accumulator.update(batch.to_pandas())
+        return accumulator
+    
+    def to_pandas(self, dataset, columns=None):
+        if dataset.table is not None:
+            return (dataset.table.select(columns) if columns else dataset.table).to_pandas()
+        return dataset.dataset.to_table(columns=columns).to_pandas()
+    
+    def resource_report(self):
+        """Adds the peak bytes allocated from Arrow's memory pool"""
+        report = super().resource_report()
+        report['arrow_peak_pool_bytes'] = self.memory_pool.max_memory()
+        return report
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Per-stage benchmark of GoogleMapsHealthcareAnalyzer on synthetic data in local Spark
+Times every analyzer method at several table sizes and writes machine-readable JSON so
+runs from different commits can be compared with --compare
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+# Local Spark's Python workers import the repo's UDF modules (geo_distance, profile_sketches) too
+os.environ['PYTHONPATH'] = os.pathsep.join(filter(None, [str(Path(__file__).parent.parent),
+                                                         os.environ.get('PYTHONPATH')]))
+
+from pyspark.sql import SparkSession
+
+from google_maps_analysis import GoogleMapsHealthcareAnalyzer
+from spark_engine import SparkEngine
+from synthetic_data import write_synthetic_parquet
+
+DEFAULT_SCALES = [100_000, 1_000_000, 5_000_000]
+# Regressions smaller than this fraction are treated as noise by --compare
+NOISE_THRESHOLD = 0.10
+
+
+def stage_plan(analyzer):
+    """Analyzer stages in pipeline order; later stages reuse the cached healthcare subset"""
+    healthcare = analyzer.identify_healthcare_providers
+    return {
+        'load_data': analyzer.load_data,
+        'analyze_schema': analyzer.analyze_schema,
+        'identify_healthcare_providers': lambda: healthcare(verbose=False),
+        'analyze_healthcare_categories': lambda: analyzer.analyze_healthcare_categories(healthcare()),
+        'analyze_geographic_coverage': lambda: analyzer.analyze_geographic_coverage(healthcare()),
+        'analyze_quality_metrics': lambda: analyzer.analyze_quality_metrics(healthcare()),
+        'assess_data_completeness': lambda: analyzer.assess_data_completeness(healthcare()),
+        'generate_sample_providers': lambda: analyzer.generate_sample_providers(healthcare()),
+        'analyze_sketch_profile': lambda: analyzer.analyze_sketch_profile(healthcare()),
+        'analyze_proximity': lambda: analyzer.analyze_proximity(40.7128, -74.0060, healthcare()),
+    }
+
+
+def time_pipeline(engine, data_path):
+    """Seconds per stage for one full pass over a fresh analyzer"""
+    analyzer = GoogleMapsHealthcareAnalyzer(data_path, engine=engine)
+    timings = {}
+    for name, stage in stage_plan(analyzer).items():
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            stage()
+        timings[name] = time.perf_counter() - start
+    analyzer.release_cache()
+    return timings
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_runs(baseline, current):
+    """Print per-stage change against a baseline run, flagging regressions"""
+    print(f"\n=== COMPARISON vs {baseline['metadata'].get('commit')} ===")
+    regressions = 0
+    for scale, stages in current['results'].items():
+        base_stages = baseline['results'].get(scale)
+        if not base_stages:
+            continue
+        print(f"\nRows: {int(scale):,}")
+        for stage, timing in stages.items():
+            if stage not in base_stages:
+                continue
+            before, after = base_stages[stage]['median_seconds'], timing['median_seconds']
+            change = (after - before) / before if before else 0.0
+            flag = '❌' if change > NOISE_THRESHOLD else ('✅' if change < -NOISE_THRESHOLD else '  ')
+            regressions += change > NOISE_THRESHOLD
+            print(f"{flag} {stage:<32} {before:>9.3f}s -> {after:>9.3f}s  {change:+7.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyzer stage benchmark on synthetic data')
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help='Row counts to benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Pipeline runs per scale (median is reported)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write JSON results to this file')
+    parser.add_argument('--compare', help='Baseline JSON from an earlier run to compare against')
+    args = parser.parse_args()
+    
+    spark = SparkSession.builder.master('local[*]').appName('AnalyzerBenchmark').getOrCreate()
+    engine = SparkEngine(spark)
+    
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            data_path = write_synthetic_parquet(spark, str(Path(tmp) / f'businesses_{scale}.parquet'),
+                                                scale, seed=args.seed)
+            runs = [time_pipeline(engine, data_path) for _ in range(args.repeat)]
+            results[str(scale)] = {
+                stage: {
+                    'median_seconds': round(statistics.median(run[stage] for run in runs), 4),
+                    'min_seconds': round(min(run[stage] for run in runs), 4),
+                    'max_seconds': round(max(run[stage] for run in runs), 4),
+                }
+                for stage in runs[0]
+            }
+            print(f"✅ {scale:,} rows benchmarked", file=sys.stderr)
+    
+    report = {
+        'metadata': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'spark': spark.version,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'parallelism': spark.sparkContext.defaultParallelism,
+        },
+        'results': results,
+    }
+    spark.stop()
+    
+    print(json.dumps(report, indent=2))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare_runs(baseline, report):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
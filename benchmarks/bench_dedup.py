@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark ProviderDeduplicator on synthetic providers with injected duplicate listings
+Checks known match / non-match pairs, recall of the injected duplicates and that cluster IDs
+do not depend on row order; no Spark required
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from provider_dedup import ProviderDeduplicator
+
+# (left name, right name, metres apart, shared phone, expected to merge)
+REGRESSION_PAIRS = [
+    ('Sunrise Dental', 'Sunrise Dental LLC', 5, False, True),
+    ('Harbor Urgent Care', 'Harbor Urgent Care', 40, False, True),
+    ('Valley Medical Clinic', 'Valley Medical Center', 10, True, True),
+    ('Sunrise Dental', 'Sunrise Dental Care', 5, True, True),
+    ('Sunrise Dental', 'Sunrise Pharmacy', 5, False, False),
+    ('Valley Medical Clinic', 'Valley Medical Center', 10, False, False),
+    ('Oak Pediatrics', 'Oak Pediatric Dentistry', 5, False, False),
+    ('Sunrise Dental', 'Sunrise Dental', 2000, False, False),
+]
+NAME_VARIANTS = [' LLC', ' Inc.', ', PC', '', ' ']
+METRES_PER_DEGREE = 111_320
+
+
+def check_regression_pairs(deduplicator):
+    """Names of REGRESSION_PAIRS the deduplicator gets wrong"""
+    failures = []
+    for i, (left, right, metres, shared_phone, expected) in enumerate(REGRESSION_PAIRS):
+        lat = 40.0 + i * 0.1
+        frame = pd.DataFrame({
+            'name': [left, right],
+            'latitude': [lat, lat + metres / METRES_PER_DEGREE],
+            'longitude': [-74.0, -74.0],
+            'phone': ['+1 212 555 0100', '+1 212 555 0100' if shared_phone else None],
+        })
+        merged = deduplicator.resolve(frame).stats['clusters'] == 1
+        if merged != expected:
+            failures.append(f"{left!r} / {right!r} ({metres}m, phone {shared_phone}): "
+                            f"{'merged' if merged else 'kept apart'}")
+    return failures
+
+
+def synthetic_providers(n, duplicates, seed):
+    """n distinct providers plus duplicates re-listings with name, phone and position noise"""
+    rng = np.random.default_rng(seed)
+    words = np.array(['Sunrise', 'Valley', 'Summit', 'Harbor', 'Cedar', 'Oak', 'Pioneer', 'Golden',
+                      'Family', 'Community', 'Advanced', 'Premier'])
+    kinds = np.array(['Dental', 'Pediatrics', 'Medical Clinic', 'Pharmacy', 'Urgent Care', 'Eye Care',
+                      'Physical Therapy', 'Dermatology', 'Cardiology', 'Family Medicine'])
+    names = [f'{a} {b} {k} {i}' for i, (a, b, k) in
+             enumerate(zip(rng.choice(words, n), rng.choice(words, n), rng.choice(kinds, n)))]
+    originals = pd.DataFrame({
+        'name': names,
+        'latitude': rng.uniform(25.0, 49.0, n),
+        'longitude': rng.uniform(-124.0, -67.0, n),
+        'phone': [f'+1{i:010d}' for i in rng.choice(10 ** 9, n, replace=False)],
+        'source_id': np.arange(n),
+    })
+    
+    source = rng.choice(n, duplicates, replace=False)
+    copies = originals.iloc[source].copy()
+    copies['name'] = copies['name'] + rng.choice(NAME_VARIANTS, duplicates)
+    copies['latitude'] += rng.normal(0, 15, duplicates) / METRES_PER_DEGREE
+    copies['longitude'] += rng.normal(0, 15, duplicates) / METRES_PER_DEGREE
+    copies.loc[rng.random(duplicates) < 0.5, 'phone'] = None
+    listings = pd.concat([originals, copies], ignore_index=True)
+    return listings.assign(listing_id=np.arange(len(listings)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Provider deduplication benchmark')
+    parser.add_argument('--providers', type=int, default=400_000)
+    parser.add_argument('--duplicates', type=int, default=20_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+    
+    deduplicator = ProviderDeduplicator()
+    failures = check_regression_pairs(deduplicator)
+    
+    providers = synthetic_providers(args.providers, args.duplicates, args.seed)
+    start = time.perf_counter()
+    result = deduplicator.resolve(providers)
+    seconds = time.perf_counter() - start
+    
+    # Every injected copy should share its original's cluster, and nothing else should merge
+    clusters = result.providers.groupby('cluster_id')['source_id'].nunique()
+    recovered = int((result.providers.groupby('source_id')['cluster_id'].nunique() == 1).sum()
+                    - (args.providers - args.duplicates))
+    shuffled = deduplicator.resolve(providers.sample(frac=1, random_state=args.seed))
+    stable = (shuffled.providers.sort_values('listing_id')['cluster_id'].tolist()
+              == result.providers.sort_values('listing_id')['cluster_id'].tolist())
+    
+    results = {
+        'records': len(providers),
+        'seconds': round(seconds, 3),
+        'duplicates_recovered': recovered,
+        'duplicates_injected': args.duplicates,
+        'false_merges': int((clusters > 1).sum()),
+        'stable_ids_after_shuffle': stable,
+        'regression_failures': failures,
+        **result.stats,
+    }
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"\n=== DEDUP BENCHMARK ({len(providers):,} records, {args.duplicates:,} injected duplicates) ===")
+        print(f"Resolve: {seconds:.3f}s  comparisons/record {result.stats['comparisons_per_record']}")
+        print(f"Recovered duplicates: {recovered:,} / {args.duplicates:,}")
+        print(f"False merges: {results['false_merges']:,}")
+        print(f"Stable IDs after shuffle: {stable}")
+        for failure in failures:
+            print(f"❌ {failure}", file=sys.stderr)
+    if failures or not stable or results['false_merges']:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Run every analyzer stage on the Spark and Arrow engines and compare results
+Each engine runs in its own process so startup time and peak memory are measured cleanly
+"""
+
+import argparse
+import contextlib
+import dataclasses
+import io
+import json
+import math
+import os
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+# Local Spark's Python workers import the repo's UDF modules (geo_distance, profile_sketches) too
+os.environ['PYTHONPATH'] = os.pathsep.join(filter(None, [str(Path(__file__).parent.parent),
+                                                         os.environ.get('PYTHONPATH')]))
+
+from google_maps_analysis import GoogleMapsHealthcareAnalyzer
+
+ENGINES = ['spark', 'arrow']
+# Spark keeps percentile_approx for the median, so it may differ from Arrow's exact median
+APPROXIMATE_FIELDS = {'median_reviews'}
+
+
+def make_engine(name):
+    if name == 'spark':
+        from pyspark.sql import SparkSession
+        from spark_engine import SparkEngine
+        start = time.perf_counter()
+        session = SparkSession.builder.master('local[*]').appName('EngineBenchmark').getOrCreate()
+        engine = SparkEngine(session)
+        engine.startup_seconds = time.perf_counter() - start
+        return engine
+    from arrow_engine import ArrowEngine
+    return ArrowEngine()
+
+
+def run_stages(engine_name, data_path):
+    """Run each analyzer stage once; returns (stage results, seconds per stage, resource report)"""
+    analyzer = GoogleMapsHealthcareAnalyzer(data_path, engine=make_engine(engine_name))
+    stages = {
+        'load': analyzer.load_data,
+        'schema': analyzer.analyze_schema,
+        'healthcare_count': analyzer.get_healthcare_count,
+        'categories': lambda: analyzer.analyze_healthcare_categories(analyzer.identify_healthcare_providers()),
+        'geographic': lambda: analyzer.analyze_geographic_coverage(analyzer.identify_healthcare_providers()),
+        'quality': lambda: analyzer.analyze_quality_metrics(analyzer.identify_healthcare_providers()),
+        'completeness': lambda: analyzer.assess_data_completeness(analyzer.identify_healthcare_providers()),
+        'samples': lambda: analyzer.generate_sample_providers(analyzer.identify_healthcare_providers()),
+        'proximity': lambda: analyzer.analyze_proximity(40.7128, -74.0060, analyzer.identify_healthcare_providers()),
+    }
+    results, timings = {}, {}
+    for name, stage in stages.items():
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            results[name] = stage()
+        timings[name] = round(time.perf_counter() - start, 3)
+    return results, timings, analyzer.engine.resource_report()
+
+
+def compare(left, right, path=''):
+    """Yield descriptions of differences between two stage results"""
+    if dataclasses.is_dataclass(left) and dataclasses.is_dataclass(right):
+        yield from compare(vars(left), vars(right), path)
+    elif isinstance(left, dict):
+        for key in sorted(set(left) | set(right) - APPROXIMATE_FIELDS):
+            yield from compare(left.get(key), right.get(key), f'{path}.{key}')
+    elif isinstance(left, pd.DataFrame):
+        try:
+            pd.testing.assert_frame_equal(left.reset_index(drop=True), right.reset_index(drop=True),
+                                          check_dtype=False, rtol=1e-9)
+        except AssertionError as e:
+            yield f'{path}: {str(e).splitlines()[0]}'
+    elif isinstance(left, float) and isinstance(right, float):
+        # Engines sum in different orders, so compare floats like the frames above
+        if not (math.isclose(left, right, rel_tol=1e-9) or (math.isnan(left) and math.isnan(right))):
+            yield f'{path}: {left!r} != {right!r}'
+    elif left != right:
+        yield f'{path}: {left!r} != {right!r}'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spark vs Arrow engine benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='Synthetic rows when --data is not given')
+    parser.add_argument('--data', help='Existing Parquet path to analyze')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    parser.add_argument('--worker', choices=ENGINES, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        with open(args.output, 'wb') as f:
+            pickle.dump(run_stages(args.worker, args.data), f)
+        return
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = args.data
+        if data_path is None:
+            from pyspark.sql import SparkSession
+            from synthetic_data import write_synthetic_parquet
+            spark = SparkSession.builder.master('local[*]').getOrCreate()
+            data_path = write_synthetic_parquet(spark, str(Path(tmp) / 'businesses.parquet'), args.rows,
+                                                seed=args.seed)
+            spark.stop()
+        
+        runs = {}
+        for engine in ENGINES:
+            output = str(Path(tmp) / f'{engine}.pkl')
+            subprocess.run([sys.executable, __file__, '--worker', engine, '--data', data_path,
+                            '--output', output], check=True)
+            with open(output, 'rb') as f:
+                runs[engine] = pickle.load(f)
+    
+    differences = list(compare(runs['spark'][0], runs['arrow'][0]))
+    summary = {
+        engine: {'stage_seconds': timings, 'resources': report}
+        for engine, (_, timings, report) in runs.items()
+    }
+    summary['identical_results'] = not differences
+    summary['differences'] = differences
+    
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        sys.exit(1 if differences else 0)
+    
+    print("\n=== ENGINE BENCHMARK ===")
+    stages = list(summary['spark']['stage_seconds'])
+    print(f"{'stage':<18}" + ''.join(f"{engine:>12}" for engine in ENGINES))
+    for stage in stages:
+        print(f"{stage:<18}" + ''.join(f"{summary[e]['stage_seconds'][stage]:>11.3f}s" for e in ENGINES))
+    for key in ['startup_seconds', 'python_peak_rss_bytes', 'jvm_peak_heap_bytes', 'arrow_peak_pool_bytes']:
+        values = [summary[e]['resources'].get(key) for e in ENGINES]
+        print(f"{key:<24}" + ''.join(f"{'-' if v is None else v:>16}" for v in values))
+    if differences:
+        print("❌ Results differ between engines:")
+        for difference in differences:
+            print(f"   {difference}")
+        sys.exit(1)
+    else:
+        print("✅ Both engines produced identical results")
+
+
+if __name__ == '__main__':
+    main()
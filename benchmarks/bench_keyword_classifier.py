@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled healthcare keyword classifier against the old contains() chain
+Runs on a synthetic google_maps_businesses-shaped table in local Spark
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from functools import reduce
+from pathlib import Path
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, lower
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from google_maps_analysis import GoogleMapsHealthcareAnalyzer
+from healthcare_classifier import HealthcareKeywordClassifier
+from synthetic_data import write_synthetic_parquet
+
+
+def legacy_filter(df, keywords):
+    """The original per-keyword predicate chain from identify_healthcare_providers"""
+    conditions = [lower(col(c)).contains(k) for c in ('category', 'name') for k in keywords]
+    return df.filter(reduce(lambda a, b: a | b, conditions))
+
+
+def time_action(action, repeat):
+    """Run action repeat times; return (best seconds, last result)"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = action()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keyword classifier benchmark')
+    parser.add_argument('--rows', type=int, default=5_000_000, help='Synthetic row count')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per variant (best is reported)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+    
+    spark = (SparkSession.builder
+             .master('local[*]')
+             .appName('KeywordClassifierBenchmark')
+             .getOrCreate())
+    keywords = GoogleMapsHealthcareAnalyzer().healthcare_keywords
+    classifier = HealthcareKeywordClassifier(keywords)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        # Materialize once so both variants pay the same Parquet scan cost
+        path = write_synthetic_parquet(spark, str(Path(tmp) / 'businesses.parquet'), args.rows, seed=args.seed)
+        df = spark.read.parquet(path)
+        
+        variants = {
+            'contains_chain': lambda: legacy_filter(df, keywords).count(),
+            'compiled_regex': lambda: classifier.filter(df).count(),
+            'compiled_regex_tag_types': lambda: (classifier.filter(df)
+                                                 .groupBy('provider_type').count().collect()),
+        }
+        results = {}
+        for name, action in variants.items():
+            seconds, value = time_action(action, args.repeat)
+            results[name] = {'seconds': round(seconds, 3), 'result': value if isinstance(value, int) else len(value)}
+    
+    spark.stop()
+    
+    mismatch = results['contains_chain']['result'] != results['compiled_regex']['result']
+    if mismatch:
+        print("❌ Row counts differ between contains chain and compiled regex", file=sys.stderr)
+    
+    if args.json:
+        print(json.dumps({'rows': args.rows, 'repeat': args.repeat, 'results': results}, indent=2))
+    else:
+        print(f"\n=== KEYWORD CLASSIFIER BENCHMARK ({args.rows:,} rows, best of {args.repeat}) ===")
+        baseline = results['contains_chain']['seconds']
+        for name, result in results.items():
+            print(f"{name:<28} {result['seconds']:>8.3f}s  {baseline / result['seconds']:>5.2f}x  result={result['result']:,}")
+    if mismatch:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
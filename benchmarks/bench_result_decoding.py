@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark decoding Statement API JSON_ARRAY results into DataFrames
+Compares the schema-typed decoder of .tools/databricks-sql-cli.py against the original
+object-dtype DataFrame of strings, on a synthetic rating/reviews-shaped payload
+"""
+
+import argparse
+import importlib.util
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+CLI_PATH = Path(__file__).parent.parent / '.tools' / 'databricks-sql-cli.py'
+
+MANIFEST_COLUMNS = [
+    {'name': 'provider_id', 'type_name': 'LONG', 'type_text': 'BIGINT'},
+    {'name': 'name', 'type_name': 'STRING', 'type_text': 'STRING'},
+    {'name': 'rating', 'type_name': 'DOUBLE', 'type_text': 'DOUBLE'},
+    {'name': 'reviews_count', 'type_name': 'INT', 'type_text': 'INT'},
+    {'name': 'avg_price', 'type_name': 'DECIMAL', 'type_text': 'DECIMAL(10,2)', 'type_precision': 10, 'type_scale': 2},
+    {'name': 'opened', 'type_name': 'DATE', 'type_text': 'DATE'},
+    {'name': 'updated_at', 'type_name': 'TIMESTAMP', 'type_text': 'TIMESTAMP'},
+    {'name': 'open_now', 'type_name': 'BOOLEAN', 'type_text': 'BOOLEAN'},
+]
+
+
+def load_cli():
+    spec = importlib.util.spec_from_file_location('databricks_sql_cli', CLI_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synthetic_rows(n, seed, null_rate=0.1):
+    """Rows as the API returns them: every value a string, nulls as None"""
+    rng = np.random.default_rng(seed)
+    columns = [
+        np.arange(n).astype(str),
+        np.char.add('Provider ', np.arange(n).astype(str)),
+        np.round(rng.uniform(1.0, 5.0, n), 1).astype(str),
+        rng.integers(0, 5000, n).astype(str),
+        np.char.mod('%.2f', rng.uniform(10, 500, n)),
+        (np.datetime64('2000-01-01') + rng.integers(0, 9000, n)).astype(str),
+        np.char.add((np.datetime64('2024-01-01T00:00:00', 's') + rng.integers(0, 3e7, n)).astype(str), '.000Z'),
+        np.where(rng.random(n) < 0.5, 'true', 'false'),
+    ]
+    columns = [np.where(rng.random(n) < null_rate, None, c.astype(object)) if i else c.astype(object)
+               for i, c in enumerate(columns)]
+    return [list(row) for row in zip(*columns)]
+
+
+def convert_strings(frame):
+    """Object-dtype frame converted column by column in pandas, the pre-decoder way to get numbers"""
+    return frame.assign(
+        provider_id=pd.to_numeric(frame['provider_id']),
+        rating=pd.to_numeric(frame['rating']),
+        reviews_count=pd.to_numeric(frame['reviews_count']),
+        avg_price=pd.to_numeric(frame['avg_price']),
+        opened=pd.to_datetime(frame['opened']),
+        updated_at=pd.to_datetime(frame['updated_at'], utc=True),
+        open_now=frame['open_now'].map({'true': True, 'false': False}),
+    )
+
+
+def timed(run, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Statement result decoding benchmark')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+    
+    cli = load_cli()
+    rows = synthetic_rows(args.rows, args.seed)
+    payload = json.dumps(rows)
+    manifest = {'schema': {'columns': MANIFEST_COLUMNS}}
+    names = [col['name'] for col in MANIFEST_COLUMNS]
+    
+    json_seconds, rows = timed(lambda: json.loads(payload), 1)
+    schema = cli.result_schema({'manifest': manifest})
+    strings_seconds, strings = timed(lambda: pd.DataFrame(rows, columns=names, dtype=object), args.repeat)
+    converted_seconds, _ = timed(lambda: convert_strings(pd.DataFrame(rows, columns=names, dtype=object)), args.repeat)
+    typed_seconds, typed = timed(lambda: cli.table_to_frame(pa.Table.from_batches([cli.rows_to_batch(rows, schema)])), args.repeat)
+    
+    # Numbers must survive decoding unchanged
+    expected = pd.to_numeric(strings['rating']).to_numpy(dtype=np.float64, na_value=np.nan)
+    if not np.array_equal(typed['rating'].to_numpy(dtype=np.float64, na_value=np.nan), expected, equal_nan=True):
+        raise SystemExit("❌ Typed ratings differ from the string payload")
+    
+    results = {
+        'rows': args.rows,
+        'payload_mb': round(len(payload) / 1e6, 1),
+        'json_parse_seconds': round(json_seconds, 3),
+        'strings_seconds': round(strings_seconds, 3),
+        'strings_converted_seconds': round(converted_seconds, 3),
+        'typed_seconds': round(typed_seconds, 3),
+        'strings_mb': round(strings.memory_usage(deep=True).sum() / 1e6, 1),
+        'typed_mb': round(typed.memory_usage(deep=True).sum() / 1e6, 1),
+        'typed_dtypes': {name: str(dtype) for name, dtype in typed.dtypes.items()},
+    }
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"\n=== RESULT DECODING BENCHMARK ({args.rows:,} rows, {results['payload_mb']} MB JSON) ===")
+    print(f"JSON parse (both paths): {results['json_parse_seconds']:.3f}s")
+    print(f"{'object strings':<16} {results['strings_seconds']:>8.3f}s  {results['strings_mb']:>8.1f} MB")
+    print(f"{'+ pandas parse':<16} {results['strings_converted_seconds']:>8.3f}s")
+    print(f"{'typed':<16} {results['typed_seconds']:>8.3f}s  {results['typed_mb']:>8.1f} MB  "
+          f"{results['strings_mb'] / results['typed_mb']:.1f}x smaller")
+    for name, dtype in results['typed_dtypes'].items():
+        print(f"  {name:<14} {dtype}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark ProviderSpatialIndex queries against a brute-force haversine scan
+Uses 400k synthetic providers spread over the continental US; no Spark required
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from geo_distance import haversine_distance
+from provider_spatial_index import ProviderSpatialIndex
+
+PROVIDER_TYPES = ['dentist', 'doctor', 'clinic', 'pharmacy', 'hospital', 'urgent_care', 'health']
+
+
+def synthetic_providers(n, seed):
+    """Random providers within the continental US bounding box"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'name': [f'Provider {i}' for i in range(n)],
+        'category': 'Medical clinic',
+        'address': '1 Main St',
+        'latitude': rng.uniform(24.5, 49.4, n),
+        'longitude': rng.uniform(-124.8, -66.9, n),
+        'phone': None,
+        'website': None,
+        'rating': np.round(rng.uniform(1.0, 5.0, n), 1),
+        'provider_type': rng.choice(PROVIDER_TYPES, n),
+    })
+
+
+def brute_force(providers, lat, lng, k, provider_type=None, min_rating=0):
+    """Full vectorized scan: filter, compute every distance, partial sort"""
+    mask = providers['rating'].to_numpy() >= min_rating
+    if provider_type is not None:
+        mask &= providers['provider_type'].to_numpy() == provider_type
+    rows = np.flatnonzero(mask)
+    distances = haversine_distance(lat, lng, providers['latitude'].to_numpy()[rows],
+                                providers['longitude'].to_numpy()[rows])
+    top = np.argpartition(distances, min(k, len(rows) - 1))[:k]
+    return rows[top[np.argsort(distances[top])]]
+
+
+def time_queries(run, origins):
+    start = time.perf_counter()
+    for lat, lng in origins:
+        run(lat, lng)
+    return (time.perf_counter() - start) / len(origins) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spatial index benchmark')
+    parser.add_argument('--points', type=int, default=400_000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--k', type=int, default=25)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+    
+    providers = synthetic_providers(args.points, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    origins = list(zip(rng.uniform(25.0, 49.0, args.queries), rng.uniform(-124.0, -67.0, args.queries)))
+    
+    start = time.perf_counter()
+    index = ProviderSpatialIndex(providers)
+    build_seconds = time.perf_counter() - start
+    
+    # Spot-check that the index agrees with the brute-force scan
+    mismatches = 0
+    for lat, lng in origins[:20]:
+        expected = providers['name'].to_numpy()[brute_force(providers, lat, lng, args.k)]
+        actual = [p['name'] for p in index.nearest(lat, lng, k=args.k)]
+        if list(expected) != actual:
+            mismatches += 1
+            print(f"❌ Mismatch for origin ({lat:.4f}, {lng:.4f})", file=sys.stderr)
+    
+    scenarios = {
+        'knn': ({}, {}),
+        'knn_type_rating': ({'provider_type': 'pharmacy', 'min_rating': 4.0},
+                            {'provider_type': 'pharmacy', 'min_rating': 4.0}),
+    }
+    results = {'points': args.points, 'queries': args.queries, 'build_seconds': round(build_seconds, 3)}
+    for name, (index_kwargs, brute_kwargs) in scenarios.items():
+        results[name] = {
+            'index_us': round(time_queries(lambda la, ln: index.nearest(la, ln, k=args.k, **index_kwargs), origins), 1),
+            'brute_force_us': round(time_queries(lambda la, ln: brute_force(providers, la, ln, args.k, **brute_kwargs), origins), 1),
+        }
+    results['radius_5mi'] = {
+        'index_us': round(time_queries(lambda la, ln: index.within_radius(la, ln, 5.0), origins), 1)
+    }
+    
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"\n=== SPATIAL INDEX BENCHMARK ({args.points:,} points, {args.queries} queries) ===")
+        print(f"Index build: {results['build_seconds']:.3f}s")
+        for name in scenarios:
+            r = results[name]
+            print(f"{name:<16} index {r['index_us']:>10.1f}us  brute force {r['brute_force_us']:>10.1f}us  "
+                  f"{r['brute_force_us'] / r['index_us']:>6.1f}x")
+        print(f"{'radius_5mi':<16} index {results['radius_5mi']['index_us']:>10.1f}us")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
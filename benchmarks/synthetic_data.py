@@ -0,0 +1,206 @@
+"""
+Seeded synthetic google_maps_businesses-shaped data for local Spark benchmarks
+Rows are generated on the executors from spark.range, so nothing is built on the driver.
+Category mix, null rates and coordinates follow google_maps_analysis_results.md.
+"""
+
+import math
+
+from pyspark.sql.functions import (array, col, concat, concat_ws, element_at, exp, floor,
+                                   format_string, lit, rand, randn, when)
+from pyspark.sql.functions import round as spark_round
+
+from google_maps_analysis import GoogleMapsHealthcareAnalyzer
+from healthcare_classifier import HealthcareKeywordClassifier
+
+# Healthcare category shares of the 388,102 keyword-classified rows (top 20 from the analysis
+# results); the remaining 13.5% is spread over the long-tail categories below. Every healthcare
+# category and none of the other vocabulary matches the analyzer's keywords, so the classified
+# share is healthcare_fraction (see check_vocabulary)
+HEALTHCARE_CATEGORY_SHARES = [
+    ('Dentist', 0.220), ('Doctor', 0.160), ('Medical clinic', 0.136), ('Pharmacy', 0.118),
+    ('Mental health service', 0.031), ('Home health care service', 0.031),
+    ('Physical therapy clinic', 0.023), ('Medical Center', 0.017), ('Medical spa', 0.016),
+    ('Mental health clinic', 0.015), ('Medical laboratory', 0.013), ('Hospital', 0.012),
+    ('Medical supply store', 0.012), ('Acupuncture clinic', 0.011), ('Skin care clinic', 0.011),
+    ('Dental clinic', 0.011), ('Pediatric dentist', 0.010), ('Health consultant', 0.009),
+    ('Health insurance agency', 0.009), ('Health care facility', 0.007),
+]
+HEALTHCARE_LONG_TAIL = [
+    'Urgent care center', 'Emergency room', 'Chiropractic clinic', 'Optometry clinic', 'Podiatry clinic',
+    'Cardiology practice', 'Dermatology practice', 'Orthopedic surgeon', 'Pediatrician', 'Psychiatry practice',
+    'Rehabilitation center', 'Nursing home', 'Sports medicine physician', 'Occupational therapy clinic'
+]
+OTHER_CATEGORIES = [
+    'Restaurant', 'Coffee shop', 'Hair salon', 'Auto repair shop', 'Gas station',
+    'Grocery store', 'Bank', 'Hotel', 'Gym', 'Church', 'Car dealer',
+    'Real estate agency', 'Lawyer', 'Bakery', 'Bar', 'Car wash', 'Pet groomer',
+    'Insurance agency', 'Veterinarian', 'Storage facility'
+]
+NAME_PREFIXES = [
+    'Sunrise', 'Main Street', 'Valley', 'Lakeside', 'Summit', 'Riverside',
+    'Oak', 'Pioneer', 'Golden', 'Northside', 'Harbor', 'Cedar'
+]
+NAME_SUFFIXES = [
+    'Group', 'Center', 'Services', 'Partners', '& Co', 'Shop', 'Studio',
+    'Works', 'Outlet', 'Supply', 'Associates', 'Express'
+]
+
+# Field null rates; address/coordinate/phone/website rates are from the analysis results
+NULL_RATES = {
+    'address': 0.0004, 'coordinates': 0.00001, 'phone': 0.053, 'website': 0.453,
+    'rating': 0.12, 'reviews_count': 0.12, 'category': 0.002,
+}
+HEALTHCARE_FRACTION = 388102 / 5000000
+
+US_BOUNDS = {'min_lat': 24.5, 'max_lat': 49.4, 'min_lng': -124.8, 'max_lng': -66.9}
+# Metro centers businesses cluster around, with relative weights
+METRO_CENTERS = [
+    (40.71, -74.01, 8), (34.05, -118.24, 6), (41.88, -87.63, 4), (29.76, -95.37, 3),
+    (33.45, -112.07, 2), (39.95, -75.17, 2), (29.42, -98.49, 2), (32.72, -117.16, 2),
+    (32.78, -96.80, 3), (37.77, -122.42, 3), (47.61, -122.33, 2), (25.76, -80.19, 3),
+    (33.75, -84.39, 3), (42.36, -71.06, 2), (39.74, -104.99, 2), (44.98, -93.27, 1),
+]
+# City and state of each metro center, in METRO_CENTERS order
+METRO_CITIES = [
+    ('New York', 'NY'), ('Los Angeles', 'CA'), ('Chicago', 'IL'), ('Houston', 'TX'),
+    ('Phoenix', 'AZ'), ('Philadelphia', 'PA'), ('San Antonio', 'TX'), ('San Diego', 'CA'),
+    ('Dallas', 'TX'), ('San Francisco', 'CA'), ('Seattle', 'WA'), ('Miami', 'FL'),
+    ('Atlanta', 'GA'), ('Boston', 'MA'), ('Denver', 'CO'), ('Minneapolis', 'MN'),
+]
+# States of rows outside the metros; their small counts give the long tail of per-state skew
+CONTINENTAL_STATES = [
+    'AL', 'AZ', 'AR', 'CA', 'CO', 'CT', 'DE', 'FL', 'GA', 'ID', 'IL', 'IN', 'IA', 'KS', 'KY', 'LA',
+    'ME', 'MD', 'MA', 'MI', 'MN', 'MS', 'MO', 'MT', 'NE', 'NV', 'NH', 'NJ', 'NM', 'NY', 'NC', 'ND',
+    'OH', 'OK', 'OR', 'PA', 'RI', 'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY',
+]
+METRO_FRACTION = 0.7
+
+
+def _pick(values, seed):
+    """Uniformly pick one literal from values per row"""
+    options = array(*[lit(v) for v in values])
+    return element_at(options, (floor(rand(seed) * len(values)) + 1).cast('int'))
+
+
+def _pick_weighted(weighted_values, draw):
+    """Pick one literal per row with the given (value, weight) probabilities
+    
+    draw must be a uniform [0, 1) column materialized by an earlier projection: a rand()
+    inside each when() condition is only advanced when that condition is evaluated.
+    """
+    total = sum(weight for _, weight in weighted_values)
+    draw = draw * total
+    picked, cumulative = None, 0.0
+    for value, weight in weighted_values:
+        cumulative += weight
+        picked = (when(draw < cumulative, lit(value)) if picked is None
+                  else picked.when(draw < cumulative, lit(value)))
+    return picked.otherwise(lit(weighted_values[-1][0]))
+
+
+def check_vocabulary(keywords=None):
+    """Assert every healthcare category, and nothing else generated, matches the keywords
+    
+    Names are drawn for every row, so a keyword in a name suffix or other category would
+    classify non-healthcare rows as healthcare and dilute the category skew.
+    """
+    keywords = keywords or GoogleMapsHealthcareAnalyzer().healthcare_keywords
+    classifier = HealthcareKeywordClassifier(keywords)
+    healthcare = [c for c, _ in HEALTHCARE_CATEGORY_SHARES] + HEALTHCARE_LONG_TAIL
+    unmatched = [c for c in healthcare if classifier.classify_text(c)[0] is None]
+    matched = [t for t in OTHER_CATEGORIES + NAME_PREFIXES + NAME_SUFFIXES
+               if classifier.classify_text(t)[0] is not None]
+    assert not unmatched, f'healthcare categories without a keyword: {unmatched}'
+    assert not matched, f'non-healthcare vocabulary with a keyword: {matched}'
+    return classifier
+
+
+def check_classified_fraction(df, healthcare_fraction=HEALTHCARE_FRACTION, category_null_rate=None,
+                              keywords=None):
+    """Assert the keyword-classified share of df is within sampling error of healthcare_fraction
+    
+    Healthcare rows with a null category have nothing to match, so they are not classified.
+    """
+    classifier = check_vocabulary(keywords)
+    if category_null_rate is None:
+        category_null_rate = NULL_RATES['category']
+    total = df.count()
+    classified = classifier.tag(df).filter(col('matched_keyword').isNotNull()).count()
+    expected = healthcare_fraction * (1 - category_null_rate)
+    tolerance = 5 * math.sqrt(expected * (1 - expected) / max(total, 1))
+    realized = classified / max(total, 1)
+    assert abs(realized - expected) <= tolerance, (
+        f'classified fraction {realized:.4f} is not within {tolerance:.4f} of {expected:.4f}')
+    return realized
+
+
+def _nullify(column, rate, seed):
+    return when(rand(seed) < rate, lit(None)).otherwise(column) if rate else column
+
+
+def synthetic_businesses(spark, n_rows, seed=42, healthcare_fraction=HEALTHCARE_FRACTION,
+                         null_rates=None, num_partitions=None):
+    """Generate a deterministic businesses DataFrame with n_rows rows
+    
+    The same seed and num_partitions always produce the same rows.
+    """
+    check_vocabulary()
+    null_rates = {**NULL_RATES, **(null_rates or {})}
+    base = (spark.range(0, n_rows, numPartitions=num_partitions or spark.sparkContext.defaultParallelism)
+            .select('id', rand(seed + 1).alias('category_draw'), rand(seed + 9).alias('metro_draw'),
+                    (rand(seed + 10) < METRO_FRACTION).alias('in_metro')))
+    
+    top_share = sum(share for _, share in HEALTHCARE_CATEGORY_SHARES)
+    tail_share = (1 - top_share) / len(HEALTHCARE_LONG_TAIL)
+    healthcare_weights = HEALTHCARE_CATEGORY_SHARES + [(c, tail_share) for c in HEALTHCARE_LONG_TAIL]
+    
+    is_healthcare = rand(seed) < healthcare_fraction
+    category = when(is_healthcare, _pick_weighted(healthcare_weights, col('category_draw'))).otherwise(
+        _pick(OTHER_CATEGORIES, seed + 2))
+    name = concat_ws(' ', _pick(NAME_PREFIXES, seed + 3), _pick(NAME_SUFFIXES, seed + 4))
+    
+    # Most rows cluster around metro centers, the rest spread over the continental US
+    in_metro = col('in_metro')
+    # One materialized draw per row, so center, city and state all come from the same metro
+    metro_index = _pick_weighted([(i, weight) for i, (_, _, weight) in enumerate(METRO_CENTERS)], col('metro_draw'))
+    center_lat = element_at(array(*[lit(lat) for lat, _, _ in METRO_CENTERS]), metro_index + 1)
+    center_lng = element_at(array(*[lit(lng) for _, lng, _ in METRO_CENTERS]), metro_index + 1)
+    lat_span = US_BOUNDS['max_lat'] - US_BOUNDS['min_lat']
+    lng_span = US_BOUNDS['max_lng'] - US_BOUNDS['min_lng']
+    latitude = when(in_metro, center_lat + randn(seed + 5) * 0.4).otherwise(
+        lit(US_BOUNDS['min_lat']) + rand(seed + 5) * lat_span)
+    longitude = when(in_metro, center_lng + randn(seed + 6) * 0.5).otherwise(
+        lit(US_BOUNDS['min_lng']) + rand(seed + 6) * lng_span)
+    coordinates_missing = rand(seed + 11) < null_rates['coordinates']
+    city = when(in_metro, element_at(array(*[lit(c) for c, _ in METRO_CITIES]), metro_index + 1)).otherwise(
+        lit('Springfield'))
+    state = when(in_metro, element_at(array(*[lit(s) for _, s in METRO_CITIES]), metro_index + 1)).otherwise(
+        _pick(CONTINENTAL_STATES, seed + 18))
+    
+    return base.select(
+        col('id').alias('business_id'),
+        name.alias('name'),
+        _nullify(category, null_rates['category'], seed + 12).alias('category'),
+        _nullify(format_string('%d Main St, %s, %s %05d', col('id') % 9999 + 1, city, state, col('id') % 99999),
+                 null_rates['address'], seed + 13).alias('address'),
+        when(~coordinates_missing, latitude).alias('latitude'),
+        when(~coordinates_missing, longitude).alias('longitude'),
+        _nullify(spark_round(lit(1.0) + rand(seed + 7) * 4, 1), null_rates['rating'], seed + 14).alias('rating'),
+        _nullify(floor(exp(rand(seed + 8) * 8)).cast('long'), null_rates['reviews_count'], seed + 15).alias('reviews_count'),
+        _nullify(format_string('+1%010d', col('id') % 10000000000), null_rates['phone'], seed + 16).alias('phone'),
+        _nullify(concat(lit('https://example.com/biz/'), col('id').cast('string')),
+                 null_rates['website'], seed + 17).alias('website')
+    )
+
+
+def write_synthetic_parquet(spark, path, n_rows, seed=42, **kwargs):
+    """Materialize synthetic rows to Parquet so every run reads identical input
+    
+    The written rows are checked to classify as healthcare at healthcare_fraction.
+    """
+    synthetic_businesses(spark, n_rows, seed=seed, **kwargs).write.mode('overwrite').parquet(path)
+    check_classified_fraction(spark.read.parquet(path),
+                              kwargs.get('healthcare_fraction', HEALTHCARE_FRACTION),
+                              {**NULL_RATES, **(kwargs.get('null_rates') or {})}['category'])
+    return path
@@ -1,22 +1,46 @@
 """
 Google Maps Businesses Table Analysis for CareConnect Healthcare Provider Recommendations
-Python script for comprehensive analysis in Databricks environment
+Python script for comprehensive analysis in Databricks environment, or locally on
+Parquet extracts through the Arrow engine
 """
 
+import json
+import threading
+import time
+
+import numpy as np
 import pandas as pd
-from pyspark.sql import SparkSession
-from pyspark.sql.functions import *
-from pyspark.sql.types import *
-import matplotlib.pyplot as plt
-import seaborn as sns
 
-# Initialize Spark session (already available in Databricks)
-# spark = SparkSession.builder.appName("GoogleMapsHealthcareAnalysis").getOrCreate()
+from analysis_results import (CategoryStats, CompletenessReport, GeographicBounds, ProximityStats,
+                              QualityMetrics, RatingHistogram, ReviewStats, SampleProviders)
+from healthcare_classifier import CategoryDictionary, HealthcareKeywordClassifier
+from provider_dedup import ProviderDeduplicator
+from profile_sketches import SketchProfile
+from stage_profiler import StageProfiler
+from stage_runner import run_stages
+
+# Spark session is resolved by SparkEngine (the active Databricks session when available)
 
 class GoogleMapsHealthcareAnalyzer:
-    def __init__(self, table_name="dais-hackathon-2025.bright_initiative.google_maps_businesses"):
+    def __init__(self, table_name="dais-hackathon-2025.bright_initiative.google_maps_businesses",
+                 storage_level='MEMORY_AND_DISK', engine=None):
+        """Analyze table_name with the given engine
+        
+        engine defaults to SparkEngine. Pass ArrowEngine() and a Parquet path as
+        table_name to run the same analysis locally without a JVM.
+        """
         self.table_name = table_name
         self.df = None
+        self.engine = engine
+        # Storage level for the persisted healthcare subset; a StorageLevel or its name
+        self.storage_level = storage_level
+        self._healthcare_df = None
+        self._memo = {}
+        # One lock per memo key, so concurrent stages wait for a shared count instead of repeating it
+        self._memo_lock = threading.Lock()
+        self._memo_key_locks = {}
+        # Per-stage timings and engine metrics of the last run_comprehensive_analysis
+        self.stage_profile = None
         self.healthcare_keywords = [
             'health', 'medical', 'doctor', 'hospital', 'clinic', 'pharmacy',
             'dentist', 'specialist', 'care', 'physician', 'urgent', 'emergency',
@@ -27,14 +51,52 @@ class GoogleMapsHealthcareAnalyzer:
     def load_data(self):
         """Load the Google Maps businesses table"""
         try:
-            self.df = spark.table(self.table_name)
+            if self.engine is None:
+                from spark_engine import SparkEngine
+                self.engine = SparkEngine()
+            self.release_cache()
+            self.df = self.engine.load(self.table_name)
             print(f"Successfully loaded {self.table_name}")
-            print(f"Total records: {self.df.count():,}")
+            print(f"Total records: {self.get_total_count():,}")
             return True
         except Exception as e:
             print(f"Error loading table: {e}")
             return False
     
+    def _memoize(self, key, compute):
+        """Return a cached count or stage result, computing it on first use"""
+        if key in self._memo:
+            return self._memo[key]
+        with self._memo_lock:
+            key_lock = self._memo_key_locks.setdefault(key, threading.RLock())
+        with key_lock:
+            if key not in self._memo:
+                self._memo[key] = compute()
+            return self._memo[key]
+    
+    def _columns(self, df):
+        return self.engine.columns(df)
+    
+    def get_total_count(self):
+        """Row count of the loaded table, computed once per load"""
+        return self._memoize('total_count', lambda: self.engine.count(self.df))
+    
+    def get_healthcare_count(self):
+        """Row count of the healthcare subset, computed once per load"""
+        healthcare_df = self.identify_healthcare_providers(verbose=False)
+        if healthcare_df is None:
+            return None
+        return self._memoize('healthcare_count', lambda: self.engine.count(healthcare_df))
+    
+    def release_cache(self):
+        """Unpersist the healthcare subset and drop memoized scalars"""
+        if self._healthcare_df is not None:
+            self.engine.unpersist(self._healthcare_df)
+            self._healthcare_df = None
+        with self._memo_lock:
+            self._memo.clear()
+            self._memo_key_locks.clear()
+    
     def analyze_schema(self):
         """Analyze table schema and structure"""
         if self.df is None:
@@ -42,102 +104,185 @@ class GoogleMapsHealthcareAnalyzer:
             return
         
         print("\n=== TABLE SCHEMA ===")
-        self.df.printSchema()
+        self.engine.print_schema(self.df)
         
         print("\n=== COLUMN SUMMARY ===")
-        columns_info = []
-        for col_name in self.df.columns:
-            col_type = dict(self.df.dtypes)[col_name]
-            null_count = self.df.filter(col(col_name).isNull()).count()
-            total_count = self.df.count()
-            completeness = ((total_count - null_count) / total_count) * 100
-            
-            columns_info.append({
-                'column': col_name,
-                'type': col_type,
-                'null_count': null_count,
-                'completeness_pct': round(completeness, 2)
-            })
-        
-        schema_df = pd.DataFrame(columns_info)
+        profile = self.profile_columns(self.df)
+        schema_df = profile[['column', 'type', 'null_count', 'completeness_pct']]
         print(schema_df.to_string(index=False))
         
         return schema_df
     
-    def identify_healthcare_providers(self):
-        """Identify healthcare-related businesses"""
+    def profile_columns(self, df=None, columns=None):
+        """Profile null/non-null counts for many columns in a single pass
+        
+        The engine computes every non-null count and the total row count in one
+        scan. Returns a pandas DataFrame with one row per requested column, in order.
+        """
+        df_to_profile = df if df is not None else self.df
+        
+        if df_to_profile is None:
+            return None
+        
+        available = self._columns(df_to_profile)
+        columns = list(columns) if columns is not None else list(available)
+        present = [c for c in columns if c in available]
+        dtypes = self.engine.dtypes(df_to_profile)
+        
+        total_count, non_null = self.engine.profile_columns(df_to_profile, present)
+        
+        # The same scan yields the row count, so seed the memo for later stages
+        if df_to_profile is self.df:
+            self._memo.setdefault('total_count', total_count)
+        elif df_to_profile is self._healthcare_df:
+            self._memo.setdefault('healthcare_count', total_count)
+        
+        profile = pd.DataFrame({
+            'column': columns,
+            'type': [dtypes.get(c) for c in columns],
+            'present': [c in non_null for c in columns],
+            'total_count': total_count,
+            'non_null_count': [non_null.get(c, 0) for c in columns],
+        })
+        profile['null_count'] = total_count - profile['non_null_count']
+        profile['completeness_pct'] = (
+            (profile['non_null_count'] / total_count * 100).round(2)
+            if total_count else 0.0
+        )
+        
+        return profile
+    
+    def _classifier(self):
+        return HealthcareKeywordClassifier(self.healthcare_keywords)
+    
+    def category_dictionary(self, verbose=True):
+        """Classify every distinct category of the loaded table once
+        
+        Built from one grouped scan of the category column and cached until
+        release_cache(). Prints how many distinct categories exist and how many rows
+        each keyword/provider type mapping covers.
+        """
+        if self.df is None or 'category' not in self._columns(self.df):
+            return None
+        
+        dictionary = self._memoize('category_dictionary', lambda: CategoryDictionary.build(
+            self._classifier(), self.engine.category_counts(self.df)))
+        if not verbose:
+            return dictionary
+        
+        print("\n=== CATEGORY DICTIONARY ===")
+        for key, value in dictionary.summary().items():
+            print(f"{key}: {value:,}")
+        print(dictionary.coverage().to_string(index=False))
+        
+        return dictionary
+    
+    def identify_healthcare_providers(self, verbose=True, use_category_dictionary=False):
+        """Identify healthcare-related businesses
+        
+        Rows are tagged with matched_keyword and provider_type. The filtered
+        subset is persisted at the configured storage level and reused by every
+        later stage until release_cache() is called.
+        
+        With use_category_dictionary, categories are classified once through
+        category_dictionary() and rows are tagged by a broadcast join, so the regex
+        only runs on names of rows whose category did not match.
+        """
         if self.df is None:
             print("No data loaded. Call load_data() first.")
             return None
         
-        # Create healthcare filter conditions
-        healthcare_conditions = None
-        
-        # Check category field
-        if 'category' in self.df.columns:
-            category_conditions = [
-                lower(col('category')).contains(keyword) 
-                for keyword in self.healthcare_keywords
-            ]
-            healthcare_conditions = category_conditions[0]
-            for condition in category_conditions[1:]:
-                healthcare_conditions = healthcare_conditions | condition
-        
-        # Check name field
-        if 'name' in self.df.columns:
-            name_conditions = [
-                lower(col('name')).contains(keyword) 
-                for keyword in self.healthcare_keywords
-            ]
-            name_healthcare = name_conditions[0]
-            for condition in name_conditions[1:]:
-                name_healthcare = name_healthcare | condition
-            
-            if healthcare_conditions is not None:
-                healthcare_conditions = healthcare_conditions | name_healthcare
-            else:
-                healthcare_conditions = name_healthcare
+        if self._healthcare_df is not None:
+            return self._healthcare_df
         
-        if healthcare_conditions is None:
+        # One compiled regex per text column instead of a contains() per keyword
+        category_dictionary = self.category_dictionary(verbose) if use_category_dictionary else None
+        tagged_df = self.engine.filter_healthcare(self.df, self._classifier(), category_dictionary)
+        
+        if tagged_df is None:
             print("No category or name column found for healthcare identification")
             return None
         
-        # Filter healthcare providers
-        healthcare_df = self.df.filter(healthcare_conditions)
-        healthcare_count = healthcare_df.count()
-        total_count = self.df.count()
+        # Filter and persist healthcare providers; counting materializes the cache
+        healthcare_df = self.engine.persist(tagged_df, self.storage_level)
+        self._healthcare_df = healthcare_df
+        healthcare_count = self._memoize('healthcare_count', lambda: self.engine.count(healthcare_df))
+        total_count = self.get_total_count()
+        
+        if not verbose:
+            return healthcare_df
         
-        print(f"\n=== HEALTHCARE PROVIDER IDENTIFICATION ===")
+        print("\n=== HEALTHCARE PROVIDER IDENTIFICATION ===")
         print(f"Total healthcare providers found: {healthcare_count:,}")
-        print(f"Percentage of total: {(healthcare_count/total_count)*100:.2f}%")
+        print(f"Percentage of total: {(healthcare_count/total_count)*100 if total_count else 0:.2f}%")
         
         return healthcare_df
     
+    def deduplicate_providers(self, healthcare_df=None, deduplicator=None):
+        """Resolve duplicate listings into stable cluster IDs usable as provider keys
+        
+        Collects the normalized healthcare subset (~400k rows) and runs blocking,
+        pair scoring and clustering on the driver; see provider_dedup.
+        """
+        if healthcare_df is None:
+            healthcare_df = self.identify_healthcare_providers(verbose=False)
+        if healthcare_df is None or self._coordinate_columns(healthcare_df) is None:
+            print("Insufficient coordinate data found")
+            return None
+        
+        print("\n=== PROVIDER DEDUPLICATION ===")
+        
+        def compute():
+            start = time.perf_counter()
+            columns = ['name', 'category', 'address', 'latitude', 'longitude', 'phone', 'website',
+                       'rating', 'provider_type']
+            providers = self.engine.to_pandas_normalized(healthcare_df, columns)
+            collect_seconds = time.perf_counter() - start
+            result = (deduplicator or ProviderDeduplicator()).resolve(providers)
+            result.timings = {'collect_seconds': round(collect_seconds, 4), **result.timings}
+            return result
+        
+        result = self._memoize(('dedup', self._stage_key(healthcare_df)), compute)
+        for key, value in {**result.stats, **result.timings}.items():
+            print(f"{key}: {value:,}" if isinstance(value, int) else f"{key}: {value}")
+        
+        return result
+    
+    def _stage_key(self, df):
+        # Results are cached per dataset handle; release_cache() drops them with the data
+        return 'healthcare' if df is self._healthcare_df else ('table' if df is self.df else id(df))
+    
+    def category_stats(self, healthcare_df):
+        """CategoryStats for the dataset, queried once and cached"""
+        if healthcare_df is None or 'category' not in self._columns(healthcare_df):
+            return None
+        return self._memoize(('category_stats', self._stage_key(healthcare_df)),
+                             lambda: CategoryStats(self.engine.category_stats(healthcare_df)))
+    
     def analyze_healthcare_categories(self, healthcare_df):
         """Analyze healthcare provider categories"""
         if healthcare_df is None:
             return
         
-        if 'category' not in healthcare_df.columns:
+        category_stats = self.category_stats(healthcare_df)
+        if category_stats is None:
             print("No category column found")
             return
         
         print("\n=== HEALTHCARE CATEGORIES ANALYSIS ===")
-        
-        # Category distribution
-        category_stats = (healthcare_df
-                         .groupBy('category')
-                         .agg(
-                             count('*').alias('provider_count'),
-                             avg('rating').alias('avg_rating'),
-                             avg('reviews_count').alias('avg_reviews')
-                         )
-                         .orderBy(desc('provider_count')))
-        
-        category_stats.show(20, truncate=False)
+        print(category_stats.render(20))
         
         return category_stats
     
+    def geographic_bounds(self, healthcare_df=None):
+        """GeographicBounds of the dataset's coordinates, queried once and cached"""
+        df_to_analyze = healthcare_df if healthcare_df is not None else self.df
+        coord_cols = self._coordinate_columns(df_to_analyze) if df_to_analyze is not None else None
+        if coord_cols is None:
+            return None
+        return self._memoize(('geographic_bounds', self._stage_key(df_to_analyze)),
+                             lambda: GeographicBounds.from_frame(self.engine.geo_stats(df_to_analyze, *coord_cols)))
+    
     def analyze_geographic_coverage(self, healthcare_df=None):
         """Analyze geographic distribution of providers"""
         df_to_analyze = healthcare_df if healthcare_df is not None else self.df
@@ -148,31 +293,91 @@ class GoogleMapsHealthcareAnalyzer:
         print("\n=== GEOGRAPHIC COVERAGE ANALYSIS ===")
         
         # Check for coordinate columns
-        coord_cols = [col for col in ['latitude', 'longitude', 'lat', 'lng'] 
-                     if col in df_to_analyze.columns]
+        geo_bounds = self.geographic_bounds(df_to_analyze)
         
-        if len(coord_cols) < 2:
+        if geo_bounds is None:
             print("Insufficient coordinate data found")
             return
         
-        lat_col, lng_col = coord_cols[0], coord_cols[1]
+        print(geo_bounds.render())
         
-        # Geographic statistics
-        geo_stats = (df_to_analyze
-                    .filter((col(lat_col).isNotNull()) & (col(lng_col).isNotNull()))
-                    .agg(
-                        count('*').alias('records_with_coords'),
-                        min(lat_col).alias('min_lat'),
-                        max(lat_col).alias('max_lat'),
-                        min(lng_col).alias('min_lng'),
-                        max(lng_col).alias('max_lng'),
-                        avg(lat_col).alias('avg_lat'),
-                        avg(lng_col).alias('avg_lng')
-                    ))
+        return geo_bounds
+    
+    def _coordinate_columns(self, df):
+        """Return (lat_col, lng_col) present in df, or None"""
+        columns = self._columns(df)
+        lat_cols = [c for c in ['latitude', 'lat'] if c in columns]
+        lng_cols = [c for c in ['longitude', 'lng', 'lon'] if c in columns]
+        if not lat_cols or not lng_cols:
+            return None
+        return lat_cols[0], lng_cols[0]
+    
+    def add_distance_columns(self, df, origin_lat, origin_lng, unit='miles', dtype=np.float64):
+        """Append haversine distance and bearing from an origin
+        
+        Both columns are computed per Arrow batch (pandas UDFs on Spark); pass
+        dtype=np.float32 to halve the memory of the distance columns.
+        """
+        coord_cols = self._coordinate_columns(df)
+        if coord_cols is None:
+            print("Insufficient coordinate data found")
+            return None
+        
+        lat_col, lng_col = coord_cols
+        return self.engine.add_distance_columns(df, lat_col, lng_col, origin_lat, origin_lng, unit, dtype)
+    
+    def proximity_stats(self, origin_lat, origin_lng, healthcare_df=None, radii_miles=(1, 5, 10, 25)):
+        """ProximityStats around an origin, queried once per origin and radii and cached"""
+        df_to_analyze = healthcare_df if healthcare_df is not None else self.df
+        coord_cols = self._coordinate_columns(df_to_analyze) if df_to_analyze is not None else None
+        if coord_cols is None:
+            return None
+        
+        radii_miles = tuple(radii_miles)
+        group_cols = [c for c in ['provider_type'] if c in self._columns(df_to_analyze)]
         
-        geo_stats.show()
+        def compute():
+            table = self.engine.proximity_stats(df_to_analyze, *coord_cols, origin_lat, origin_lng,
+                                                list(radii_miles), group_cols)
+            return ProximityStats(origin_lat, origin_lng, radii_miles, table)
         
-        return geo_stats
+        return self._memoize(('proximity_stats', self._stage_key(df_to_analyze), origin_lat, origin_lng, radii_miles),
+                             compute)
+    
+    def analyze_proximity(self, origin_lat, origin_lng, healthcare_df=None, radii_miles=(1, 5, 10, 25)):
+        """Count providers within distance bands of an origin, by provider type"""
+        df_to_analyze = healthcare_df if healthcare_df is not None else self.df
+        
+        if df_to_analyze is None:
+            return
+        
+        print(f"\n=== PROXIMITY ANALYSIS ({origin_lat:.4f}, {origin_lng:.4f}) ===")
+        
+        proximity = self.proximity_stats(origin_lat, origin_lng, df_to_analyze, radii_miles)
+        if proximity is None:
+            print("Insufficient coordinate data found")
+            return
+        
+        print(proximity.render())
+        
+        return proximity
+    
+    def quality_metrics(self, healthcare_df=None):
+        """QualityMetrics (rating histogram, review stats), queried once and cached"""
+        df_to_analyze = healthcare_df if healthcare_df is not None else self.df
+        if df_to_analyze is None:
+            return None
+        
+        def compute():
+            columns = self._columns(df_to_analyze)
+            rating_histogram = review_stats = None
+            if 'rating' in columns:
+                rating_histogram = RatingHistogram(self.engine.rating_distribution(df_to_analyze))
+            if 'reviews_count' in columns:
+                review_stats = ReviewStats.from_frame(self.engine.review_stats(df_to_analyze))
+            return QualityMetrics(rating_histogram, review_stats)
+        
+        return self._memoize(('quality_metrics', self._stage_key(df_to_analyze)), compute)
     
     def analyze_quality_metrics(self, healthcare_df=None):
         """Analyze rating and review quality metrics"""
@@ -183,70 +388,95 @@ class GoogleMapsHealthcareAnalyzer:
         
         print("\n=== QUALITY METRICS ANALYSIS ===")
         
-        # Rating distribution
-        if 'rating' in df_to_analyze.columns:
-            rating_dist = (df_to_analyze
-                          .filter(col('rating').isNotNull())
-                          .groupBy('rating')
-                          .agg(count('*').alias('count'))
-                          .orderBy('rating'))
-            
-            print("Rating Distribution:")
-            rating_dist.show()
-        
-        # Review count statistics
-        if 'reviews_count' in df_to_analyze.columns:
-            review_stats = (df_to_analyze
-                           .filter(col('reviews_count').isNotNull())
-                           .agg(
-                               min('reviews_count').alias('min_reviews'),
-                               max('reviews_count').alias('max_reviews'),
-                               avg('reviews_count').alias('avg_reviews'),
-                               expr('percentile_approx(reviews_count, 0.5)').alias('median_reviews')
-                           ))
-            
-            print("Review Count Statistics:")
-            review_stats.show()
+        quality_metrics = self.quality_metrics(df_to_analyze)
+        print(quality_metrics.render())
+        
+        return quality_metrics
     
-    def assess_data_completeness(self, healthcare_df=None):
-        """Assess completeness of key fields for healthcare providers"""
+    def analyze_sketch_profile(self, healthcare_df=None, previous_profile=None):
+        """One-scan approximate profile: distinct counts, quantiles and top categories
+        
+        Sketches are built per partition and merged, and the returned SketchProfile
+        serializes with to_bytes(). Pass previous_profile (e.g. an earlier snapshot's
+        profile for rows not in this one) to merge it without rescanning.
+        """
         df_to_analyze = healthcare_df if healthcare_df is not None else self.df
         
         if df_to_analyze is None:
             return
         
-        print("\n=== DATA COMPLETENESS ASSESSMENT ===")
+        print("\n=== SKETCH PROFILE ===")
+        
+        columns = self._columns(df_to_analyze)
+        distinct_columns = [c for c in ['name', 'category', 'address', 'phone', 'website',
+                                        'rating', 'reviews_count'] if c in columns]
+        quantile_columns = [c for c in ['rating', 'reviews_count'] if c in columns]
+        heavy_hitter_columns = [c for c in ['category'] if c in columns]
+        
+        def profile_factory():
+            return SketchProfile(distinct_columns, quantile_columns, heavy_hitter_columns)
+        
+        profile = self.engine.sketch_profile(df_to_analyze, profile_factory)
+        if previous_profile is not None:
+            profile.merge(previous_profile)
         
-        total_records = df_to_analyze.count()
+        print("Approximate Distinct Counts:")
+        print(profile.distinct_summary().to_string(index=False))
+        
+        if quantile_columns:
+            print("Approximate Quantiles:")
+            print(profile.quantile_summary().to_string(index=False))
+        
+        if heavy_hitter_columns:
+            print("Top Categories (approximate counts):")
+            print(profile.heavy_hitter_summary('category').to_string(index=False))
+        
+        return profile
+    
+    def completeness_report(self, healthcare_df=None):
+        """CompletenessReport of the key provider fields, queried once and cached"""
+        df_to_analyze = healthcare_df if healthcare_df is not None else self.df
+        if df_to_analyze is None:
+            return None
         
         # Key fields for healthcare providers
         key_fields = ['name', 'category', 'address', 'rating', 'reviews_count', 
                      'latitude', 'longitude', 'phone', 'website']
         
-        completeness_data = []
-        
-        for field in key_fields:
-            if field in df_to_analyze.columns:
-                non_null_count = df_to_analyze.filter(col(field).isNotNull()).count()
-                completeness_pct = (non_null_count / total_records) * 100
-                completeness_data.append({
-                    'field': field,
-                    'populated_count': non_null_count,
-                    'total_count': total_records,
-                    'completeness_pct': round(completeness_pct, 2)
-                })
-            else:
-                completeness_data.append({
-                    'field': field,
-                    'populated_count': 0,
-                    'total_count': total_records,
-                    'completeness_pct': 0.0
-                })
+        def compute():
+            # Fields missing from the table profile as zero populated rows
+            profile = self.profile_columns(df_to_analyze, key_fields)
+            return CompletenessReport(pd.DataFrame({
+                'field': profile['column'],
+                'populated_count': profile['non_null_count'],
+                'total_count': profile['total_count'],
+                'completeness_pct': profile['completeness_pct']
+            }))
+        
+        return self._memoize(('completeness_report', self._stage_key(df_to_analyze)), compute)
+    
+    def assess_data_completeness(self, healthcare_df=None):
+        """Assess completeness of key fields for healthcare providers"""
+        df_to_analyze = healthcare_df if healthcare_df is not None else self.df
+        
+        if df_to_analyze is None:
+            return
+        
+        print("\n=== DATA COMPLETENESS ASSESSMENT ===")
         
-        completeness_df = pd.DataFrame(completeness_data)
-        print(completeness_df.to_string(index=False))
+        completeness = self.completeness_report(df_to_analyze)
+        print(completeness.render())
         
-        return completeness_df
+        return completeness
+    
+    def sample_providers(self, healthcare_df, n=25):
+        """SampleProviders of the top n complete providers, queried once and cached"""
+        coord_cols = self._coordinate_columns(healthcare_df) if healthcare_df is not None else None
+        if coord_cols is None:
+            return None
+        # Complete providers ordered by rating and review count, name breaking ties
+        return self._memoize(('sample_providers', self._stage_key(healthcare_df), n),
+                             lambda: SampleProviders(self.engine.top_providers(healthcare_df, n, *coord_cols)))
     
     def generate_sample_providers(self, healthcare_df, n=25):
         """Generate sample of high-quality healthcare providers"""
@@ -255,67 +485,103 @@ class GoogleMapsHealthcareAnalyzer:
         
         print(f"\n=== SAMPLE HIGH-QUALITY HEALTHCARE PROVIDERS (TOP {n}) ===")
         
-        # Filter for providers with complete data
-        complete_providers = healthcare_df.filter(
-            col('name').isNotNull() &
-            col('category').isNotNull() &
-            col('address').isNotNull() &
-            col('rating').isNotNull() &
-            col('latitude').isNotNull() &
-            col('longitude').isNotNull()
-        )
-        
-        # Order by rating and review count
-        sample_providers = (complete_providers
-                           .orderBy(desc('rating'), desc('reviews_count'))
-                           .limit(n))
+        sample_providers = self.sample_providers(healthcare_df, n)
+        if sample_providers is None:
+            print("Insufficient coordinate data found")
+            return
         
-        sample_providers.show(n, truncate=False)
+        print(sample_providers.render())
         
         return sample_providers
     
-    def run_comprehensive_analysis(self):
-        """Run complete analysis pipeline"""
+    def report_engine_resources(self):
+        """Print startup time and peak memory of the active engine"""
+        report = self.engine.resource_report()
+        print(f"\n=== ENGINE RESOURCES ({report['engine']}) ===")
+        for key, value in report.items():
+            if key != 'engine':
+                print(f"{key}: {value:,}" if isinstance(value, int) else f"{key}: {value}")
+        return report
+    
+    def run_comprehensive_analysis(self, keep_cache=False, profile_path=None, max_workers=1):
+        """Run complete analysis pipeline
+        
+        The healthcare subset is persisted once and shared by every stage. It is
+        unpersisted when the pipeline finishes unless keep_cache is True; the
+        returned healthcare_df stays usable either way.
+        
+        Every stage is profiled (wall time, Spark jobs/stages, input and shuffle
+        bytes); the profile is returned under 'stage_profile' and, if profile_path
+        is given, also written there as JSON.
+        
+        Stage results are typed objects (see analysis_results) computed once and
+        returned in the results dict, so callers reuse them without re-querying.
+        
+        Once the healthcare subset exists, the category, geographic, quality,
+        completeness and sample stages are independent. With max_workers > 1 they
+        run concurrently, each in its own scheduler pool, and their output is still
+        printed in pipeline order.
+        """
         print("Starting comprehensive Google Maps healthcare provider analysis...")
         
+        if self.engine is None:
+            from spark_engine import SparkEngine
+            self.engine = SparkEngine()
+        profiler = StageProfiler(self.engine)
+        self.stage_profile = profiler
+        
         # Load data
-        if not self.load_data():
+        if not profiler.run('load_data', self.load_data):
             return
         
-        # Analyze schema
-        schema_info = self.analyze_schema()
-        
-        # Identify healthcare providers
-        healthcare_df = self.identify_healthcare_providers()
-        
-        if healthcare_df is not None:
-            # Analyze healthcare categories
-            self.analyze_healthcare_categories(healthcare_df)
-            
-            # Geographic analysis
-            self.analyze_geographic_coverage(healthcare_df)
-            
-            # Quality metrics
-            self.analyze_quality_metrics(healthcare_df)
-            
-            # Data completeness
-            completeness_info = self.assess_data_completeness(healthcare_df)
-            
-            # Sample providers
-            self.generate_sample_providers(healthcare_df)
+        try:
+            # Analyze schema
+            schema_info = profiler.run('analyze_schema', self.analyze_schema)
             
-            print("\n=== ANALYSIS COMPLETE ===")
-            print("Review the results above to assess the suitability of this dataset")
-            print("for CareConnect's healthcare provider recommendation system.")
+            # Identify healthcare providers
+            healthcare_df = profiler.run('identify_healthcare_providers', self.identify_healthcare_providers)
             
-            return {
-                'schema_info': schema_info,
-                'healthcare_df': healthcare_df,
-                'completeness_info': completeness_info
-            }
-        else:
-            print("Could not identify healthcare providers in the dataset")
-            return None
+            if healthcare_df is not None:
+                # Categories, geography, quality, completeness and samples only read the cached subset
+                stage_results = run_stages([
+                    ('analyze_healthcare_categories', self.analyze_healthcare_categories, (healthcare_df,)),
+                    ('analyze_geographic_coverage', self.analyze_geographic_coverage, (healthcare_df,)),
+                    ('analyze_quality_metrics', self.analyze_quality_metrics, (healthcare_df,)),
+                    ('assess_data_completeness', self.assess_data_completeness, (healthcare_df,)),
+                    ('generate_sample_providers', self.generate_sample_providers, (healthcare_df,)),
+                ], self.engine, profiler, max_workers)
+                completeness = stage_results['assess_data_completeness']
+                
+                self.report_engine_resources()
+                profiler.print_summary()
+                
+                print("\n=== ANALYSIS COMPLETE ===")
+                print("Review the results above to assess the suitability of this dataset")
+                print("for CareConnect's healthcare provider recommendation system.")
+                
+                stage_profile = profiler.to_dict()
+                if profile_path is not None:
+                    with open(profile_path, 'w') as f:
+                        json.dump(stage_profile, f, indent=2)
+                
+                return {
+                    'schema_info': schema_info,
+                    'healthcare_df': healthcare_df,
+                    'completeness_info': completeness.table if completeness is not None else None,
+                    'category_stats': stage_results['analyze_healthcare_categories'],
+                    'geographic_bounds': stage_results['analyze_geographic_coverage'],
+                    'quality_metrics': stage_results['analyze_quality_metrics'],
+                    'completeness': completeness,
+                    'sample_providers': stage_results['generate_sample_providers'],
+                    'engine_report': self.engine.resource_report(),
+                    'stage_profile': stage_profile
+                }
+            else:
+                print("Could not identify healthcare providers in the dataset")
+                return None
+        finally:
+            if not keep_cache:
+                self.release_cache()
 
 # Usage instructions for Databricks notebook:
 """
@@ -328,9 +594,66 @@ results = analyzer.run_comprehensive_analysis()
 # analyzer.load_data()
 # healthcare_providers = analyzer.identify_healthcare_providers()
 # analyzer.analyze_healthcare_categories(healthcare_providers)
+# analyzer.analyze_proximity(40.7128, -74.0060, healthcare_providers)
+# profile = analyzer.analyze_sketch_profile(healthcare_providers)
+# saved = profile.to_bytes()  # later: SketchProfile.from_bytes(saved).merge(other_profile)
+# analyzer.release_cache()  # unpersist the healthcare subset when done
+
+# Classify each distinct category once and tag rows with a broadcast join instead of the
+# per-row regex; save the dictionary so SQL queries can join on category too:
+# healthcare_providers = analyzer.identify_healthcare_providers(use_category_dictionary=True)
+# analyzer.category_dictionary().save_table(analyzer.engine.spark, 'your_schema.category_dictionary')
+
+# Resolve duplicate listings; cluster_id is stable across runs and usable as a provider key:
+# dedup = analyzer.deduplicate_providers(healthcare_providers)
+# dedup.clusters().head(20), dedup.stats, dedup.timings
+
+# Stage results are typed and cached; rendering never re-runs the query:
+# bounds = analyzer.geographic_bounds(healthcare_providers)
+# bounds.contains(40.7128, -74.0060), bounds.render()
+# results['category_stats'].top(5), results['quality_metrics'].rating_histogram.mean_rating()
+
+# Per-stage wall time, Spark jobs/stages and bytes read are returned with the results:
+# results = analyzer.run_comprehensive_analysis(profile_path='stage_profile.json')
+# results['stage_profile']['stages']
+
+# Run the independent stages concurrently in FAIR scheduler pools (output stays in order):
+# results = analyzer.run_comprehensive_analysis(max_workers=4)
+
+# The healthcare subset is persisted MEMORY_AND_DISK by default:
+# analyzer = GoogleMapsHealthcareAnalyzer(storage_level='DISK_ONLY')
+
+# Locally on a Parquet extract, without Spark:
+# from arrow_engine import ArrowEngine
+# analyzer = GoogleMapsHealthcareAnalyzer('extracts/google_maps_businesses/', engine=ArrowEngine())
+# results = analyzer.run_comprehensive_analysis()
+
+# Precompute the MapView tile pyramid of provider clusters (served as static files):
+# from provider_tiles import ProviderTilePyramid
+# ProviderTilePyramid.from_analyzer(analyzer, max_zoom=12).write('/dbfs/FileStore/provider_tiles')
+
+# Find provider deserts: populated grid cells far from care, exportable by cell_id:
+# from provider_coverage import ProviderCoverage
+# coverage = ProviderCoverage.from_analyzer(analyzer)
+# coverage.summary(max_distance_miles=10)
+# coverage.save_table(analyzer.engine.spark, 'your_schema.provider_coverage')
+
+# Rank the best k providers per ~5km geohash cell (or state) and type by a review-weighted
+# score, then answer "best nearby provider" from the precomputed table:
+# from provider_rankings import ProviderRankings
+# rankings = ProviderRankings.from_analyzer(analyzer, region='geohash', k=10)
+# rankings.best_near(40.7128, -74.0060, 'urgent_care', n=3)
+# rankings.save_table(analyzer.engine.spark, 'your_schema.provider_rankings')
+
+# Export the subset as state=XX/provider_type=YY/ Parquet or Arrow IPC files, then serve
+# one partition from a memory map:
+# from provider_export import export_healthcare_providers, open_partition
+# export_healthcare_providers(analyzer, '/Volumes/careconnect/exports/providers', file_format='arrow')
+# open_partition('/Volumes/careconnect/exports/providers', 'NY', 'dentist')
 
-# To save results:
-# healthcare_providers.write.mode('overwrite').saveAsTable('your_schema.healthcare_providers_subset')
+# To save results as a spatially clustered, incrementally refreshed Delta table:
+# from healthcare_provider_table import HealthcareProviderTableBuilder
+# HealthcareProviderTableBuilder(analyzer, 'your_schema.healthcare_providers').build()
 """
 
 if __name__ == "__main__":
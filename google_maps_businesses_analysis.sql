@@ -165,4 +165,18 @@ AND rating IS NOT NULL
 AND latitude IS NOT NULL 
 AND longitude IS NOT NULL
 ORDER BY rating DESC, reviews_count DESC
-LIMIT 25;
\ No newline at end of file
+LIMIT 25;
+
+-- 13. Healthcare Providers Tagged via the Category Dictionary
+-- Each distinct category is classified once (CategoryDictionary.save_table in
+-- healthcare_classifier.py); a broadcast join replaces the LIKE chains above.
+SELECT /*+ BROADCAST(d) */
+    d.provider_type,
+    d.matched_keyword,
+    COUNT(*) as provider_count
+FROM dais-hackathon-2025.bright_initiative.google_maps_businesses b
+JOIN your_schema.category_dictionary d
+  ON b.category = d.category
+WHERE d.matched_keyword IS NOT NULL
+GROUP BY d.provider_type, d.matched_keyword
+ORDER BY provider_count DESC;
@@ -0,0 +1,302 @@
+"""
+Compiled keyword classifier for healthcare provider identification
+Replaces per-keyword contains() chains with one regex over each lowered text column.
+A CategoryDictionary classifies each distinct category once, so full-table tagging
+becomes a broadcast lookup with the regex only run on names of unmatched rows.
+Spark and Arrow backends are imported lazily so either can be used without the other.
+"""
+
+import re
+
+import pandas as pd
+
+# Provider types mirror mapCategoryToType in backend/server.js, checked in this order
+PROVIDER_TYPE_RULES = [
+    ('hospital', 'hospital'),
+    ('urgent', 'urgent_care'),
+    ('clinic', 'clinic'),
+    ('pharmacy', 'pharmacy'),
+    ('dentist', 'dentist'),
+    ('doctor', 'doctor'),
+]
+DEFAULT_PROVIDER_TYPE = 'health'
+
+
+def build_keyword_pattern(keywords):
+    """Build a single alternation regex matching any keyword
+    
+    Longer keywords come first so overlapping terms report the most specific match.
+    The pattern is plain enough to behave identically in Java and Python regex engines.
+    """
+    ordered = sorted(set(k.lower() for k in keywords), key=lambda k: (-len(k), k))
+    return '(' + '|'.join(re.escape(k) for k in ordered) + ')'
+
+
+def provider_type_for(text):
+    """Map lowered category (or name) text to a normalized provider type"""
+    if not text:
+        return DEFAULT_PROVIDER_TYPE
+    for needle, provider_type in PROVIDER_TYPE_RULES:
+        if needle in text:
+            return provider_type
+    return DEFAULT_PROVIDER_TYPE
+
+
+class HealthcareKeywordClassifier:
+    def __init__(self, keywords, text_columns=('category', 'name')):
+        """Compile the keyword matcher once for the given text columns
+        
+        text_columns are checked in order; the first column with a match supplies
+        matched_keyword, mirroring the category-then-name order of the old filter.
+        """
+        self.keywords = list(keywords)
+        self.text_columns = list(text_columns)
+        self.pattern = build_keyword_pattern(self.keywords)
+        self._regex = re.compile(self.pattern)
+    
+    def classify_text(self, category, name=None):
+        """Classify one record in Python; returns (matched_keyword, provider_type)
+        
+        Same semantics as tag(), for driver-side use on small inputs such as
+        distinct category values.
+        """
+        texts = {'category': category, 'name': name}
+        for column in self.text_columns:
+            text = texts.get(column)
+            if text:
+                match = self._regex.search(text.lower())
+                if match:
+                    type_text = (category or name or '').lower()
+                    return match.group(1), provider_type_for(type_text)
+        return None, None
+    
+    @staticmethod
+    def _spark_provider_type(type_text):
+        from pyspark.sql.functions import lit, when
+        
+        provider_type = lit(DEFAULT_PROVIDER_TYPE)
+        for needle, type_name in reversed(PROVIDER_TYPE_RULES):
+            provider_type = when(type_text.contains(needle), lit(type_name)).otherwise(provider_type)
+        return provider_type
+    
+    def tag(self, df, category_dictionary=None):
+        """Add matched_keyword and provider_type columns in a single projection
+        
+        Each text column is lowered once and scanned by one compiled regex; rows
+        with no match get null in both columns. With a category_dictionary the
+        category regex is replaced by a broadcast join (see tag_dictionary).
+        """
+        from pyspark.sql.functions import coalesce, col, lit, lower, nullif, regexp_extract, when
+        
+        if category_dictionary is not None and self.uses_category_dictionary(df.columns):
+            return self.tag_dictionary(df, category_dictionary)
+        
+        columns = [c for c in self.text_columns if c in df.columns]
+        if not columns:
+            return None
+        
+        lowered = {c: f'__{c}_lower' for c in columns}
+        tagged = df.select('*', *[lower(col(c)).alias(alias) for c, alias in lowered.items()])
+        
+        matches = [nullif(regexp_extract(col(alias), self.pattern, 1), lit(''))
+                   for alias in lowered.values()]
+        matched_keyword = coalesce(*matches) if len(matches) > 1 else matches[0]
+        
+        # Provider type follows the backend: category text first, name as fallback
+        type_text = coalesce(*[col(alias) for alias in lowered.values()])
+        provider_type = self._spark_provider_type(type_text)
+        
+        return (tagged
+                .withColumn('matched_keyword', matched_keyword)
+                .withColumn('provider_type',
+                            when(col('matched_keyword').isNotNull(), provider_type))
+                .drop(*lowered.values()))
+    
+    def uses_category_dictionary(self, columns):
+        """A category dictionary applies when category is the first text column present"""
+        present = [c for c in self.text_columns if c in columns]
+        return bool(present) and present[0] == 'category'
+    
+    def tag_dictionary(self, df, category_dictionary):
+        """tag() via a broadcast hash join against the category dictionary
+        
+        Rows whose category matched take keyword and type from the dictionary; the
+        regex only runs on the remaining text columns of unmatched rows (and on
+        categories missing from the dictionary), so results equal tag().
+        """
+        from pyspark.sql.functions import broadcast, coalesce, col, lit, lower, nullif, regexp_extract, when
+        
+        lookup = broadcast(df.sparkSession.createDataFrame(
+            category_dictionary.lookup_frame(),
+            '__dict_category string, __dict_keyword string, __dict_type string'))
+        joined = df.join(lookup, col('category') == col('__dict_category'), 'left')
+        
+        # coalesce() stops at the first non-null, so name regexes only see unmatched rows
+        texts = [when(col('__dict_category').isNull(), lower(col(c))) if c == 'category' else lower(col(c))
+                 for c in self.text_columns if c in df.columns]
+        matches = [nullif(regexp_extract(text, self.pattern, 1), lit('')) for text in texts]
+        matched_keyword = coalesce(col('__dict_keyword'), *matches)
+        
+        type_text = coalesce(*[lower(col(c)) for c in self.text_columns if c in df.columns])
+        provider_type = coalesce(col('__dict_type'), self._spark_provider_type(type_text))
+        
+        return (joined
+                .withColumn('matched_keyword', matched_keyword)
+                .withColumn('provider_type', when(col('matched_keyword').isNotNull(), provider_type))
+                .drop('__dict_category', '__dict_keyword', '__dict_type'))
+    
+    @staticmethod
+    def _arrow_provider_type(type_text):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        
+        provider_type = pa.scalar(DEFAULT_PROVIDER_TYPE)
+        for needle, type_name in reversed(PROVIDER_TYPE_RULES):
+            is_type = pc.fill_null(pc.match_substring(type_text, needle), False)
+            provider_type = pc.if_else(is_type, pa.scalar(type_name), provider_type)
+        return provider_type
+    
+    def tag_arrow(self, batch, category_dictionary=None):
+        """Arrow equivalent of tag() for a pyarrow RecordBatch or Table"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        
+        if category_dictionary is not None and self.uses_category_dictionary(batch.schema.names):
+            return self.tag_dictionary_arrow(batch, category_dictionary)
+        
+        columns = [c for c in self.text_columns if c in batch.schema.names]
+        if not columns:
+            return None
+        
+        lowered = [pc.utf8_lower(batch.column(c)) for c in columns]
+        
+        matched_keyword = None
+        for text in lowered:
+            match = pc.struct_field(pc.extract_regex(text, pattern=f'(?P<keyword>{self.pattern[1:-1]})'), [0])
+            matched_keyword = match if matched_keyword is None else pc.coalesce(matched_keyword, match)
+        
+        type_text = pc.coalesce(*lowered) if len(lowered) > 1 else lowered[0]
+        provider_type = self._arrow_provider_type(type_text)
+        provider_type = pc.if_else(pc.is_valid(matched_keyword), provider_type, pa.scalar(None, pa.string()))
+        
+        tagged = batch.append_column('matched_keyword', matched_keyword)
+        return tagged.append_column('provider_type', provider_type)
+    
+    def tag_dictionary_arrow(self, batch, category_dictionary):
+        """Arrow equivalent of tag_dictionary(): a hash lookup, then tag_arrow() on unmatched rows"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        
+        categories, keywords, types = category_dictionary.arrow_lookup()
+        category = batch.column('category')
+        position = pc.index_in(category, value_set=categories.cast(category.type))
+        matched_keyword = pc.take(keywords, position)
+        category_type = pc.take(types, position)
+        
+        # Unmatched rows keep only the text the dictionary has not already ruled out
+        unmatched = pc.is_null(matched_keyword)
+        columns = [c for c in self.text_columns if c in batch.schema.names]
+        rest = batch.select(columns).filter(unmatched)
+        unknown = pc.if_else(pc.is_null(pc.filter(position, unmatched)), rest.column('category'),
+                             pa.scalar(None, category.type))
+        rest = rest.set_column(columns.index('category'), 'category', unknown)
+        fallback = self.tag_arrow(rest)
+        
+        matched_keyword = pc.replace_with_mask(matched_keyword, unmatched,
+                                               fallback.column('matched_keyword').cast(pa.string()))
+        fallback_type = pc.coalesce(pc.filter(category_type, unmatched), fallback.column('provider_type'))
+        provider_type = pc.replace_with_mask(category_type, unmatched, fallback_type)
+        provider_type = pc.if_else(pc.is_valid(matched_keyword), provider_type, pa.scalar(None, pa.string()))
+        
+        tagged = batch.append_column('matched_keyword', matched_keyword)
+        return tagged.append_column('provider_type', provider_type)
+    
+    def filter_arrow(self, batch, category_dictionary=None):
+        """Arrow equivalent of filter(); keeps matching rows of a RecordBatch or Table"""
+        import pyarrow.compute as pc
+        
+        tagged = self.tag_arrow(batch, category_dictionary)
+        if tagged is None:
+            return None
+        return tagged.filter(pc.is_valid(tagged.column('matched_keyword')))
+    
+    def filter(self, df, category_dictionary=None):
+        """Keep only rows matching a healthcare keyword, tagged with keyword and type"""
+        from pyspark.sql.functions import col
+        
+        tagged = self.tag(df, category_dictionary)
+        if tagged is None:
+            return None
+        return tagged.filter(col('matched_keyword').isNotNull())
+
+
+class CategoryDictionary:
+    def __init__(self, table):
+        """table has one row per distinct category: category, matched_keyword, provider_type, rows
+        
+        matched_keyword is null for categories no keyword matches. provider_type is the
+        type of the category text itself, kept for every category because rows matched
+        by name still take their type from the category.
+        """
+        self.table = table
+        self._arrow_lookup = None
+    
+    @classmethod
+    def build(cls, classifier, category_counts):
+        """Classify each distinct category of category_counts (category, rows) once"""
+        categories = category_counts['category'].astype(object)
+        lowered = categories.str.lower()
+        table = pd.DataFrame({
+            'category': categories.to_numpy(),
+            'matched_keyword': lowered.str.extract(classifier.pattern, expand=False).to_numpy(),
+            'provider_type': lowered.map(provider_type_for).to_numpy(),
+            'rows': category_counts['rows'].to_numpy(dtype='int64'),
+        })
+        return cls(table.sort_values(['rows', 'category'], ascending=[False, True]).reset_index(drop=True))
+    
+    def _spark_rows(self, columns):
+        # None rather than NaN for unmatched categories, so Spark reads a null string
+        frame = self.table[columns].astype(object)
+        return frame.where(frame.notna(), None)
+    
+    def lookup_frame(self):
+        return self._spark_rows(['category', 'matched_keyword', 'provider_type'])
+    
+    def arrow_lookup(self):
+        """(categories, matched_keywords, provider_types) as Arrow arrays, built once"""
+        import pyarrow as pa
+        
+        if self._arrow_lookup is None:
+            self._arrow_lookup = tuple(pa.array(self.table[c], pa.string(), from_pandas=True)
+                                       for c in ['category', 'matched_keyword', 'provider_type'])
+        return self._arrow_lookup
+    
+    def summary(self):
+        """Distinct and matched category counts and the rows they cover"""
+        matched = self.table['matched_keyword'].notna()
+        return {
+            'distinct_categories': len(self.table),
+            'matched_categories': int(matched.sum()),
+            'total_rows': int(self.table['rows'].sum()),
+            'matched_rows': int(self.table.loc[matched, 'rows'].sum()),
+        }
+    
+    def coverage(self):
+        """Categories and rows per (matched_keyword, provider_type) mapping, largest first"""
+        matched = self.table[self.table['matched_keyword'].notna()]
+        return (matched
+                .groupby(['matched_keyword', 'provider_type'])
+                .agg(categories=('category', 'size'), rows=('rows', 'sum'))
+                .reset_index()
+                .sort_values(['rows', 'matched_keyword'], ascending=[False, True])
+                .reset_index(drop=True))
+    
+    def save_table(self, spark, table_name):
+        """Write the dictionary to a Delta table that SQL queries can join on category"""
+        (spark.createDataFrame(self._spark_rows(list(self.table.columns)), 'category string, matched_keyword string, provider_type string, rows long')
+         .write
+         .format('delta')
+         .mode('overwrite')
+         .option('overwriteSchema', 'true')
+         .saveAsTable(table_name))
+        return len(self.table)
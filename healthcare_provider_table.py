@@ -0,0 +1,220 @@
+"""
+Materialized healthcare provider table for CareConnect
+Builds a Delta table of classified providers, keyed and laid out by spatial cell, and
+refreshes it incrementally with MERGE so only changed source rows are rewritten
+"""
+
+from pyspark.sql import Window
+from pyspark.sql.functions import (array, col, concat_ws, current_timestamp, element_at, floor,
+                                   greatest, least, lit, row_number, sha2, shiftleft, shiftright)
+
+from analysis_engine import COLUMN_CANDIDATES
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+TRACKED_COLUMNS = list(COLUMN_CANDIDATES) + ['provider_type']
+
+
+def resolve_column(df, output_name):
+    """Return the source column for output_name, or a typed null if none is present"""
+    for candidate in COLUMN_CANDIDATES[output_name]:
+        if candidate in df.columns:
+            return col(candidate)
+    return lit(None).cast('string')
+
+
+def encode_geohash(lat, lng, precision=5):
+    """Pure-Python geohash encoder, matching geohash_column for driver-side lookups"""
+    total_bits = 5 * precision
+    lng_bits, lat_bits = (total_bits + 1) // 2, total_bits // 2
+    lng_int = max(0, min(int((lng + 180.0) / 360.0 * (1 << lng_bits)), (1 << lng_bits) - 1))
+    lat_int = max(0, min(int((lat + 90.0) / 180.0 * (1 << lat_bits)), (1 << lat_bits) - 1))
+    
+    code = 0
+    for position in range(total_bits):
+        # Bits interleave from the most significant end, longitude first
+        if position % 2 == 0:
+            bit = (lng_int >> (lng_bits - 1 - position // 2)) & 1
+        else:
+            bit = (lat_int >> (lat_bits - 1 - position // 2)) & 1
+        code = (code << 1) | bit
+    
+    return ''.join(GEOHASH_ALPHABET[(code >> (5 * (precision - 1 - i))) & 31]
+                   for i in range(precision))
+
+
+def geohash_column(lat_col, lng_col, precision=5):
+    """Native Spark geohash expression (precision <= 12), no Python UDF involved"""
+    total_bits = 5 * precision
+    lng_bits, lat_bits = (total_bits + 1) // 2, total_bits // 2
+    lng_max, lat_max = (1 << lng_bits) - 1, (1 << lat_bits) - 1
+    lng_int = least(greatest(floor((lng_col + 180.0) / 360.0 * (1 << lng_bits)), lit(0)), lit(lng_max))
+    lat_int = least(greatest(floor((lat_col + 90.0) / 180.0 * (1 << lat_bits)), lit(0)), lit(lat_max))
+    
+    code = lit(0).cast('long')
+    for position in range(total_bits):
+        source, bits = (lng_int, lng_bits) if position % 2 == 0 else (lat_int, lat_bits)
+        bit = shiftright(source, bits - 1 - position // 2).bitwiseAND(1)
+        code = code + shiftleft(bit.cast('long'), total_bits - 1 - position)
+    
+    alphabet = array(*[lit(c) for c in GEOHASH_ALPHABET])
+    chars = [element_at(alphabet, (shiftright(code, 5 * (precision - 1 - i)).bitwiseAND(31) + 1).cast('int'))
+             for i in range(precision)]
+    return concat_ws('', *chars)
+
+
+class HealthcareProviderTableBuilder:
+    def __init__(self, analyzer, target_table='careconnect.healthcare_providers', geohash_precision=5,
+                 partition_precision=2):
+        """Materialize the analyzer's healthcare subset into target_table
+        
+        geohash_precision 5 gives ~4.9km x 4.9km cells, close to the backend's
+        default 5km search radius. The table is partitioned on the first
+        partition_precision geohash characters (~1250km x 625km at 2), so a refresh
+        only re-lays out the regions it changed.
+        """
+        self.analyzer = analyzer
+        self.target_table = target_table
+        self.geohash_precision = geohash_precision
+        self.partition_precision = partition_precision
+    
+    def build_source(self):
+        """Normalized provider rows from the analyzer's healthcare subset"""
+        healthcare_df = self.analyzer.identify_healthcare_providers(verbose=False)
+        if healthcare_df is None:
+            return None
+        
+        normalized = healthcare_df.select(
+            *[resolve_column(healthcare_df, name).alias(name) for name in COLUMN_CANDIDATES],
+            col('provider_type')
+        ).filter(col('latitude').isNotNull() & col('longitude').isNotNull())
+        
+        # Same identity the backend uses for provider IDs: name + lat + lng
+        normalized = (normalized
+                      .withColumn('provider_key', sha2(concat_ws('|', 'name', 'latitude', 'longitude'), 256))
+                      .withColumn('geohash', geohash_column(col('latitude'), col('longitude'),
+                                                            self.geohash_precision))
+                      .withColumn('geohash_prefix', col('geohash').substr(1, self.partition_precision))
+                      .withColumn('source_hash', sha2(concat_ws('|', *[col(c).cast('string')
+                                                                       for c in TRACKED_COLUMNS]), 256)))
+        
+        # Duplicate listings share a key; keep one deterministically so MERGE sees unique keys
+        by_key = Window.partitionBy('provider_key').orderBy('source_hash')
+        return (normalized
+                .withColumn('__rank', row_number().over(by_key))
+                .filter(col('__rank') == 1)
+                .drop('__rank'))
+    
+    @property
+    def spark(self):
+        return self.analyzer.engine.spark
+    
+    def table_exists(self):
+        return self.spark.catalog.tableExists(self.target_table)
+    
+    def build(self, relayout=False):
+        """Create the table on first run, otherwise refresh it incrementally"""
+        if self.table_exists():
+            return self.refresh(relayout=relayout)
+        
+        source = self.build_source()
+        if source is None:
+            return None
+        
+        print(f"\n=== BUILDING PROVIDER TABLE {self.target_table} ===")
+        (source
+         .withColumn('updated_at', current_timestamp())
+         .write
+         .format('delta')
+         .partitionBy('geohash_prefix')
+         .saveAsTable(self.target_table))
+        self.optimize_layout()
+        
+        inserted = self.spark.table(self.target_table).count()
+        print(f"Inserted providers: {inserted:,}")
+        return {'inserted': inserted, 'updated': 0, 'deleted': 0}
+    
+    def refresh(self, relayout=False):
+        """Merge only new or changed providers and delete providers gone from the source
+        
+        Changed rows are found by anti-joining on (provider_key, source_hash), so MERGE
+        rewrites only the files holding providers whose tracked columns changed, and
+        only the geohash partitions those providers fall in are re-laid out. relayout
+        re-lays out the whole table instead.
+        """
+        source = self.build_source()
+        if source is None:
+            return None
+        
+        print(f"\n=== REFRESHING PROVIDER TABLE {self.target_table} ===")
+        target = self.spark.table(self.target_table)
+        current = target.select('provider_key', 'source_hash', 'geohash_prefix')
+        
+        changes = source.join(current, ['provider_key', 'source_hash'], 'left_anti').cache()
+        removed = (current.select('provider_key', 'geohash_prefix')
+                   .join(source.select('provider_key'), 'provider_key', 'left_anti')
+                   .cache())
+        
+        existing_keys = current.select('provider_key')
+        updated = changes.join(existing_keys, 'provider_key', 'left_semi').count()
+        inserted = changes.count() - updated
+        
+        changes.createOrReplaceTempView('__provider_changes')
+        self.spark.sql(f"""
+            MERGE INTO {self.target_table} AS t
+            USING (SELECT *, current_timestamp() AS updated_at FROM __provider_changes) AS s
+            ON t.geohash_prefix = s.geohash_prefix AND t.provider_key = s.provider_key
+            WHEN MATCHED THEN UPDATE SET *
+            WHEN NOT MATCHED THEN INSERT *
+        """)
+        
+        removed.createOrReplaceTempView('__provider_removed')
+        deleted = removed.count()
+        if deleted:
+            self.spark.sql(f"""
+                DELETE FROM {self.target_table}
+                WHERE provider_key IN (SELECT provider_key FROM __provider_removed)
+            """)
+        
+        # The key includes the coordinates, so an updated provider stays in its partition
+        touched = sorted(row.geohash_prefix for row in
+                         changes.select('geohash_prefix').union(removed.select('geohash_prefix')).distinct().collect())
+        changes.unpersist()
+        removed.unpersist()
+        if relayout:
+            self.optimize_layout()
+        elif touched:
+            self.optimize_layout(touched)
+        
+        print(f"Inserted: {inserted:,}  Updated: {updated:,}  Deleted: {deleted:,}")
+        return {'inserted': inserted, 'updated': updated, 'deleted': deleted}
+    
+    def optimize_layout(self, partitions=None):
+        """Co-locate nearby providers so lat/lng BETWEEN filters skip most files
+        
+        Z-ordering on the coordinates keeps per-file min/max statistics tight in both
+        dimensions, which is what bounding-box data skipping relies on. A Z-order
+        rewrites every file it covers, so it is limited to the given geohash_prefix
+        partitions; None re-lays out the whole table.
+        """
+        where = ''
+        if partitions is not None:
+            where = " WHERE geohash_prefix IN ({})".format(', '.join(f"'{p}'" for p in partitions))
+        self.spark.sql(f"OPTIMIZE {self.target_table}{where} ZORDER BY (latitude, longitude)")
+
+
+# Usage in a Databricks notebook:
+"""
+from google_maps_analysis import GoogleMapsHealthcareAnalyzer
+from healthcare_provider_table import HealthcareProviderTableBuilder
+
+analyzer = GoogleMapsHealthcareAnalyzer()
+analyzer.load_data()
+builder = HealthcareProviderTableBuilder(analyzer, target_table='your_schema.healthcare_providers')
+builder.build()      # first run creates the table, later runs merge changes only
+# builder.refresh(relayout=True)  # occasionally re-lay out every partition, not just changed ones
+
+# Bounding-box queries then read the clustered table instead of the 5M-row source:
+# SELECT * FROM your_schema.healthcare_providers
+# WHERE latitude BETWEEN ... AND ... AND longitude BETWEEN ... AND ...
+"""
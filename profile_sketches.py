@@ -0,0 +1,307 @@
+"""
+Mergeable one-scan sketches for profiling the Google Maps businesses table
+HyperLogLog distinct counts, KLL quantiles and Misra-Gries heavy hitters. Every sketch is
+updated a whole batch at a time with NumPy, serializes to bytes and merges with any other
+sketch of the same kind, so per-partition and per-snapshot profiles combine without rescans.
+"""
+
+import base64
+import json
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+def _hash_series(values):
+    return pd.util.hash_pandas_object(values, index=False).to_numpy(dtype=np.uint64)
+
+
+def hash_values(values):
+    """Stable 64-bit hashes of non-null values (same values hash alike in every process)
+    
+    Numbers hash by value rather than dtype: a whole float hashes like the equal int64,
+    since a BIGINT column arrives as float64 in any batch that contains nulls.
+    """
+    values = pd.Series(values)
+    if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True) in (
+            'integer', 'floating', 'mixed-integer-float', 'decimal'):
+        values = pd.to_numeric(values)
+    if pd.api.types.is_bool_dtype(values.dtype):
+        return _hash_series(values)
+    if pd.api.types.is_integer_dtype(values.dtype):
+        return _hash_series(values.astype(np.int64))
+    if pd.api.types.is_float_dtype(values.dtype):
+        floats = values.to_numpy(dtype=np.float64)
+        whole = np.isfinite(floats) & (floats == np.floor(floats)) & (np.abs(floats) < 2.0 ** 63)
+        hashes = _hash_series(pd.Series(floats))
+        if whole.any():
+            ints = _hash_series(pd.Series(np.where(whole, floats, 0).astype(np.int64)))
+            hashes = np.where(whole, ints, hashes)
+        return hashes
+    return _hash_series(values)
+
+
+class HyperLogLog:
+    def __init__(self, precision=14, registers=None):
+        """2**precision one-byte registers; standard error is about 1.04 / sqrt(2**precision)"""
+        if not 11 <= precision <= 18:
+            raise ValueError("precision must be between 11 and 18")
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+    
+    def update(self, values):
+        """Add a batch of non-null values"""
+        values = pd.Series(values).dropna()
+        if values.empty:
+            return self
+        hashes = hash_values(values)
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # remainder < 2**53 converts to float exactly, so frexp's exponent is its bit length
+        _, bit_length = np.frexp(remainder.astype(np.float64))
+        rank = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+        return self
+    
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        empty = np.count_nonzero(self.registers == 0)
+        # Linear counting is more accurate while many registers are still empty
+        if raw <= 2.5 * m and empty:
+            return int(round(m * np.log(m / empty)))
+        return int(round(raw))
+    
+    def to_dict(self):
+        return {'precision': self.precision, 'registers': _encode_array(self.registers)}
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['precision'], _decode_array(data['registers'], np.uint8))
+
+
+class KLLSketch:
+    def __init__(self, k=200, levels=None, count=0, min_value=None, max_value=None):
+        """Quantile sketch; rank error is roughly 1.65 / k with high probability
+        
+        Level i holds items of weight 2**i. A full level is sorted and every other
+        item is promoted, with the starting offset alternating so the sketch is
+        deterministic for a given input order.
+        """
+        self.k = k
+        self.levels = levels if levels is not None else [np.empty(0)]
+        self.count = count
+        self.min_value = min_value
+        self.max_value = max_value
+        self._offset = 0
+    
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+    
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind so total weight is preserved exactly
+                keep = items[-1:] if len(items) % 2 else items[:0]
+                pairs = items[:len(items) - len(keep)]
+                promoted = pairs[self._offset::2]
+                self._offset ^= 1
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+    
+    def update(self, values):
+        """Add a batch of non-null numeric values"""
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().to_numpy(dtype=np.float64)
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min_value = values.min() if self.min_value is None else min(self.min_value, values.min())
+        self.max_value = values.max() if self.max_value is None else max(self.max_value, values.max())
+        # Feed large batches in capacity-sized slices so level 0 never balloons
+        step = self.k * 4
+        for start in range(0, len(values), step):
+            self.levels[0] = np.concatenate([self.levels[0], values[start:start + step]])
+            self._compress()
+        return self
+    
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min_value = other.min_value if self.min_value is None else min(self.min_value, other.min_value)
+        self.max_value = other.max_value if self.max_value is None else max(self.max_value, other.max_value)
+        self._compress()
+        return self
+    
+    def quantiles(self, fractions):
+        """Approximate values at each fraction in [0, 1]"""
+        if self.count == 0:
+            return [None for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 1 << level, dtype=np.int64)
+                                  for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        results = []
+        for fraction in fractions:
+            if fraction <= 0:
+                results.append(float(self.min_value))
+            elif fraction >= 1:
+                results.append(float(self.max_value))
+            else:
+                position = np.searchsorted(cumulative, fraction * cumulative[-1], side='left')
+                results.append(float(items[min(position, len(items) - 1)]))
+        return results
+    
+    def to_dict(self):
+        return {
+            'k': self.k, 'count': self.count,
+            'min': None if self.min_value is None else float(self.min_value),
+            'max': None if self.max_value is None else float(self.max_value),
+            'levels': [_encode_array(items.astype(np.float64)) for items in self.levels],
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        levels = [_decode_array(items, np.float64) for items in data['levels']]
+        return cls(data['k'], levels, data['count'], data['min'], data['max'])
+
+
+class MisraGries:
+    def __init__(self, capacity=256, counters=None, count=0):
+        """Heavy-hitter summary; each reported count undercounts by at most count / (capacity + 1)"""
+        self.capacity = capacity
+        self.counters = counters if counters is not None else {}
+        self.count = count
+    
+    def _absorb(self, counts):
+        """Merge exact or summarized counts, then trim back to capacity"""
+        merged = dict(self.counters)
+        for value, n in counts.items():
+            merged[value] = merged.get(value, 0) + int(n)
+        if len(merged) > self.capacity:
+            # Subtracting the (capacity+1)-th largest count keeps the summary mergeable
+            threshold = sorted(merged.values(), reverse=True)[self.capacity]
+            merged = {v: n - threshold for v, n in merged.items() if n > threshold}
+        self.counters = merged
+    
+    def update(self, values):
+        """Add a batch of non-null values (counted exactly per batch first)"""
+        counts = pd.Series(values).dropna().value_counts()
+        self.count += int(counts.sum())
+        self._absorb(counts.to_dict())
+        return self
+    
+    def merge(self, other):
+        self.count += other.count
+        self._absorb(other.counters)
+        return self
+    
+    def top(self, n=20):
+        """(value, approximate_count) pairs, most frequent first"""
+        return sorted(self.counters.items(), key=lambda item: (-item[1], str(item[0])))[:n]
+    
+    def to_dict(self):
+        return {'capacity': self.capacity, 'count': self.count,
+                'counters': [[value, n] for value, n in self.counters.items()]}
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['capacity'], {value: n for value, n in data['counters']}, data['count'])
+
+
+def _encode_array(values):
+    return base64.b64encode(np.ascontiguousarray(values).tobytes()).decode('ascii')
+
+
+def _decode_array(encoded, dtype):
+    return np.frombuffer(base64.b64decode(encoded), dtype=dtype).copy()
+
+
+class SketchProfile:
+    def __init__(self, distinct_columns=(), quantile_columns=(), heavy_hitter_columns=(),
+                 hll_precision=14, kll_k=200, heavy_hitter_capacity=256):
+        """One sketch per configured column, plus the number of rows seen"""
+        self.row_count = 0
+        self.distinct = {c: HyperLogLog(hll_precision) for c in distinct_columns}
+        self.quantiles = {c: KLLSketch(kll_k) for c in quantile_columns}
+        self.heavy_hitters = {c: MisraGries(heavy_hitter_capacity) for c in heavy_hitter_columns}
+    
+    @property
+    def columns(self):
+        return sorted(set(self.distinct) | set(self.quantiles) | set(self.heavy_hitters))
+    
+    def update(self, frame):
+        """Update every sketch from one pandas batch; columns missing from frame are skipped"""
+        self.row_count += len(frame)
+        for sketches in (self.distinct, self.quantiles, self.heavy_hitters):
+            for column, sketch in sketches.items():
+                if column in frame:
+                    sketch.update(frame[column])
+        return self
+    
+    def merge(self, other):
+        """Combine with a profile of another partition or table snapshot"""
+        self.row_count += other.row_count
+        for mine, theirs in ((self.distinct, other.distinct), (self.quantiles, other.quantiles),
+                             (self.heavy_hitters, other.heavy_hitters)):
+            for column, sketch in theirs.items():
+                if column in mine:
+                    mine[column].merge(sketch)
+                else:
+                    mine[column] = sketch
+        return self
+    
+    def to_bytes(self):
+        payload = {
+            'row_count': self.row_count,
+            'distinct': {c: s.to_dict() for c, s in self.distinct.items()},
+            'quantiles': {c: s.to_dict() for c, s in self.quantiles.items()},
+            'heavy_hitters': {c: s.to_dict() for c, s in self.heavy_hitters.items()},
+        }
+        return zlib.compress(json.dumps(payload).encode('utf-8'))
+    
+    @classmethod
+    def from_bytes(cls, data):
+        payload = json.loads(zlib.decompress(data).decode('utf-8'))
+        profile = cls()
+        profile.row_count = payload['row_count']
+        profile.distinct = {c: HyperLogLog.from_dict(d) for c, d in payload['distinct'].items()}
+        profile.quantiles = {c: KLLSketch.from_dict(d) for c, d in payload['quantiles'].items()}
+        profile.heavy_hitters = {c: MisraGries.from_dict(d) for c, d in payload['heavy_hitters'].items()}
+        return profile
+    
+    def distinct_summary(self):
+        return pd.DataFrame([{'column': c, 'approx_distinct': s.estimate()}
+                             for c, s in self.distinct.items()])
+    
+    def quantile_summary(self, fractions=(0.05, 0.25, 0.5, 0.75, 0.95, 0.99)):
+        rows = []
+        for column, sketch in self.quantiles.items():
+            values = sketch.quantiles(fractions)
+            rows.append({'column': column, 'count': sketch.count,
+                         **{f'p{round(f * 100):g}': v for f, v in zip(fractions, values)}})
+        return pd.DataFrame(rows)
+    
+    def heavy_hitter_summary(self, column, n=20):
+        sketch = self.heavy_hitters[column]
+        return pd.DataFrame(sketch.top(n), columns=[column, 'approx_count'])
@@ -0,0 +1,185 @@
+"""
+Provider-desert coverage analysis for CareConnect
+Rasterizes healthcare providers (by type) and all businesses onto a lat/lng grid, smooths
+provider counts with a summed-area table and measures the distance from every populated
+cell to the nearest provider. Populated cells that are far from care, or have too few
+providers nearby, are flagged as underserved.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from geo_distance import EARTH_RADIUS
+from healthcare_classifier import DEFAULT_PROVIDER_TYPE
+from provider_spatial_index import to_unit_vectors
+from provider_tiles import PROVIDER_TYPES
+
+# Contiguous United States: min_lat, max_lat, min_lng, max_lng
+US_EXTENT = (24.4, 49.4, -125.0, -66.9)
+MILES_PER_DEGREE_LAT = 69.05
+
+
+def box_sum(grid, radius):
+    """Sum of grid over the (2r+1)x(2r+1) window centred on every cell
+    
+    Built from a summed-area table, so the cost is independent of radius; windows are
+    clipped at the grid edge.
+    """
+    rows, cols = grid.shape
+    sat = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+    sat[1:, 1:] = grid.cumsum(axis=0).cumsum(axis=1)
+    r0 = np.clip(np.arange(rows) - radius, 0, rows)
+    r1 = np.clip(np.arange(rows) + radius + 1, 0, rows)
+    c0 = np.clip(np.arange(cols) - radius, 0, cols)
+    c1 = np.clip(np.arange(cols) + radius + 1, 0, cols)
+    return (sat[np.ix_(r1, c1)] - sat[np.ix_(r0, c1)]
+            - sat[np.ix_(r1, c0)] + sat[np.ix_(r0, c0)])
+
+
+class ProviderCoverage:
+    def __init__(self, provider_counts, business_counts, extent=US_EXTENT, cell_degrees=0.05):
+        """provider_counts is (len(PROVIDER_TYPES), rows, cols), business_counts (rows, cols)
+        
+        Businesses of any kind stand in for population: cells without them (water,
+        wilderness) are never flagged.
+        """
+        self.provider_counts = provider_counts
+        self.business_counts = business_counts
+        self.extent = extent
+        self.cell_degrees = cell_degrees
+    
+    @classmethod
+    def from_analyzer(cls, analyzer, healthcare_df=None, extent=US_EXTENT, cell_degrees=0.05):
+        """Rasterize the healthcare subset and the full table in one grouped scan each"""
+        if healthcare_df is None:
+            healthcare_df = analyzer.identify_healthcare_providers(verbose=False)
+        if healthcare_df is None or analyzer._coordinate_columns(healthcare_df) is None:
+            return None
+        
+        min_lat, max_lat, min_lng, max_lng = extent
+        shape = (int(np.ceil((max_lat - min_lat) / cell_degrees)), int(np.ceil((max_lng - min_lng) / cell_degrees)))
+        
+        def rasterize(df, group_cols):
+            cells = analyzer.engine.grid_cell_counts(df, *analyzer._coordinate_columns(df),
+                                                     min_lat, min_lng, cell_degrees, group_cols)
+            inside = ((cells['cell_row'] >= 0) & (cells['cell_row'] < shape[0])
+                      & (cells['cell_col'] >= 0) & (cells['cell_col'] < shape[1]))
+            return cells[inside]
+        
+        group_cols = [c for c in ['provider_type'] if c in analyzer._columns(healthcare_df)]
+        providers = rasterize(healthcare_df, group_cols)
+        if group_cols:
+            type_index = providers['provider_type'].map({t: i for i, t in enumerate(PROVIDER_TYPES)})
+            type_index = type_index.fillna(PROVIDER_TYPES.index(DEFAULT_PROVIDER_TYPE)).to_numpy(dtype=np.int64)
+        else:
+            type_index = np.full(len(providers), PROVIDER_TYPES.index(DEFAULT_PROVIDER_TYPE))
+        provider_counts = np.zeros((len(PROVIDER_TYPES),) + shape, dtype=np.int64)
+        np.add.at(provider_counts, (type_index, providers['cell_row'].to_numpy(dtype=np.int64),
+                                    providers['cell_col'].to_numpy(dtype=np.int64)), providers['count'].to_numpy())
+        
+        businesses = rasterize(analyzer.df, [])
+        business_counts = np.zeros(shape, dtype=np.int64)
+        np.add.at(business_counts, (businesses['cell_row'].to_numpy(dtype=np.int64),
+                                    businesses['cell_col'].to_numpy(dtype=np.int64)), businesses['count'].to_numpy())
+        return cls(provider_counts, business_counts, extent, cell_degrees)
+    
+    @property
+    def shape(self):
+        return self.business_counts.shape
+    
+    def cell_centers(self):
+        """(lat, lng) grids of cell centres"""
+        min_lat, _, min_lng, _ = self.extent
+        rows, cols = self.shape
+        lat = min_lat + (np.arange(rows) + 0.5) * self.cell_degrees
+        lng = min_lng + (np.arange(cols) + 0.5) * self.cell_degrees
+        return np.meshgrid(lat, lng, indexing='ij')
+    
+    def providers(self, provider_type=None):
+        """Provider count grid for one type, or all types"""
+        if provider_type is None:
+            return self.provider_counts.sum(axis=0)
+        return self.provider_counts[PROVIDER_TYPES.index(provider_type)]
+    
+    def window_providers(self, radius_miles=10, provider_type=None):
+        """Providers within a square window of about radius_miles around each cell"""
+        radius_cells = max(0, int(round(radius_miles / (MILES_PER_DEGREE_LAT * self.cell_degrees))))
+        return box_sum(self.providers(provider_type), radius_cells)
+    
+    def nearest_miles(self, provider_type=None, cells=None):
+        """Great-circle miles from each cell centre to the nearest occupied provider cell
+        
+        cells is a boolean mask restricting which cells are measured (others are NaN);
+        distances are accurate to about one cell.
+        """
+        lat, lng = self.cell_centers()
+        occupied = self.providers(provider_type) > 0
+        cells = np.ones(self.shape, dtype=bool) if cells is None else cells
+        distance = np.full(self.shape, np.nan)
+        if not occupied.any() or not cells.any():
+            return distance
+        
+        tree = cKDTree(to_unit_vectors(lat[occupied], lng[occupied]))
+        chord, _ = tree.query(to_unit_vectors(lat[cells], lng[cells]))
+        distance[cells] = 2 * EARTH_RADIUS['miles'] * np.arcsin(np.minimum(chord / 2, 1.0))
+        return distance
+    
+    def to_frame(self, max_distance_miles=10, min_window_providers=1, radius_miles=10,
+                 provider_type=None, min_businesses=1):
+        """One row per populated cell, keyed by cell_id, with an underserved flag
+        
+        A cell is underserved when it has at least min_businesses businesses and either
+        its nearest provider is over max_distance_miles away or fewer than
+        min_window_providers providers lie within radius_miles.
+        """
+        populated = self.business_counts >= min_businesses
+        lat, lng = self.cell_centers()
+        providers = self.providers(provider_type)
+        window = self.window_providers(radius_miles, provider_type)
+        nearest = self.nearest_miles(provider_type, populated)
+        
+        rows, cols = np.nonzero(populated)
+        frame = pd.DataFrame({
+            'cell_id': rows * self.shape[1] + cols,
+            'cell_row': rows,
+            'cell_col': cols,
+            'center_lat': lat[populated],
+            'center_lng': lng[populated],
+            'businesses': self.business_counts[populated],
+            'providers': providers[populated],
+            'window_providers': window[populated],
+            'nearest_provider_miles': nearest[populated],
+        })
+        frame['provider_type'] = provider_type or 'all'
+        frame['underserved'] = (frame['nearest_provider_miles'].isna()
+                                | (frame['nearest_provider_miles'] > max_distance_miles)
+                                | (frame['window_providers'] < min_window_providers))
+        return frame
+    
+    def summary(self, **thresholds):
+        """Populated and underserved cell and business counts, overall and per type"""
+        rows = []
+        for provider_type in [None] + PROVIDER_TYPES:
+            frame = self.to_frame(provider_type=provider_type, **thresholds)
+            underserved = frame[frame['underserved']]
+            rows.append({
+                'provider_type': provider_type or 'all',
+                'populated_cells': len(frame),
+                'underserved_cells': len(underserved),
+                'underserved_businesses': int(underserved['businesses'].sum()),
+                'underserved_pct': round(len(underserved) / len(frame) * 100, 2) if len(frame) else 0.0,
+            })
+        return pd.DataFrame(rows)
+    
+    def save_table(self, spark, table_name, **thresholds):
+        """Write every type's cell table to a Delta table keyed by (cell_id, provider_type)"""
+        frame = pd.concat([self.to_frame(provider_type=t, **thresholds) for t in [None] + PROVIDER_TYPES],
+                          ignore_index=True)
+        (spark.createDataFrame(frame)
+         .write
+         .format('delta')
+         .mode('overwrite')
+         .option('overwriteSchema', 'true')
+         .saveAsTable(table_name))
+        return len(frame)
@@ -0,0 +1,220 @@
+"""
+Provider deduplication and entity resolution for CareConnect
+Candidate pairs come from blocking on geohash, normalized phone and normalized name, so
+work grows with the number of records rather than its square. Pairs are scored with
+vectorized trigram-signature name similarity, phone agreement and distance, and matched
+pairs are joined into clusters whose IDs stay stable across runs.
+"""
+
+import hashlib
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from geo_distance import geohash_codes, haversine_distance
+
+# Words that distinguish nothing between listings of the same practice
+NAME_STOPWORDS = ['the', 'inc', 'llc', 'pc', 'pllc', 'pa', 'ltd', 'co', 'corp', 'and', 'of',
+                  'md', 'dds', 'dmd', 'do', 'od']
+SIGNATURE_WORDS = 4  # 256-bit trigram signature per name
+NAME_WIDTH = 48      # normalized names are truncated to this many bytes for signatures
+# Score weights: name similarity, phone agreement, proximity. With the default threshold a
+# near-identical name (>= ~0.82) at the same spot matches without a phone; a weaker name
+# match needs the phone too
+SCORE_WEIGHTS = (0.55, 0.2, 0.25)
+
+
+def normalize_names(names):
+    """Lowercase, drop punctuation, stopwords and repeated spaces"""
+    stopwords = r'\b(?:' + '|'.join(NAME_STOPWORDS) + r')\b'
+    names = pd.Series(names, dtype='object').fillna('')
+    # Chains repeat names, so normalize each distinct name once
+    codes, uniques = pd.factorize(names)
+    normalized = (pd.Series(uniques, dtype='object')
+                  .str.lower()
+                  .str.replace('&', ' and ', regex=False)
+                  .str.replace(r'[^a-z0-9 ]+', ' ', regex=True)
+                  .str.replace(stopwords, ' ', regex=True)
+                  .str.replace(r'\s+', ' ', regex=True)
+                  .str.strip())
+    return pd.Series(normalized.to_numpy()[codes], index=names.index, dtype='object')
+
+
+def normalize_phones(phones):
+    """Last ten digits of each phone number, None when fewer than ten digits"""
+    digits = pd.Series(phones, dtype='object').fillna('').astype(str).str.replace(r'\D', '', regex=True)
+    return digits.str[-10:].where(digits.str.len() >= 10)
+
+
+def trigram_signatures(names):
+    """256-bit set of hashed character trigrams per name, as (n, SIGNATURE_WORDS) uint64
+    
+    Built with array operations over fixed-width byte rows, so no Python loop runs
+    per name; Jaccard similarity of two signatures approximates that of the trigram sets.
+    """
+    padded = (' ' + names + ' ').to_numpy(dtype=f'S{NAME_WIDTH}')
+    chars = padded.view(np.uint8).reshape(len(padded), NAME_WIDTH).astype(np.uint64)
+    trigrams = (chars[:, :-2] << np.uint64(16)) | (chars[:, 1:-1] << np.uint64(8)) | chars[:, 2:]
+    valid = chars[:, 2:] != 0
+    # Multiplicative hash onto 256 bit positions, then pack each row's bitmap into words
+    bits = (trigrams * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(64 - 8)
+    bitmap = np.zeros((len(names), 64 * SIGNATURE_WORDS), dtype=bool)
+    rows = np.broadcast_to(np.arange(len(names))[:, None], bits.shape)
+    bitmap[rows[valid], bits[valid].astype(np.int64)] = True
+    return np.packbits(bitmap, axis=1).view(np.uint64)
+
+
+def _popcount(words):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1).astype(np.int64)
+    return np.unpackbits(words.view(np.uint8), axis=-1).sum(axis=-1).astype(np.int64)
+
+
+def signature_similarity(left, right):
+    """Approximate trigram Jaccard similarity of paired signature rows"""
+    union = _popcount(left | right)
+    return np.where(union > 0, _popcount(left & right) / np.maximum(union, 1), 0.0)
+
+
+def block_pairs(block_keys, sort_keys, window):
+    """Pairs of rows sharing a block key, at most window apart in (block, sort_key) order
+    
+    Blocks no larger than window + 1 yield every pair; larger blocks fall back to
+    comparing neighbours in sort_key order, so the pair count stays linear.
+    """
+    codes, _ = pd.factorize(block_keys, use_na_sentinel=True)
+    rows = np.flatnonzero(codes >= 0)
+    if not len(rows):
+        return np.empty((0, 2), dtype=np.int64)
+    order = rows[np.lexsort((sort_keys[rows], codes[rows]))]
+    sorted_codes = codes[order]
+    pairs = []
+    for offset in range(1, min(window, len(order) - 1) + 1):
+        same = sorted_codes[offset:] == sorted_codes[:-offset]
+        pairs.append(np.column_stack((order[:-offset][same], order[offset:][same])))
+    return np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+
+
+@dataclass(eq=False)
+class DedupResult:
+    """cluster_id per input row, plus run counts and per-phase seconds"""
+    providers: pd.DataFrame
+    stats: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)
+    
+    def clusters(self):
+        """Clusters with more than one listing, largest first"""
+        sizes = self.providers.groupby('cluster_id').size()
+        duplicated = sizes[sizes > 1].index
+        return (self.providers[self.providers['cluster_id'].isin(duplicated)]
+                .assign(cluster_size=lambda f: f['cluster_id'].map(sizes))
+                .sort_values(['cluster_size', 'cluster_id', 'name'], ascending=[False, True, True]))
+
+
+class ProviderDeduplicator:
+    def __init__(self, geohash_precision=7, window=8, match_threshold=0.7, max_distance_miles=0.5):
+        """Tune blocking and scoring
+        
+        geohash_precision=7 blocks on ~150m cells; window bounds the comparisons per
+        record in each blocking pass. A pair matches when its score reaches
+        match_threshold and the listings are within max_distance_miles.
+        """
+        self.geohash_precision = geohash_precision
+        self.window = window
+        self.match_threshold = match_threshold
+        self.max_distance_miles = max_distance_miles
+    
+    def candidate_pairs(self, frame):
+        """Union of geohash, phone and name-in-area blocking passes, each pair once"""
+        located = frame['latitude'].notna() & frame['longitude'].notna()
+        lat, lng = frame['latitude'].fillna(0).to_numpy(), frame['longitude'].fillna(0).to_numpy()
+        geohash = pd.Series(geohash_codes(lat, lng, self.geohash_precision)).where(located)
+        area = pd.Series(geohash_codes(lat, lng, 4)).astype(str)
+        name_in_area = (frame['name_key'] + '|' + area).where((frame['name_key'] != '') & located)
+        sort_keys = frame['name_key'].to_numpy(dtype=object)
+        
+        passes = [
+            block_pairs(geohash.to_numpy(), sort_keys, self.window),
+            block_pairs(frame['phone_key'].to_numpy(dtype=object), sort_keys, self.window),
+            block_pairs(name_in_area.to_numpy(dtype=object), sort_keys, self.window),
+        ]
+        pairs = np.sort(np.concatenate(passes), axis=1)
+        return np.unique(pairs, axis=0) if len(pairs) else pairs
+    
+    def score_pairs(self, frame, signatures, pairs):
+        """Weighted name similarity, phone agreement and proximity per candidate pair"""
+        left, right = pairs[:, 0], pairs[:, 1]
+        name_similarity = signature_similarity(signatures[left], signatures[right])
+        phone_codes, _ = pd.factorize(frame['phone_key'], use_na_sentinel=True)
+        phone_match = (phone_codes[left] == phone_codes[right]) & (phone_codes[left] >= 0)
+        lat, lng = frame['latitude'].to_numpy(), frame['longitude'].to_numpy()
+        distance = haversine_distance(lat[left], lng[left], lat[right], lng[right])
+        proximity = np.clip(1 - np.nan_to_num(distance, nan=np.inf) / self.max_distance_miles, 0, 1)
+        name_weight, phone_weight, proximity_weight = SCORE_WEIGHTS
+        score = name_weight * name_similarity + phone_weight * phone_match + proximity_weight * proximity
+        matched = (score >= self.match_threshold) & (np.nan_to_num(distance, nan=np.inf) <= self.max_distance_miles)
+        return score, matched
+    
+    def resolve(self, providers):
+        """Assign a stable cluster_id to every row of a normalized providers frame
+        
+        Expects name, latitude, longitude and phone columns (see COLUMN_CANDIDATES).
+        """
+        timings = {}
+        start = time.perf_counter()
+        frame = providers.reset_index(drop=True).copy()
+        frame['name_key'] = normalize_names(frame['name'])
+        frame['phone_key'] = normalize_phones(frame['phone'])
+        signatures = trigram_signatures(frame['name_key'])
+        timings['normalize_seconds'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        pairs = self.candidate_pairs(frame)
+        timings['blocking_seconds'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        _, matched = self.score_pairs(frame, signatures, pairs)
+        timings['scoring_seconds'] = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        n = len(frame)
+        edges = pairs[matched]
+        graph = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(n, n))
+        n_clusters, labels = connected_components(graph, directed=False)
+        frame['cluster_id'] = self._stable_ids(frame, labels)
+        timings['clustering_seconds'] = time.perf_counter() - start
+        
+        sizes = np.bincount(labels, minlength=n_clusters)
+        stats = {
+            'records': n,
+            'candidate_pairs': int(len(pairs)),
+            'matched_pairs': int(matched.sum()),
+            'clusters': int(n_clusters),
+            'duplicate_records': int(n - n_clusters),
+            'largest_cluster': int(sizes.max()) if n else 0,
+            'comparisons_per_record': round(len(pairs) / n, 2) if n else 0.0,
+        }
+        timings = {k: round(v, 4) for k, v in timings.items()}
+        return DedupResult(frame.drop(columns=['name_key', 'phone_key']), stats, timings)
+    
+    @staticmethod
+    def _stable_ids(frame, labels):
+        """Cluster ID hashed from the smallest member key, independent of row order
+        
+        Member keys are normalized name plus coordinates rounded to ~1m. The ID survives
+        re-scrapes while that smallest-key listing stays in the cluster and no listing
+        with a smaller key joins it; either change re-keys the cluster.
+        """
+        member_keys = (frame['name_key'] + '|' + frame['latitude'].round(5).astype(str)
+                       + '|' + frame['longitude'].round(5).astype(str))
+        # Sorted factorization turns the per-cluster string minimum into an integer one
+        ranks, keys = pd.factorize(member_keys, sort=True)
+        anchor_rank = np.full(labels.max() + 1 if len(labels) else 0, len(keys), dtype=np.int64)
+        np.minimum.at(anchor_rank, labels, ranks)
+        digests = np.array(['prov_' + hashlib.sha1(key.encode()).hexdigest()[:16] for key in keys[anchor_rank]],
+                           dtype=object)
+        return digests[labels]
@@ -0,0 +1,81 @@
+"""
+Partitioned columnar export of the healthcare subset for offline serving
+The engine writes Parquet or Arrow IPC files under state=XX/provider_type=YY/ directories
+without collecting rows to the driver; a local service then memory-maps only the
+partitions it needs.
+"""
+
+import json
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from analysis_engine import EXPORT_PARTITION_COLUMNS
+
+MANIFEST_NAME = '_partitions.json'
+EXPORT_FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def export_healthcare_providers(analyzer, path, file_format='parquet', healthcare_df=None):
+    """Export the healthcare subset partitioned by state and provider type
+    
+    Returns the rows written per partition. When path is on the driver's filesystem,
+    the same summary is saved next to the data as _partitions.json.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"file_format must be one of {sorted(EXPORT_FORMATS)}")
+    if healthcare_df is None:
+        healthcare_df = analyzer.identify_healthcare_providers(verbose=False)
+    if healthcare_df is None:
+        return None
+    
+    print(f"\n=== HEALTHCARE PROVIDER EXPORT ({file_format}) ===")
+    partitions = analyzer.engine.export_partitioned(healthcare_df, path, file_format)
+    print(f"Exported {int(partitions['rows'].sum()):,} providers into {len(partitions):,} partitions at {path}")
+    
+    if Path(path).is_dir():
+        manifest = {
+            'format': file_format,
+            'partition_columns': EXPORT_PARTITION_COLUMNS,
+            'partitions': partitions.to_dict(orient='records'),
+        }
+        (Path(path) / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, default=int))
+    return partitions
+
+
+def partition_files(path, state, provider_type=None):
+    """Data files of one state, optionally narrowed to one provider type"""
+    type_glob = f'provider_type={provider_type}' if provider_type else 'provider_type=*'
+    directory = Path(path) / f'state={state}'
+    return sorted(f for suffix in EXPORT_FORMATS.values() for f in directory.glob(f'{type_glob}/*{suffix}'))
+
+
+def open_partition(path, state, provider_type=None, columns=None):
+    """Memory-map one exported partition as an Arrow table
+    
+    Arrow IPC files are written uncompressed and mapped without copying; Parquet
+    files are read through a memory map and decoded. Partition values are restored as state and provider_type
+    columns. Returns None when the partition does not exist.
+    """
+    tables = []
+    for file in partition_files(path, state, provider_type):
+        if file.suffix == '.arrow':
+            table = pa.ipc.open_file(pa.memory_map(str(file))).read_all()
+            if columns is not None:
+                table = table.select([c for c in columns if c in table.column_names])
+        else:
+            table = pq.read_table(file, columns=columns, memory_map=True)
+        file_type = file.parent.name.split('=', 1)[1]
+        table = table.append_column('state', pa.array([state] * table.num_rows, pa.string()))
+        tables.append(table.append_column('provider_type', pa.array([file_type] * table.num_rows, pa.string())))
+    
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options='permissive')
+
+
+def list_partitions(path):
+    """Partition summary saved by export_healthcare_providers"""
+    manifest = Path(path) / MANIFEST_NAME
+    return json.loads(manifest.read_text())['partitions'] if manifest.exists() else None
@@ -0,0 +1,178 @@
+"""
+Top-K provider rankings per region and provider type for CareConnect
+Providers are scored by a Bayesian average that pulls ratings with few reviews towards the
+overall mean. The best K per (region, provider_type) are kept in bounded per-key lists
+merged batch by batch, so no step sorts the whole healthcare subset; the small result is
+the table "best nearby provider" lookups read directly.
+"""
+
+import numpy as np
+import pandas as pd
+
+from analysis_engine import COLUMN_CANDIDATES, STATE_CODE_PATTERN, UNKNOWN_STATE
+from geo_distance import geohash_codes, geohash_strings
+from healthcare_classifier import DEFAULT_PROVIDER_TYPE
+
+RANKING_REGIONS = ['state', 'geohash']
+RANKING_KEYS = ['region', 'provider_type']
+RANKED_COLUMNS = ['name', 'category', 'address', 'rating', 'reviews_count', 'latitude', 'longitude',
+                  'phone', 'website']
+# Best first: score, then review count, then name so ties rank the same on every engine
+RANK_ORDER = dict(by=['score', 'reviews_count', 'name'], ascending=[False, False, True])
+# Partial top-K lists as Spark tasks return them, in TopProviders.best column order
+PARTIAL_SCHEMA = ('region string, provider_type string, score double, name string, category string, '
+                  'address string, rating double, reviews_count double, latitude double, longitude double, '
+                  'phone string, website string')
+
+
+def bayesian_score(rating, reviews, prior_mean, prior_reviews):
+    """Rating shrunk towards prior_mean as if each provider had prior_reviews more reviews at that mean"""
+    reviews = np.nan_to_num(np.asarray(reviews, dtype=np.float64), nan=0.0).clip(min=0)
+    return (np.asarray(rating, dtype=np.float64) * reviews + prior_mean * prior_reviews) / (reviews + prior_reviews)
+
+
+class TopProviders:
+    def __init__(self, k, region, sources, prior_mean, prior_reviews, geohash_precision=5):
+        """Bounded top-k lists per (region, provider_type)
+        
+        sources maps RANKED_COLUMNS and provider_type to the dataset's column names.
+        update() takes raw rows; merge() takes scored rows such as another
+        accumulator's best, which is how per-partition lists are combined.
+        """
+        if region not in RANKING_REGIONS:
+            raise ValueError(f"region must be one of {RANKING_REGIONS}")
+        self.k = k
+        self.region = region
+        self.sources = sources
+        self.prior_mean = prior_mean
+        self.prior_reviews = prior_reviews
+        self.geohash_precision = geohash_precision
+        self.best = pd.DataFrame({c: pd.Series(dtype=t) for c, t in self._dtypes().items()})
+    
+    @staticmethod
+    def _dtypes():
+        return {name: ('float64' if kind == 'double' else 'object')
+                for name, kind in (field.split() for field in PARTIAL_SCHEMA.split(', '))}
+    
+    @property
+    def columns(self):
+        return [source for source in self.sources.values() if source]
+    
+    def score(self, frame):
+        """Rated rows of a raw frame with region, provider_type and score, in PARTIAL_SCHEMA order"""
+        rows = pd.DataFrame({name: frame[source] if source else None for name, source in self.sources.items()},
+                            index=frame.index)
+        rows = rows[rows['rating'].notna()]
+        if self.region == 'state':
+            region = rows['address'].astype(object).str.extract(STATE_CODE_PATTERN, expand=False)
+            rows['region'] = region.where(region.notna(), UNKNOWN_STATE)
+        else:
+            rows = rows[rows['latitude'].notna() & rows['longitude'].notna()]
+            codes = geohash_codes(rows['latitude'].to_numpy(dtype=np.float64),
+                                  rows['longitude'].to_numpy(dtype=np.float64), self.geohash_precision)
+            rows['region'] = geohash_strings(codes, self.geohash_precision)
+        rows['provider_type'] = rows['provider_type'].where(rows['provider_type'].notna(), DEFAULT_PROVIDER_TYPE)
+        rows['score'] = bayesian_score(rows['rating'], rows['reviews_count'], self.prior_mean, self.prior_reviews)
+        return rows[list(self.best.columns)].astype(self._dtypes())
+    
+    def update(self, frame):
+        self.merge(self.score(frame))
+    
+    def merge(self, ranked):
+        """Fold scored rows into the per-key lists, keeping at most k per key"""
+        if ranked.empty:
+            return
+        # A key's k-th score works like a heap root: lower-scoring rows cannot enter its list
+        sizes = self.best.groupby(RANKING_KEYS, sort=False)['score'].agg(['min', 'size'])
+        floors = sizes.loc[sizes['size'] >= self.k, 'min']
+        if len(floors):
+            floor = floors.reindex(pd.MultiIndex.from_frame(ranked[RANKING_KEYS])).to_numpy()
+            ranked = ranked[~(ranked['score'].to_numpy() < floor)]
+        
+        candidates = pd.concat([self.best, ranked], ignore_index=True) if len(self.best) else ranked
+        candidates = candidates.sort_values(**RANK_ORDER, na_position='last', kind='stable')
+        self.best = candidates[candidates.groupby(RANKING_KEYS, sort=False).cumcount() < self.k].reset_index(drop=True)
+    
+    def to_frame(self):
+        """One row per ranked provider, ordered by region, provider_type and rank"""
+        ranked = self.best.sort_values(**RANK_ORDER, na_position='last', kind='stable')
+        ranked = ranked.assign(rank=ranked.groupby(RANKING_KEYS, sort=False).cumcount() + 1)
+        return ranked.sort_values(RANKING_KEYS + ['rank']).reset_index(drop=True)
+
+
+class ProviderRankings:
+    def __init__(self, table, region, k, prior_mean, prior_reviews, geohash_precision=5):
+        """table holds the top k providers per (region, provider_type) with rank and score"""
+        self.table = table
+        self.region = region
+        self.k = k
+        self.prior_mean = prior_mean
+        self.prior_reviews = prior_reviews
+        self.geohash_precision = geohash_precision
+    
+    @classmethod
+    def from_analyzer(cls, analyzer, healthcare_df=None, region='geohash', k=10, prior_reviews=None,
+                      geohash_precision=5):
+        """Rank the healthcare subset in one scan, without a global sort
+        
+        The prior is the mean rating of the subset and, unless prior_reviews is given,
+        its median review count; both come from the cached quality_metrics() stage.
+        geohash_precision=5 gives ~4.9km cells, close to the backend's default search
+        radius. Returns None without a rating column.
+        """
+        if healthcare_df is None:
+            healthcare_df = analyzer.identify_healthcare_providers(verbose=False)
+        if healthcare_df is None:
+            return None
+        quality = analyzer.quality_metrics(healthcare_df)
+        if quality.rating_histogram is None or quality.rating_histogram.mean_rating() is None:
+            return None
+        
+        prior_mean = quality.rating_histogram.mean_rating()
+        if prior_reviews is None:
+            median = quality.review_stats.median_reviews if quality.review_stats is not None else None
+            prior_reviews = max(1.0, float(median or 0))
+        available = analyzer._columns(healthcare_df)
+        sources = {name: next((c for c in COLUMN_CANDIDATES.get(name, [name]) if c in available), None)
+                   for name in RANKED_COLUMNS + ['provider_type']}
+        
+        def accumulator_factory():
+            return TopProviders(k, region, sources, prior_mean, prior_reviews, geohash_precision)
+        
+        accumulator = analyzer.engine.top_k(healthcare_df, accumulator_factory)
+        return cls(accumulator.to_frame(), region, k, prior_mean, prior_reviews, geohash_precision)
+    
+    def best(self, region, provider_type=None, n=None):
+        """Ranked providers of one region, optionally of one type"""
+        rows = self.table[self.table['region'] == region]
+        if provider_type is not None:
+            rows = rows[rows['provider_type'] == provider_type]
+        rows = rows.sort_values(['rank', 'provider_type']) if provider_type is None else rows
+        return rows.head(n) if n is not None else rows
+    
+    def best_near(self, lat, lng, provider_type=None, n=None):
+        """Ranked providers of the geohash cell containing (lat, lng)"""
+        if self.region != 'geohash':
+            raise ValueError("best_near needs rankings built with region='geohash'")
+        cell = geohash_strings(geohash_codes([lat], [lng], self.geohash_precision), self.geohash_precision)[0]
+        return self.best(cell, provider_type, n)
+    
+    def summary(self):
+        """Regions, ranked providers and mean top score per provider type"""
+        top = self.table[self.table['rank'] == 1]
+        return (self.table.groupby('provider_type')
+                .agg(regions=('region', 'nunique'), ranked_providers=('name', 'size'))
+                .join(top.groupby('provider_type')['score'].mean().rename('mean_top_score').round(3))
+                .reset_index())
+    
+    def save_table(self, spark, table_name):
+        """Write the rankings to a Delta table keyed by (region, provider_type, rank)"""
+        frame = self.table.assign(region_type=self.region)
+        frame = frame.astype(object).where(frame.notna(), None)
+        (spark.createDataFrame(frame, PARTIAL_SCHEMA + ', rank long, region_type string')
+         .write
+         .format('delta')
+         .mode('overwrite')
+         .option('overwriteSchema', 'true')
+         .saveAsTable(table_name))
+        return len(frame)
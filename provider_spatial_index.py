@@ -0,0 +1,150 @@
+"""
+In-memory nearest-provider index for CareConnect
+KD-tree over unit-sphere coordinates built from the analyzer's healthcare subset, with
+k-nearest and radius queries ranked by haversine distance
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from geo_distance import EARTH_RADIUS, haversine_distance
+
+EARTH_RADIUS_MILES = EARTH_RADIUS['miles']
+
+# Fields returned per provider, matching what the backend search endpoint formats
+RESULT_FIELDS = ['name', 'category', 'address', 'lat', 'lng', 'phone', 'website', 'distance']
+
+
+def to_unit_vectors(lat, lng):
+    """Convert degrees to 3D points on the unit sphere
+    
+    Straight-line (chord) distance between these points increases monotonically with
+    great-circle distance, so a Euclidean KD-tree returns true haversine neighbours.
+    """
+    lat_rad = np.radians(np.asarray(lat, dtype=np.float64))
+    lng_rad = np.radians(np.asarray(lng, dtype=np.float64))
+    cos_lat = np.cos(lat_rad)
+    return np.column_stack((cos_lat * np.cos(lng_rad), cos_lat * np.sin(lng_rad), np.sin(lat_rad)))
+
+
+def miles_to_chord(radius_miles):
+    """Great-circle radius in miles to the equivalent unit-sphere chord length"""
+    return 2 * np.sin(np.minimum(radius_miles / EARTH_RADIUS_MILES, np.pi) / 2)
+
+
+class ProviderSpatialIndex:
+    def __init__(self, providers):
+        """Build the index from a pandas DataFrame of providers
+        
+        Expects name, category, address, latitude, longitude, phone, website and
+        optionally rating and provider_type. Rows without coordinates are dropped.
+        """
+        providers = providers.dropna(subset=['latitude', 'longitude']).reset_index(drop=True)
+        self.providers = providers
+        self.lat = providers['latitude'].to_numpy(dtype=np.float64)
+        self.lng = providers['longitude'].to_numpy(dtype=np.float64)
+        self.rating = (providers['rating'].to_numpy(dtype=np.float64, na_value=np.nan)
+                       if 'rating' in providers.columns else np.full(len(providers), np.nan))
+        self.provider_type = (providers['provider_type'].to_numpy(dtype=object)
+                              if 'provider_type' in providers.columns else None)
+        # Plain object arrays keep result formatting free of pandas row access
+        self._names, self._categories, self._addresses, self._phones, self._websites = (
+            providers[c].to_numpy(dtype=object) if c in providers.columns else np.full(len(providers), None)
+            for c in ('name', 'category', 'address', 'phone', 'website'))
+        self._trees = {None: (cKDTree(to_unit_vectors(self.lat, self.lng)), np.arange(len(providers)))}
+    
+    @classmethod
+    def from_analyzer(cls, analyzer):
+        """Collect the analyzer's healthcare subset (~400k rows) and index it"""
+        healthcare_df = analyzer.identify_healthcare_providers(verbose=False)
+        if healthcare_df is None:
+            return None
+        
+        columns = ['name', 'category', 'address', 'latitude', 'longitude', 'phone', 'website',
+                   'rating', 'provider_type']
+        return cls(analyzer.engine.to_pandas_normalized(healthcare_df, columns))
+    
+    def __len__(self):
+        return len(self.providers)
+    
+    def _tree_for(self, provider_type):
+        """KD-tree over one provider type, built on first use"""
+        if provider_type not in self._trees:
+            if self.provider_type is None:
+                raise ValueError("Index was built without a provider_type column")
+            rows = np.flatnonzero(self.provider_type == provider_type)
+            self._trees[provider_type] = (cKDTree(to_unit_vectors(self.lat[rows], self.lng[rows])), rows)
+        return self._trees[provider_type]
+    
+    def _format(self, rows, distances):
+        """Build result records in ascending distance order"""
+        return [
+            {
+                'name': self._names[row],
+                'category': self._categories[row],
+                'address': self._addresses[row],
+                'lat': float(self.lat[row]),
+                'lng': float(self.lng[row]),
+                'phone': self._phones[row],
+                'website': self._websites[row],
+                'distance': float(distance)
+            }
+            for row, distance in zip(rows, distances)
+        ]
+    
+    def _rank(self, lat, lng, rows, min_rating, limit):
+        """Apply the rating filter, compute haversine distances and sort"""
+        if min_rating:
+            rows = rows[self.rating[rows] >= min_rating]
+        distances = haversine_distance(lat, lng, self.lat[rows], self.lng[rows])
+        order = np.argsort(distances, kind='stable')[:limit]
+        return rows[order], distances[order]
+    
+    def nearest(self, lat, lng, k=25, provider_type=None, min_rating=0):
+        """The k nearest providers to (lat, lng), optionally filtered
+        
+        Rating filters are applied after the tree query, so the query widens until
+        k matching providers are found or the tree is exhausted.
+        """
+        tree, tree_rows = self._tree_for(provider_type)
+        if tree.n == 0 or k <= 0:
+            return []
+        
+        point = to_unit_vectors([lat], [lng])[0]
+        fetch = min(k, tree.n)
+        while True:
+            _, hits = tree.query(point, k=fetch)
+            rows = tree_rows[np.atleast_1d(hits)]
+            rows, distances = self._rank(lat, lng, rows, min_rating, k)
+            if len(rows) >= k or fetch >= tree.n:
+                return self._format(rows, distances)
+            fetch = min(fetch * 4, tree.n)
+    
+    def within_radius(self, lat, lng, radius_miles, provider_type=None, min_rating=0, limit=None):
+        """All providers within radius_miles of (lat, lng), nearest first"""
+        tree, tree_rows = self._tree_for(provider_type)
+        if tree.n == 0:
+            return []
+        
+        point = to_unit_vectors([lat], [lng])[0]
+        hits = tree.query_ball_point(point, r=miles_to_chord(radius_miles))
+        rows = tree_rows[np.asarray(hits, dtype=np.int64)]
+        rows, distances = self._rank(lat, lng, rows, min_rating, limit)
+        
+        # Chord radius and haversine can disagree in the last ulp at the boundary
+        keep = distances <= radius_miles
+        return self._format(rows[keep], distances[keep])
+
+
+# Usage in a Databricks notebook:
+"""
+from google_maps_analysis import GoogleMapsHealthcareAnalyzer
+from provider_spatial_index import ProviderSpatialIndex
+
+analyzer = GoogleMapsHealthcareAnalyzer()
+analyzer.load_data()
+index = ProviderSpatialIndex.from_analyzer(analyzer)
+
+index.nearest(40.7128, -74.0060, k=25, provider_type='pharmacy', min_rating=4.0)
+index.within_radius(40.7128, -74.0060, radius_miles=3.1, provider_type='dentist')
+"""
@@ -0,0 +1,177 @@
+"""
+Precomputed Web Mercator tile pyramid of healthcare provider clusters for the map views
+Providers are counted by type once, on the finest cell grid; every coarser zoom is summed
+from the level below it. Tiles are small little-endian binary files laid out as
+{zoom}/{x}/{y}.bin so any static file server (or CDN bucket) can serve them.
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from healthcare_classifier import DEFAULT_PROVIDER_TYPE, PROVIDER_TYPE_RULES
+
+PROVIDER_TYPES = [provider_type for _, provider_type in PROVIDER_TYPE_RULES] + [DEFAULT_PROVIDER_TYPE]
+
+# Header: magic, format version, tile_bits, type count, padding, cell count
+TILE_MAGIC = b'CCT1'
+TILE_VERSION = 1
+TILE_HEADER = struct.Struct('<4sBBBxI')
+
+
+def tile_record_dtype(n_types):
+    """One cluster: cell within the tile, count-weighted centroid and a count per type"""
+    return np.dtype([('x', '<u1'), ('y', '<u1'), ('lat', '<f4'), ('lng', '<f4'),
+                     ('counts', '<u4', (n_types,))])
+
+
+def encode_tile(records, tile_bits):
+    n_types = records.dtype['counts'].shape[0]
+    return TILE_HEADER.pack(TILE_MAGIC, TILE_VERSION, tile_bits, n_types, len(records)) + records.tobytes()
+
+
+def decode_tile(data):
+    """Return (tile_bits, records) from encode_tile() output"""
+    magic, version, tile_bits, n_types, n_cells = TILE_HEADER.unpack_from(data)
+    if magic != TILE_MAGIC or version != TILE_VERSION:
+        raise ValueError(f"Not a provider tile (magic={magic!r}, version={version})")
+    records = np.frombuffer(data, dtype=tile_record_dtype(n_types), count=n_cells, offset=TILE_HEADER.size)
+    return tile_bits, records
+
+
+class ProviderTilePyramid:
+    def __init__(self, levels, min_zoom, max_zoom, tile_bits=5, bounds=None):
+        """levels maps zoom -> cell_x, cell_y, lat_sum, lng_sum and one count column per type
+        
+        A zoom-z tile holds a 2**tile_bits square of cells, so cells live on the
+        2**(z + tile_bits) grid; tile_bits=5 gives 8px clusters on 256px tiles.
+        """
+        self.levels = levels
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.tile_bits = tile_bits
+        self.bounds = bounds
+    
+    @classmethod
+    def from_analyzer(cls, analyzer, healthcare_df=None, min_zoom=0, max_zoom=12, tile_bits=5):
+        """Aggregate the healthcare subset at max_zoom and derive every coarser zoom
+        
+        The source is scanned once; returns None when it has no coordinate columns.
+        """
+        if healthcare_df is None:
+            healthcare_df = analyzer.identify_healthcare_providers(verbose=False)
+        bounds = analyzer.geographic_bounds(healthcare_df)
+        if bounds is None:
+            return None
+        
+        lat_col, lng_col = analyzer._coordinate_columns(healthcare_df)
+        group_cols = [c for c in ['provider_type'] if c in analyzer._columns(healthcare_df)]
+        cells = analyzer.engine.mercator_cell_counts(healthcare_df, lat_col, lng_col,
+                                                     max_zoom + tile_bits, group_cols)
+        
+        levels = {max_zoom: cls._pivot_types(cells, group_cols)}
+        for zoom in range(max_zoom - 1, min_zoom - 1, -1):
+            levels[zoom] = cls._parent_level(levels[zoom + 1])
+        return cls(levels, min_zoom, max_zoom, tile_bits, bounds)
+    
+    @staticmethod
+    def _pivot_types(cells, group_cols):
+        """One row per cell with a count column per provider type"""
+        cells = cells.copy()
+        if group_cols:
+            known = cells['provider_type'].isin(PROVIDER_TYPES)
+            cells['provider_type'] = cells['provider_type'].where(known, DEFAULT_PROVIDER_TYPE)
+        else:
+            cells['provider_type'] = DEFAULT_PROVIDER_TYPE
+        
+        keys = ['cell_x', 'cell_y']
+        counts = (cells.pivot_table(index=keys, columns='provider_type', values='count', aggfunc='sum', fill_value=0)
+                  .reindex(columns=PROVIDER_TYPES, fill_value=0))
+        sums = cells.groupby(keys)[['lat_sum', 'lng_sum']].sum()
+        return sums.join(counts).reset_index().astype({'cell_x': 'int64', 'cell_y': 'int64', **{t: 'int64' for t in PROVIDER_TYPES}})
+    
+    @staticmethod
+    def _parent_level(level):
+        """Sum 2x2 blocks of cells into the next coarser zoom"""
+        parent = level.assign(cell_x=level['cell_x'].to_numpy() >> 1, cell_y=level['cell_y'].to_numpy() >> 1)
+        return parent.groupby(['cell_x', 'cell_y'], sort=False).sum().reset_index()
+    
+    @property
+    def total_providers(self):
+        return int(self.levels[self.min_zoom][PROVIDER_TYPES].to_numpy().sum())
+    
+    def tiles(self, zoom):
+        """Yield (tile_x, tile_y, records) for every non-empty tile at zoom"""
+        level = self.levels[zoom]
+        if level.empty:
+            return
+        
+        mask = (1 << self.tile_bits) - 1
+        tile_x = level['cell_x'].to_numpy() >> self.tile_bits
+        tile_y = level['cell_y'].to_numpy() >> self.tile_bits
+        counts = level[PROVIDER_TYPES].to_numpy()
+        totals = counts.sum(axis=1)
+        
+        records = np.empty(len(level), dtype=tile_record_dtype(len(PROVIDER_TYPES)))
+        records['x'] = level['cell_x'].to_numpy() & mask
+        records['y'] = level['cell_y'].to_numpy() & mask
+        records['lat'] = level['lat_sum'].to_numpy() / totals
+        records['lng'] = level['lng_sum'].to_numpy() / totals
+        records['counts'] = counts
+        
+        # Group rows by tile with one sort rather than a groupby per tile
+        order = np.lexsort((records['x'], records['y'], tile_y, tile_x))
+        tile_x, tile_y, records = tile_x[order], tile_y[order], records[order]
+        starts = np.flatnonzero(np.r_[True, (np.diff(tile_x) != 0) | (np.diff(tile_y) != 0)])
+        ends = np.r_[starts[1:], len(records)]
+        for start, end in zip(starts, ends):
+            yield int(tile_x[start]), int(tile_y[start]), records[start:end]
+    
+    def write(self, output_dir):
+        """Write {zoom}/{x}/{y}.bin tiles and metadata.json; returns the metadata"""
+        output_dir = Path(output_dir)
+        tile_counts, tile_bytes = {}, 0
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            tile_counts[zoom] = 0
+            for tile_x, tile_y, records in self.tiles(zoom):
+                path = output_dir / str(zoom) / str(tile_x) / f'{tile_y}.bin'
+                path.parent.mkdir(parents=True, exist_ok=True)
+                data = encode_tile(records, self.tile_bits)
+                path.write_bytes(data)
+                tile_counts[zoom] += 1
+                tile_bytes += len(data)
+        
+        metadata = {
+            'format': 'careconnect-provider-tiles',
+            'version': TILE_VERSION,
+            'scheme': 'xyz',
+            'projection': 'EPSG:3857',
+            'min_zoom': self.min_zoom,
+            'max_zoom': self.max_zoom,
+            'tile_bits': self.tile_bits,
+            'provider_types': PROVIDER_TYPES,
+            'record_layout': ['x:u8', 'y:u8', 'lat:f32', 'lng:f32', f'counts:u32[{len(PROVIDER_TYPES)}]'],
+            'header_layout': ['magic:4s', 'version:u8', 'tile_bits:u8', 'type_count:u8', 'pad:u8', 'cell_count:u32'],
+            'total_providers': self.total_providers,
+            'tile_counts': tile_counts,
+            'tile_bytes': tile_bytes,
+            'bounds': None if self.bounds is None else {
+                'min_lat': self.bounds.min_lat, 'max_lat': self.bounds.max_lat,
+                'min_lng': self.bounds.min_lng, 'max_lng': self.bounds.max_lng,
+            },
+        }
+        output_dir.mkdir(parents=True, exist_ok=True)
+        (output_dir / 'metadata.json').write_text(json.dumps(metadata, indent=2))
+        return metadata
+    
+    def summary(self):
+        """Occupied cells and non-empty tiles per zoom"""
+        rows = []
+        for zoom in range(self.min_zoom, self.max_zoom + 1):
+            level = self.levels[zoom]
+            tiles = level[['cell_x', 'cell_y']].to_numpy() >> self.tile_bits
+            rows.append({'zoom': zoom, 'cells': len(level), 'tiles': len(np.unique(tiles, axis=0))})
+        return pd.DataFrame(rows)
@@ -0,0 +1,442 @@
+"""
+Spark backend for GoogleMapsHealthcareAnalyzer
+Runs every stage as Spark jobs against a metastore table or Parquet path
+"""
+
+import json
+import math
+import os
+import shutil
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from pyspark import StorageLevel, inheritable_thread_target
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import (asc, avg, coalesce, col, cos, count, desc, expr, floor, greatest, least, lit,
+                                   log, radians, regexp_extract, tan, when)
+from pyspark.sql.functions import max as spark_max
+from pyspark.sql.functions import min as spark_min
+from pyspark.sql.functions import sum as spark_sum
+
+from analysis_engine import (EXPORT_PARTITION_COLUMNS, SAMPLE_REQUIRED_FIELDS, STATE_CODE_PATTERN, UNKNOWN_STATE,
+                             AnalysisEngine)
+from geo_distance import MAX_MERCATOR_LATITUDE, bearing_udf, distance_udf
+from healthcare_classifier import DEFAULT_PROVIDER_TYPE
+
+# Stage states after which the UI store's task metrics are final
+FINISHED_STAGE_STATES = {'COMPLETE', 'SKIPPED', 'FAILED'}
+
+
+class SparkEngine(AnalysisEngine):
+    name = 'spark'
+    
+    def __init__(self, spark=None):
+        """Use the given session, or the active one (Databricks), or start a local one"""
+        start = time.perf_counter()
+        self.spark = spark or SparkSession.builder.appName("GoogleMapsHealthcareAnalysis").getOrCreate()
+        self.startup_seconds = time.perf_counter() - start
+    
+    def load(self, source):
+        """Load a metastore table by name, or Parquet files by path"""
+        if '/' in source or source.endswith('.parquet'):
+            return self.spark.read.parquet(source)
+        return self.spark.table(source)
+    
+    def columns(self, dataset):
+        return dataset.columns
+    
+    def dtypes(self, dataset):
+        return dict(dataset.dtypes)
+    
+    def print_schema(self, dataset):
+        dataset.printSchema()
+    
+    def count(self, dataset):
+        return dataset.count()
+    
+    def profile_columns(self, dataset, columns):
+        # count(column) skips nulls, so one agg() yields every non-null count
+        aggregations = [count(lit(1)).alias('__total_count')]
+        aggregations += [count(col(c)).alias(f'__non_null_{i}') for i, c in enumerate(columns)]
+        row = dataset.agg(*aggregations).collect()[0]
+        return row['__total_count'], {c: row[f'__non_null_{i}'] for i, c in enumerate(columns)}
+    
+    def category_counts(self, dataset):
+        return (dataset
+                .filter(col('category').isNotNull())
+                .groupBy('category')
+                .agg(count(lit(1)).alias('rows'))
+                .toPandas())
+    
+    def filter_healthcare(self, dataset, classifier, category_dictionary=None):
+        return classifier.filter(dataset, category_dictionary)
+    
+    def persist(self, dataset, storage_level):
+        if isinstance(storage_level, str):
+            storage_level = getattr(StorageLevel, storage_level.upper())
+        return dataset.persist(storage_level)
+    
+    def unpersist(self, dataset):
+        dataset.unpersist()
+    
+    def _avg_or_null(self, dataset, column):
+        return avg(column) if column in dataset.columns else lit(None).cast('double')
+    
+    def category_stats(self, dataset):
+        return (dataset
+                .groupBy('category')
+                .agg(
+                    count('*').alias('provider_count'),
+                    self._avg_or_null(dataset, 'rating').alias('avg_rating'),
+                    self._avg_or_null(dataset, 'reviews_count').alias('avg_reviews')
+                )
+                .orderBy(desc('provider_count'), asc('category'))
+                .toPandas())
+    
+    def geo_stats(self, dataset, lat_col, lng_col):
+        return (dataset
+                .filter(col(lat_col).isNotNull() & col(lng_col).isNotNull())
+                .agg(
+                    count('*').alias('records_with_coords'),
+                    spark_min(lat_col).alias('min_lat'),
+                    spark_max(lat_col).alias('max_lat'),
+                    spark_min(lng_col).alias('min_lng'),
+                    spark_max(lng_col).alias('max_lng'),
+                    avg(lat_col).alias('avg_lat'),
+                    avg(lng_col).alias('avg_lng')
+                )
+                .toPandas())
+    
+    def rating_distribution(self, dataset):
+        return (dataset
+                .filter(col('rating').isNotNull())
+                .groupBy('rating')
+                .agg(count('*').alias('count'))
+                .orderBy('rating')
+                .toPandas())
+    
+    def review_stats(self, dataset):
+        return (dataset
+                .filter(col('reviews_count').isNotNull())
+                .agg(
+                    spark_min('reviews_count').alias('min_reviews'),
+                    spark_max('reviews_count').alias('max_reviews'),
+                    avg('reviews_count').alias('avg_reviews'),
+                    expr('percentile_approx(reviews_count, 0.5)').alias('median_reviews')
+                )
+                .toPandas())
+    
+    def top_providers(self, dataset, n, lat_col, lng_col):
+        complete = dataset
+        for field in SAMPLE_REQUIRED_FIELDS + [lat_col, lng_col]:
+            complete = complete.filter(col(field).isNotNull())
+        return (complete
+                .orderBy(desc('rating'), desc('reviews_count'), asc('name'))
+                .limit(n)
+                .toPandas())
+    
+    def add_distance_columns(self, dataset, lat_col, lng_col, origin_lat, origin_lng,
+                             unit='miles', dtype=np.float64):
+        distance = distance_udf(origin_lat, origin_lng, unit, dtype)
+        bearing = bearing_udf(origin_lat, origin_lng, dtype)
+        return (dataset
+                .withColumn(f'distance_{unit}', distance(col(lat_col), col(lng_col)))
+                .withColumn('bearing_deg', bearing(col(lat_col), col(lng_col))))
+    
+    def proximity_stats(self, dataset, lat_col, lng_col, origin_lat, origin_lng, radii_miles, group_cols):
+        with_distance = self.add_distance_columns(
+            dataset.filter(col(lat_col).isNotNull() & col(lng_col).isNotNull()),
+            lat_col, lng_col, origin_lat, origin_lng)
+        band_counts = [
+            spark_sum(when(col('distance_miles') <= radius, 1).otherwise(0)).cast('long').alias(f'within_{radius}_mi')
+            for radius in radii_miles
+        ]
+        return (with_distance
+                .groupBy(*group_cols)
+                .agg(spark_min('distance_miles').alias('nearest_miles'), *band_counts)
+                .orderBy('nearest_miles', *group_cols)
+                .toPandas())
+    
+    def mercator_cell_counts(self, dataset, lat_col, lng_col, level, group_cols):
+        n = 1 << level
+        lat = radians(greatest(least(col(lat_col), lit(MAX_MERCATOR_LATITUDE)), lit(-MAX_MERCATOR_LATITUDE)))
+        x = floor((col(lng_col) + 180.0) / 360.0 * n)
+        y = floor((1.0 - log(tan(lat) + 1.0 / cos(lat)) / math.pi) / 2.0 * n)
+        return (dataset
+                .filter(col(lat_col).isNotNull() & col(lng_col).isNotNull())
+                .select(
+                    least(greatest(x, lit(0)), lit(n - 1)).cast('long').alias('cell_x'),
+                    least(greatest(y, lit(0)), lit(n - 1)).cast('long').alias('cell_y'),
+                    *group_cols, lat_col, lng_col)
+                .groupBy('cell_x', 'cell_y', *group_cols)
+                .agg(
+                    count('*').alias('count'),
+                    spark_sum(lat_col).alias('lat_sum'),
+                    spark_sum(lng_col).alias('lng_sum')
+                )
+                .orderBy('cell_y', 'cell_x', *group_cols)
+                .toPandas())
+    
+    def grid_cell_counts(self, dataset, lat_col, lng_col, min_lat, min_lng, cell_degrees, group_cols):
+        return (dataset
+                .filter(col(lat_col).isNotNull() & col(lng_col).isNotNull())
+                .select(
+                    floor((col(lat_col) - min_lat) / cell_degrees).cast('long').alias('cell_row'),
+                    floor((col(lng_col) - min_lng) / cell_degrees).cast('long').alias('cell_col'),
+                    *group_cols)
+                .groupBy('cell_row', 'cell_col', *group_cols)
+                .agg(count('*').alias('count'))
+                .orderBy('cell_row', 'cell_col', *group_cols)
+                .toPandas())
+    
+    def _with_export_columns(self, dataset):
+        address = col('address') if 'address' in dataset.columns else lit(None).cast('string')
+        state = regexp_extract(address, STATE_CODE_PATTERN, 1)
+        provider_type = col('provider_type') if 'provider_type' in dataset.columns else lit(None).cast('string')
+        data_columns = [c for c in dataset.columns if c not in EXPORT_PARTITION_COLUMNS]
+        return dataset.select(
+            *data_columns,
+            when(state.isNull() | (state == ''), lit(UNKNOWN_STATE)).otherwise(state).alias('state'),
+            coalesce(provider_type, lit(DEFAULT_PROVIDER_TYPE)).alias('provider_type'))
+    
+    def export_partitioned(self, dataset, path, file_format):
+        """Parquet through Spark's partitioned writer; Arrow IPC written by each task via mapInArrow
+        
+        path must be visible to every executor (a /dbfs or /Volumes path on Databricks)
+        for the Arrow format, since tasks write their files directly.
+        """
+        export_df = self._with_export_columns(dataset).repartition(*EXPORT_PARTITION_COLUMNS)
+        
+        if file_format == 'parquet':
+            # Spark's Parquet writer keeps column statistics and dictionary pages by default
+            (export_df
+             .write
+             .mode('overwrite')
+             .option('compression', 'zstd')
+             .partitionBy(*EXPORT_PARTITION_COLUMNS)
+             .parquet(path))
+            return (export_df
+                    .groupBy(*EXPORT_PARTITION_COLUMNS)
+                    .agg(count('*').alias('rows'))
+                    .orderBy(*EXPORT_PARTITION_COLUMNS)
+                    .toPandas())
+        
+        if file_format != 'arrow':
+            raise ValueError(f"Unsupported export format: {file_format}")
+        
+        # One shared category dictionary, as IPC files allow only one per field
+        categories = None
+        if 'category' in dataset.columns:
+            categories = sorted(row['category'] for row in dataset.select('category').distinct().collect()
+                                if row['category'] is not None)
+        data_columns = [c for c in export_df.columns if c not in EXPORT_PARTITION_COLUMNS]
+        shutil.rmtree(path, ignore_errors=True)
+        
+        def write_partition_files(batches):
+            import pyarrow as pa
+            import pyarrow.compute as pc
+            
+            dictionary = pa.array(categories, pa.string()) if categories is not None else None
+            writer, key, rows = None, None, 0
+            
+            def finish():
+                writer.close()
+                return pa.RecordBatch.from_pydict({'state': [key[0]], 'provider_type': [key[1]], 'rows': [rows]},
+                                                  schema=pa.schema([('state', pa.string()),
+                                                                    ('provider_type', pa.string()),
+                                                                    ('rows', pa.int64())]))
+            
+            for batch in batches:
+                states = batch.column('state').to_numpy(zero_copy_only=False)
+                types = batch.column('provider_type').to_numpy(zero_copy_only=False)
+                arrays = [batch.column(c) for c in data_columns]
+                if dictionary is not None:
+                    index = data_columns.index('category')
+                    arrays[index] = pa.DictionaryArray.from_arrays(
+                        pc.index_in(arrays[index], value_set=dictionary), dictionary)
+                data = pa.RecordBatch.from_arrays(arrays, data_columns)
+                # Rows arrive sorted by partition key, so each key is one contiguous run
+                starts = np.flatnonzero(np.r_[True, (states[1:] != states[:-1]) | (types[1:] != types[:-1])])
+                for start, end in zip(starts, np.r_[starts[1:], len(states)]):
+                    run_key = (states[start], types[start])
+                    if run_key != key:
+                        if writer is not None:
+                            yield finish()
+                        key, rows = run_key, 0
+                        directory = os.path.join(path, f'state={key[0]}', f'provider_type={key[1]}')
+                        os.makedirs(directory, exist_ok=True)
+                        # Uncompressed, so readers can memory-map the buffers without copying
+                        writer = pa.ipc.new_file(
+                            os.path.join(directory, f'part-{uuid.uuid4().hex}.arrow'), data.schema)
+                    writer.write_batch(data.slice(start, end - start))
+                    rows += int(end - start)
+            if writer is not None:
+                yield finish()
+        
+        written = (export_df
+                   .sortWithinPartitions(*EXPORT_PARTITION_COLUMNS)
+                   .mapInArrow(write_partition_files, 'state string, provider_type string, rows long')
+                   .groupBy(*EXPORT_PARTITION_COLUMNS)
+                   .agg(spark_sum('rows').alias('rows'))
+                   .orderBy(*EXPORT_PARTITION_COLUMNS)
+                   .toPandas())
+        return written
+    
+    def sketch_profile(self, dataset, profile_factory):
+        """One serialized sketch per partition via mapInPandas, merged on the driver"""
+        from profile_sketches import SketchProfile
+        
+        columns = [c for c in profile_factory().columns if c in dataset.columns]
+        
+        def build_partition_sketch(batches):
+            profile = profile_factory()
+            for batch in batches:
+                profile.update(batch)
+            yield pd.DataFrame({'sketch': [profile.to_bytes()]})
+        
+        blobs = dataset.select(*columns).mapInPandas(build_partition_sketch, 'sketch binary').collect()
+        profile = profile_factory()
+        for row in blobs:
+            profile.merge(SketchProfile.from_bytes(bytes(row['sketch'])))
+        return profile
+    
+    def top_k(self, dataset, accumulator_factory):
+        """Per-partition top-K lists via mapInPandas, merged on the driver
+        
+        Partitions are reduced where they live, so only k rows per key and partition
+        reach the driver and the dataset is never sorted as a whole.
+        """
+        from provider_rankings import PARTIAL_SCHEMA
+        
+        columns = [c for c in accumulator_factory().columns if c in dataset.columns]
+        
+        def partition_top_k(batches):
+            partial = accumulator_factory()
+            for batch in batches:
+                partial.update(batch)
+            yield partial.best
+        
+        partials = dataset.select(*columns).mapInPandas(partition_top_k, PARTIAL_SCHEMA).toPandas()
+        accumulator = accumulator_factory()
+        accumulator.merge(partials)
+        return accumulator
+    
+    def to_pandas(self, dataset, columns=None):
+        return (dataset.select(*columns) if columns else dataset).toPandas()
+    
+    def _spark_context(self):
+        try:
+            return self.spark.sparkContext
+        except Exception:
+            # No SparkContext on Spark Connect; local properties and metrics are unavailable
+            return None
+    
+    @contextmanager
+    def scheduler_pool(self, pool):
+        """Submit the block's jobs to a FAIR scheduler pool
+        
+        Pools only share the cluster when spark.scheduler.mode is FAIR (the
+        Databricks default); under FIFO the property is ignored.
+        """
+        sc = self._spark_context()
+        if sc is None:
+            yield
+            return
+        previous = sc.getLocalProperty('spark.scheduler.pool')
+        sc.setLocalProperty('spark.scheduler.pool', pool)
+        try:
+            yield
+        finally:
+            sc.setLocalProperty('spark.scheduler.pool', previous)
+    
+    def thread_target(self, fn):
+        """Worker threads inherit the caller's local properties (job group, pool)"""
+        return inheritable_thread_target(fn)
+    
+    @contextmanager
+    def instrument(self, stage):
+        """Spark jobs, stages, input and shuffle bytes of the work run inside the block
+        
+        Jobs are tagged with a job group per stage; job and stage ids come from the
+        status tracker, task metrics from the Spark UI REST API when it is reachable.
+        """
+        metrics = {}
+        sc = self._spark_context()
+        if sc is None:
+            yield metrics
+            return
+        
+        group_id = f'analyzer-{stage}-{uuid.uuid4().hex[:8]}'
+        previous_group = sc.getLocalProperty('spark.jobGroup.id')
+        previous_description = sc.getLocalProperty('spark.job.description')
+        sc.setJobGroup(group_id, f'GoogleMapsHealthcareAnalyzer: {stage}')
+        try:
+            yield metrics
+        finally:
+            sc.setLocalProperty('spark.jobGroup.id', previous_group)
+            sc.setLocalProperty('spark.job.description', previous_description)
+            metrics.update(self._job_group_metrics(sc, group_id))
+    
+    def _job_group_metrics(self, sc, group_id):
+        tracker = sc.statusTracker()
+        job_ids = tracker.getJobIdsForGroup(group_id)
+        stage_ids = set()
+        for job_id in job_ids:
+            info = tracker.getJobInfo(job_id)
+            if info is not None:
+                stage_ids.update(info.stageIds)
+        
+        metrics = {'spark_jobs': len(job_ids), 'spark_stages': len(stage_ids)}
+        attempts = self._stage_attempts(sc, sorted(stage_ids))
+        if attempts is None:
+            return metrics
+        
+        # Stages reused from a shuffle or cache are listed by their job but never run
+        executed = [a for a in attempts if a.get('status') != 'SKIPPED']
+        metrics['spark_stages'] = len({a['stageId'] for a in executed})
+        for key, field in [('input_rows', 'inputRecords'), ('input_bytes', 'inputBytes'),
+                           ('shuffle_read_bytes', 'shuffleReadBytes'),
+                           ('shuffle_write_bytes', 'shuffleWriteBytes')]:
+            metrics[key] = sum(a.get(field, 0) for a in executed)
+        return metrics
+    
+    def _stage_attempts(self, sc, stage_ids, timeout_seconds=5.0):
+        """Every attempt of the given stages from the UI REST API, or None if unavailable
+        
+        The UI store is updated asynchronously from the listener bus, so stages are
+        polled briefly until they reach a finished state.
+        """
+        if sc.uiWebUrl is None:
+            return None
+        base_url = f'{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}/stages'
+        deadline = time.monotonic() + timeout_seconds
+        while True:
+            try:
+                attempts = []
+                for stage_id in stage_ids:
+                    with urllib.request.urlopen(f'{base_url}/{stage_id}?details=false', timeout=timeout_seconds) as response:
+                        attempts.extend(json.load(response))
+            except (OSError, ValueError):
+                # UI disabled, proxied (Databricks) or not yet aware of the stage
+                return None
+            if all(a.get('status') in FINISHED_STAGE_STATES for a in attempts) or time.monotonic() > deadline:
+                return attempts
+            time.sleep(0.1)
+    
+    def resource_report(self):
+        """Adds the JVM's peak heap usage across memory pools"""
+        report = super().resource_report()
+        try:
+            jvm = self.spark.sparkContext._jvm
+            pools = jvm.java.lang.management.ManagementFactory.getMemoryPoolMXBeans()
+            report['jvm_peak_heap_bytes'] = sum(
+                pool.getPeakUsage().getUsed() for pool in pools
+                if str(pool.getType().toString()) == 'Heap memory')
+        except Exception:
+            # Py4J gateway access is unavailable on Spark Connect / shared clusters
+            report['jvm_peak_heap_bytes'] = None
+        return report
@@ -0,0 +1,70 @@
+"""
+Per-stage instrumentation for GoogleMapsHealthcareAnalyzer
+Records wall time for each analyzer stage plus whatever the engine can attribute to it:
+Spark jobs, stages, input rows/bytes and shuffle bytes on SparkEngine, rows and bytes
+scanned on ArrowEngine. The profile serializes to JSON alongside the analysis results.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# Metric keys reported for every stage; engines leave the ones they cannot measure as None
+STAGE_METRICS = ['spark_jobs', 'spark_stages', 'input_rows', 'input_bytes',
+                 'shuffle_read_bytes', 'shuffle_write_bytes']
+
+
+class StageProfiler:
+    def __init__(self, engine):
+        self.engine = engine
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self._start = time.perf_counter()
+        self._last_finish = self._start
+    
+    @contextmanager
+    def stage(self, name):
+        """Time the block and attribute the engine work it triggers to name"""
+        record = {'stage': name, 'wall_seconds': None, **dict.fromkeys(STAGE_METRICS)}
+        metrics = {}
+        start = time.perf_counter()
+        try:
+            with self.engine.instrument(name) as metrics:
+                yield record
+        finally:
+            finish = time.perf_counter()
+            record['wall_seconds'] = round(finish - start, 4)
+            self._last_finish = max(self._last_finish, finish)
+            record.update({k: v for k, v in metrics.items() if k in STAGE_METRICS})
+            self.stages.append(record)
+    
+    def run(self, name, fn, *args, **kwargs):
+        """Call fn inside a profiled stage and return its result"""
+        with self.stage(name):
+            return fn(*args, **kwargs)
+    
+    def to_frame(self):
+        return pd.DataFrame(self.stages, columns=['stage', 'wall_seconds'] + STAGE_METRICS)
+    
+    def to_dict(self):
+        return {
+            'engine': self.engine.name,
+            'started_at': self.started_at,
+            'total_wall_seconds': round(sum(s['wall_seconds'] for s in self.stages), 4),
+            # Less than the total when stages overlap (see stage_runner)
+            'elapsed_wall_seconds': round(self._last_finish - self._start, 4),
+            'stages': list(self.stages),
+        }
+    
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent)
+    
+    def print_summary(self):
+        print(f"\n=== STAGE PROFILE ({self.engine.name}) ===")
+        frame = self.to_frame()
+        # Drop metrics this engine cannot measure rather than printing columns of None
+        frame = frame[[c for c in frame.columns if frame[c].notna().any() or c == 'stage']]
+        print(frame.to_string(index=False))
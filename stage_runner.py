@@ -0,0 +1,78 @@
+"""
+Concurrent execution of independent analyzer stages
+Stages are submitted to a bounded thread pool, each in its own scheduler pool, so Spark
+can overlap their jobs while the driver formats another stage's output. Printed output
+is captured per thread and replayed in submission order, so logs read the same as a
+serial run.
+"""
+
+import io
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ThreadStdoutRouter(io.TextIOBase):
+    """sys.stdout replacement sending each thread's writes to its own buffer"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+    
+    def route(self, buffer):
+        """Send this thread's writes to buffer, or back to the real stream with None"""
+        self._local.buffer = buffer
+    
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        return (buffer if buffer is not None else self.stream).write(text)
+    
+    def flush(self):
+        self.stream.flush()
+
+
+def _run_captured(router, engine, profiler, name, fn, args):
+    buffer = io.StringIO()
+    router.route(buffer)
+    try:
+        with engine.scheduler_pool(f'analyzer_{name}'):
+            return profiler.run(name, fn, *args), buffer.getvalue(), None
+    except Exception as e:
+        return None, buffer.getvalue(), e
+    finally:
+        router.route(None)
+
+
+def run_stages(stages, engine, profiler, max_workers=1):
+    """Run (name, fn, args) stages and return {name: result} in stage order
+    
+    With max_workers=1 stages run one after another on the calling thread. Otherwise
+    up to max_workers run at once; each stage's output is printed, in stage order,
+    once it and every stage before it have finished. The first stage to fail
+    re-raises after the output before it is printed.
+    """
+    if max_workers <= 1:
+        return {name: profiler.run(name, fn, *args) for name, fn, args in stages}
+    
+    router = ThreadStdoutRouter(sys.stdout)
+    sys.stdout = router
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analyzer-stage') as pool:
+            futures = [
+                (name, pool.submit(engine.thread_target(_run_captured), router, engine, profiler, name, fn, args))
+                for name, fn, args in stages
+            ]
+            results = {}
+            for name, future in futures:
+                result, output, error = future.result()
+                router.stream.write(output)
+                if error is not None:
+                    raise error
+                results[name] = result
+    finally:
+        sys.stdout = router.stream
+    
+    # Profile records were appended as stages finished; list them in stage order
+    order = [name for name, _, _ in stages]
+    profiler.stages.sort(key=lambda s: order.index(s['stage']) if s['stage'] in order else -1)
+    return results